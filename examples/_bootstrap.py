@@ -0,0 +1,15 @@
+# -*- coding: utf-8 -*-
+"""
+示例脚本公共启动代码
+
+将项目根目录加入 sys.path，使示例可以直接 `import src.xxx`。
+示例脚本在顶部 `import _bootstrap` 即可，模块缓存保证只执行一次。
+"""
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+SRC_DIR = PROJECT_ROOT / "src"
+
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
@@ -13,13 +13,34 @@ Gateway Server 演示脚本
 """
 import asyncio
 import sys
-from pathlib import Path
 
-# 添加 src 到路径
-sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+import _bootstrap  # noqa: F401
+
+# gateway 以顶层包方式导入，需要 src 目录在路径中
+sys.path.insert(0, str(_bootstrap.SRC_DIR))
 
 from gateway import GatewayServer
 
+# 流式输出每块的字符数
+STREAM_CHUNK_SIZE = 8
+
+# 启动后打印的测试命令说明
+HELP_TEXT = """
+测试命令:
+--------------------------------------------------
+health 检查:
+  {"jsonrpc": "2.0", "id": "1", "method": "health", "params": {}}
+
+发送消息:
+  {"jsonrpc": "2.0", "id": "2", "method": "chat.send", "params": {"text": "你好"}}
+
+流式发送:
+  {"jsonrpc": "2.0", "id": "3", "method": "chat.send_stream", "params": {"text": "你好"}}
+--------------------------------------------------
+
+按 Ctrl+C 停止服务器
+"""
+
 
 class MockAgent:
     """模拟 Agent，用于演示"""
@@ -28,8 +49,9 @@ class MockAgent:
         """模拟处理消息"""
         # 模拟流式输出
         response = f"收到消息: {text}\n这是来自 MockAgent 的回复。"
-        for word in response:
-            yield word
+        # 按块输出，减少事件循环切换和 WebSocket 帧数
+        for i in range(0, len(response), STREAM_CHUNK_SIZE):
+            yield response[i:i + STREAM_CHUNK_SIZE]
             await asyncio.sleep(0.01)  # 模拟延迟
 
 
@@ -53,18 +75,7 @@ async def main():
     # 启动服务器
     await gateway.start()
     print(f"✅ Gateway 已启动: ws://{gateway.host}:{gateway.port}")
-    print("\n测试命令:")
-    print("-" * 50)
-    print('health 检查:')
-    print('  {"jsonrpc": "2.0", "id": "1", "method": "health", "params": {}}')
-    print()
-    print('发送消息:')
-    print('  {"jsonrpc": "2.0", "id": "2", "method": "chat.send", "params": {"text": "你好"}}')
-    print()
-    print('流式发送:')
-    print('  {"jsonrpc": "2.0", "id": "3", "method": "chat.send_stream", "params": {"text": "你好"}}')
-    print("-" * 50)
-    print("\n按 Ctrl+C 停止服务器\n")
+    print(HELP_TEXT)
 
     try:
         # 保持运行
@@ -77,4 +88,10 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    # 安装了 uvloop 时使用基于 libuv 的事件循环，WebSocket 吞吐更高
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(main())
+    else:
+        uvloop.run(main())
@@ -5,13 +5,10 @@
 
 演示如何导入 mcpServers 格式的配置
 """
-import json
-import sys
-from pathlib import Path
-
-sys.path.insert(0, str(Path(__file__).parent.parent))
+import _bootstrap  # noqa: F401
 
 from src.tools import MCPConfigManager
+from src.utils import json_loads
 
 # 用户的 mcpServers 配置示例
 USER_MCP_CONFIG = """{
@@ -86,7 +83,7 @@ def main():
 
     # 方法2: 直接解析 mcpServers 格式
     print("\n📥 方法2: 直接解析 mcpServers 格式")
-    data = json.loads(USER_MCP_CONFIG)
+    data = json_loads(USER_MCP_CONFIG)
     mcp_servers = data.get("mcpServers", {})
 
     print(f"\n配置详情:")
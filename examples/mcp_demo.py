@@ -11,10 +11,8 @@ MCP 工具使用示例
 import asyncio
 import os
 import sys
-from pathlib import Path
 
-# 添加项目根目录到路径
-sys.path.insert(0, str(Path(__file__).parent.parent))
+import _bootstrap  # noqa: F401
 
 from src.tools import (
     MCPConfigManager,
@@ -115,14 +113,16 @@ def demo_ai_intent_classifier():
         "你好",
     ]
 
-    print("\n1. 意图识别测试:")
+    # 先收集输出，最后一次性写入 stdout
+    out = ["\n1. 意图识别测试:"]
     for text in test_inputs:
         intent = classifier.classify(text)
-        print(f"   '{text}'")
-        print(f"   → 意图: {intent.type.value}, 置信度: {intent.confidence:.2f}")
+        out.append(f"   '{text}'")
+        out.append(f"   → 意图: {intent.type.value}, 置信度: {intent.confidence:.2f}")
         if intent.requires_tool:
-            print(f"   → 需要工具: {intent.suggested_tools}")
-        print()
+            out.append(f"   → 需要工具: {intent.suggested_tools}")
+        out.append("")
+    sys.stdout.write("\n".join(out) + "\n")
 
     return classifier
 
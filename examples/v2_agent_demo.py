@@ -8,17 +8,17 @@ Agent V2 使用示例
 import asyncio
 import os
 import sys
-from pathlib import Path
 
-# 添加项目根目录到路径
-project_root = Path(__file__).parent.parent
-sys.path.insert(0, str(project_root))
+import _bootstrap
 
 from src.agent_v2 import AgentLoop, ContextBuilder, BuildConfig
 from src.agent_v2.skills import SkillRegistry, SkillsContextInjector
 from src.agent_v2.memory import MemoryContextInjector
 from src.agent_v2.personality import PersonalityContextInjector
 
+# 流式输出时累计超过该字符数才 flush 一次 stdout
+FLUSH_THRESHOLD = 64
+
 
 async def mock_llm_client():
     """模拟LLM客户端"""
@@ -139,10 +139,7 @@ async def mock_personality_manager():
 
 async def main():
     """主函数"""
-    print("=" * 60)
-    print("Agent V2 演示")
-    print("=" * 60)
-    print()
+    sys.stdout.write("\n".join(["=" * 60, "Agent V2 演示", "=" * 60, "", ""]))
 
     # 1. 初始化组件
     print("[1/4] 初始化组件...")
@@ -162,7 +159,7 @@ async def main():
     )
 
     # 注册Skills注入器 (优先级25)
-    skills_dir = project_root / "skills"
+    skills_dir = _bootstrap.PROJECT_ROOT / "skills"
     if skills_dir.exists():
         skill_registry = SkillRegistry(skills_dir)
         context_builder.register_injector(
@@ -210,14 +207,19 @@ async def main():
         print("助手: ", end="", flush=True)
 
         response_text = []
+        pending = 0  # 自上次 flush 以来写入的字符数
         async for response in agent.run(
             session_id=session_id,
             user_input=user_input,
             message_history=history,
         ):
             if response.type.value == 'text':
-                print(response.content, end="")
+                sys.stdout.write(response.content)
                 response_text.append(response.content)
+                pending += len(response.content)
+                if pending > FLUSH_THRESHOLD:
+                    sys.stdout.flush()
+                    pending = 0
             elif response.type.value == 'tool_call':
                 print(f"[调用工具: {', '.join(tc.name for tc in response.tool_calls)}]")
             elif response.type.value == 'confirmation':
@@ -226,7 +228,7 @@ async def main():
             elif response.type.value == 'error':
                 print(f"[错误: {response.content}]")
 
-        print()  # 换行
+        print(flush=True)  # 换行并输出剩余内容
 
         # 更新历史
         if response_text:
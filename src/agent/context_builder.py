@@ -9,14 +9,26 @@ ContextBuilder - 上下文构建器
 
 参考: docs/plans/optimization-proposal-v2.md
 """
+import io
 import logging
 from dataclasses import dataclass, field
+from itertools import islice
 from typing import Any, Optional
 
+from .tools.base import TOOL_CATEGORY_MEMORY, TOOL_CATEGORY_OTHER, TOOL_CATEGORY_TASK
+
 logger = logging.getLogger('agent.context_builder')
 
+# 系统提示缓存上限（按人格/工具集/记忆指纹缓存）
+PROMPT_CACHE_SIZE = 64
+
+# 确认提示与工具结果模板
+_CONFIRM_TMPL = "⚠️ 需要确认\n\n即将执行: {}\n\n请回复「是」确认执行，或「否」取消操作。"
+_TOOL_SUCCESS_TMPL = "✅ {} 执行成功：{}"
+_TOOL_FAILURE_TMPL = "❌ {} 执行失败：{}"
 
-@dataclass
+
+@dataclass(slots=True)
 class BuildContext:
     """构建上下文的输入"""
     user_input: str
@@ -25,6 +37,8 @@ class BuildContext:
     personality: Optional[dict] = None
     tools: list[Any] = field(default_factory=list)
     pending_confirmation: bool = False
+    # 预先分好类的工具（ToolRegistry.get_by_category），提供时优先于 tools
+    tools_by_category: Optional[dict[str, list[Any]]] = None
 
 
 class ContextBuilder:
@@ -43,6 +57,36 @@ class ContextBuilder:
     - 不预设触发规则，让 LLM 自己判断
     """
 
+    # 无人格时的默认身份
+    _DEFAULT_IDENTITY = """## 身份
+
+你是一个友好的个人 AI 助手，可以帮助用户管理任务、记忆和日常事务。"""
+
+    # 使用规则（与上下文无关，固定不变）
+    _RULES_SECTION = """## 重要规则
+
+### 1. 自然对话优先
+- 如果用户只是闲聊或问候，直接友好回复，不要调用工具
+- 如果不确定用户意图，可以询问澄清
+
+### 2. 工具使用原则
+- 根据用户需求选择最合适的工具
+- 如果需要多个工具，可以连续调用
+- 如果工具执行失败，向用户解释原因
+
+### 3. 确认机制
+- 删除操作会自动要求确认
+- 等待用户明确回复「是」或「否」后再执行"""
+
+    # 等待确认时的精简提示：只需判断用户的是/否回复，无需工具和记忆
+    _CONFIRM_MODE_PROMPT = """## 确认模式
+
+你正在等待用户确认一项待执行的操作。
+
+- 用户回复「是」或表示同意时，确认执行
+- 用户回复「否」或表示拒绝时，取消操作
+- 如果回复不明确，请再次询问用户是否确认"""
+
     def __init__(
         self,
         personality_manager: Optional[Any] = None,
@@ -50,17 +94,73 @@ class ContextBuilder:
     ):
         self.personality_manager = personality_manager
         self.memory_system = memory_system
+        self._prompt_cache: dict[tuple, str] = {}
+        # (memory_context, 记忆部分)；每个会话一个 builder，无需加锁
+        self._memory_cache: tuple[str, str] = ("", "")
+        # compile_tools_section 生成的工具描述
+        self._tools_section: Optional[str] = None
 
     def build(self, context: BuildContext) -> str:
         """
         构建系统提示
 
+        身份、工具和规则很少变化，按指纹缓存整段提示，
+        重复轮次直接返回已拼接好的字符串。
+
         Args:
             context: 构建上下文
 
         Returns:
             完整的系统提示
         """
+        if context.pending_confirmation:
+            return self._CONFIRM_MODE_PROMPT
+
+        key = self._fingerprint(context)
+        prompt = self._prompt_cache.get(key)
+        if prompt is not None:
+            return prompt
+
+        prompt = self._build_uncached(context)
+
+        if len(self._prompt_cache) >= PROMPT_CACHE_SIZE:
+            # 淘汰最早写入的条目
+            self._prompt_cache.pop(next(iter(self._prompt_cache)))
+        self._prompt_cache[key] = prompt
+        return prompt
+
+    def _fingerprint(self, context: BuildContext) -> tuple:
+        """计算系统提示的缓存指纹"""
+        personality_key = None
+        personality = context.personality
+        if personality:
+            pget = personality.get
+            personality_key = (
+                pget('name', 'AI 助手'),
+                pget('description', ''),
+                tuple(islice(pget('traits') or (), 5)),
+            )
+
+        if self._tools_section is not None:
+            # 已编译的工具描述与 context 无关
+            tools_key = None
+        elif context.tools_by_category is not None:
+            tools_key = tuple(
+                (category, tuple(self._tool_key(tool) for tool in tools))
+                for category, tools in context.tools_by_category.items()
+            )
+        else:
+            tools_key = tuple(self._tool_key(tool) for tool in context.tools)
+
+        return personality_key, tools_key, context.memory_context
+
+    @staticmethod
+    def _tool_key(tool: Any) -> tuple[str, str]:
+        """工具在缓存指纹中的表示"""
+        return getattr(tool, 'name', str(tool)), getattr(tool, 'description', '')
+
+    def _build_uncached(self, context: BuildContext) -> str:
+        """不经缓存地构建系统提示"""
         parts = []
 
         # 1. 身份定义
@@ -80,12 +180,14 @@ class ContextBuilder:
 
     def _build_identity(self, context: BuildContext) -> str:
         """构建身份定义"""
-        if context.personality:
-            name = context.personality.get('name', 'AI 助手')
-            description = context.personality.get('description', '')
-            traits = context.personality.get('traits', [])
+        personality = context.personality
+        if personality:
+            pget = personality.get
+            name = pget('name', 'AI 助手')
+            description = pget('description', '')
+            traits = pget('traits') or ()
 
-            traits_str = "、".join(traits[:5]) if traits else ""
+            traits_str = "、".join(islice(traits, 5)) if traits else ""
 
             return f"""## 身份
 
@@ -93,93 +195,111 @@ class ContextBuilder:
 
 性格特点：{traits_str}"""
 
-        return """## 身份
+        return self._DEFAULT_IDENTITY
 
-你是一个友好的个人 AI 助手，可以帮助用户管理任务、记忆和日常事务。"""
+    def compile_tools_section(self, registry: Any) -> str:
+        """
+        预先生成工具描述部分
+
+        工具集在系统创建后不再变化，编译后每轮直接复用该字符串，
+        BuildContext 中的 tools / tools_by_category 将被忽略。
+
+        Args:
+            registry: ToolRegistry 实例
+
+        Returns:
+            工具描述部分
+        """
+        self._tools_section = self._render_tools_section(registry.get_by_category())
+        self._prompt_cache.clear()
+        return self._tools_section
 
     def _build_tools_section(self, context: BuildContext) -> str:
         """构建工具描述部分"""
-        if not context.tools:
-            return ""
-
-        lines = ["## 可用工具", ""]
-        lines.append("你可以使用以下工具帮助用户：")
-        lines.append("")
+        if self._tools_section is not None:
+            return self._tools_section
 
-        # 按类别分组
-        task_tools = []
-        memory_tools = []
-        other_tools = []
+        buckets = context.tools_by_category
+        if buckets is None:
+            buckets = self._categorize(context.tools)
+        return self._render_tools_section(buckets)
 
-        for tool in context.tools:
-            name = tool.name if hasattr(tool, 'name') else str(tool)
+    def _render_tools_section(self, buckets: dict[str, list[Any]]) -> str:
+        """按类别渲染工具描述"""
+        if not any(buckets.values()):
+            return ""
 
-            if 'task' in name.lower():
-                task_tools.append(tool)
-            elif 'memory' in name.lower():
-                memory_tools.append(tool)
+        buf = io.StringIO()
+        buf.write("## 可用工具\n\n你可以使用以下工具帮助用户：\n\n")
+
+        # 未知类别归入"其他功能"
+        other_tools = [
+            tool
+            for category, tools in buckets.items()
+            if category not in (TOOL_CATEGORY_TASK, TOOL_CATEGORY_MEMORY)
+            for tool in tools
+        ]
+
+        sections = (
+            ("### 任务管理", buckets.get(TOOL_CATEGORY_TASK)),
+            ("### 记忆管理", buckets.get(TOOL_CATEGORY_MEMORY)),
+            ("### 其他功能", other_tools),
+        )
+        for title, tools in sections:
+            if not tools:
+                continue
+            buf.write(title)
+            buf.write("\n")
+            for tool in tools:
+                name = getattr(tool, 'name', None) or str(tool)
+                description = getattr(tool, 'description', None) or ""
+
+                # 简化描述（nanobot 风格），只取第一行
+                desc = description.partition('\n')[0]
+                if len(desc) > 100:
+                    desc = desc[:97] + "..."
+
+                buf.write(f"- `{name}`: {desc}\n")
+            buf.write("\n")
+
+        # 与逐行 join 的结果保持一致：末尾只保留一个换行
+        return buf.getvalue()[:-1]
+
+    @staticmethod
+    def _categorize(tools: list[Any]) -> dict[str, list[Any]]:
+        """按类别分组未经 ToolRegistry 分类的工具"""
+        buckets: dict[str, list[Any]] = {}
+        for tool in tools:
+            get_category = getattr(tool, 'get_category', None)
+            if get_category is not None:
+                category = get_category()
             else:
-                other_tools.append(tool)
-
-        # 任务管理工具
-        if task_tools:
-            lines.append("### 任务管理")
-            for tool in task_tools:
-                lines.append(self._format_tool(tool))
-            lines.append("")
-
-        # 记忆工具
-        if memory_tools:
-            lines.append("### 记忆管理")
-            for tool in memory_tools:
-                lines.append(self._format_tool(tool))
-            lines.append("")
-
-        # 其他工具
-        if other_tools:
-            lines.append("### 其他功能")
-            for tool in other_tools:
-                lines.append(self._format_tool(tool))
-            lines.append("")
-
-        return "\n".join(lines)
-
-    def _format_tool(self, tool: Any) -> str:
-        """格式化工具描述"""
-        name = tool.name if hasattr(tool, 'name') else str(tool)
-        description = tool.description if hasattr(tool, 'description') else ""
-
-        # 简化描述（nanobot 风格）
-        desc = description.split('\n')[0] if description else ""  # 只取第一行
-        if len(desc) > 100:
-            desc = desc[:97] + "..."
-
-        return f"- `{name}`: {desc}"
+                name = (getattr(tool, 'name', None) or str(tool)).lower()
+                if 'task' in name:
+                    category = TOOL_CATEGORY_TASK
+                elif 'memory' in name:
+                    category = TOOL_CATEGORY_MEMORY
+                else:
+                    category = TOOL_CATEGORY_OTHER
+            buckets.setdefault(category, []).append(tool)
+        return buckets
 
     def _build_memory_section(self, context: BuildContext) -> str:
         """构建记忆上下文部分"""
-        return f"""## 相关记忆
+        # 相邻轮次召回的记忆经常相同，直接复用上一次的结果
+        last_context, last_section = self._memory_cache
+        if context.memory_context == last_context:
+            return last_section
+
+        section = f"""## 相关记忆
 
 {context.memory_context}"""
+        self._memory_cache = (context.memory_context, section)
+        return section
 
     def _build_rules_section(self, context: BuildContext) -> str:
         """构建规则部分"""
-        rules = """## 重要规则
-
-### 1. 自然对话优先
-- 如果用户只是闲聊或问候，直接友好回复，不要调用工具
-- 如果不确定用户意图，可以询问澄清
-
-### 2. 工具使用原则
-- 根据用户需求选择最合适的工具
-- 如果需要多个工具，可以连续调用
-- 如果工具执行失败，向用户解释原因
-
-### 3. 确认机制
-- 删除操作会自动要求确认
-- 等待用户明确回复「是」或「否」后再执行"""
-
-        return rules
+        return self._RULES_SECTION
 
     def build_for_confirmation(self, action_description: str) -> str:
         """
@@ -191,11 +311,7 @@ class ContextBuilder:
         Returns:
             确认提示
         """
-        return f"""⚠️ 需要确认
-
-即将执行: {action_description}
-
-请回复「是」确认执行，或「否」取消操作。"""
+        return _CONFIRM_TMPL.format(action_description)
 
     def build_tool_result(self, tool_name: str, result: Any) -> str:
         """
@@ -208,17 +324,17 @@ class ContextBuilder:
         Returns:
             结果提示
         """
-        if hasattr(result, 'success') and result.success:
-            content = result.content if hasattr(result, 'content') else str(result)
-            return f"✅ {tool_name} 执行成功：{content}"
-        else:
-            content = result.content if hasattr(result, 'content') else str(result)
-            return f"❌ {tool_name} 执行失败：{content}"
+        # 没有 content 属性时直接格式化 result 本身（等价于 str(result)）
+        content = getattr(result, 'content', result)
+        if getattr(result, 'success', False):
+            return _TOOL_SUCCESS_TMPL.format(tool_name, content)
+        return _TOOL_FAILURE_TMPL.format(tool_name, content)
 
 
 def create_context_builder(
     personality_manager: Optional[Any] = None,
-    memory_system: Optional[Any] = None
+    memory_system: Optional[Any] = None,
+    tool_registry: Optional[Any] = None
 ) -> ContextBuilder:
     """
     创建 ContextBuilder 实例
@@ -226,11 +342,15 @@ def create_context_builder(
     Args:
         personality_manager: 人格管理器
         memory_system: 记忆系统
+        tool_registry: 工具注册表（可选，提供时预先编译工具描述）
 
     Returns:
         ContextBuilder 实例
     """
-    return ContextBuilder(
+    builder = ContextBuilder(
         personality_manager=personality_manager,
         memory_system=memory_system
     )
+    if tool_registry is not None:
+        builder.compile_tools_section(tool_registry)
+    return builder
@@ -7,13 +7,6 @@ Agent 系统初始化与整合
 from typing import TYPE_CHECKING, Optional
 
 from . import SupervisorAgent, ToolRegistry
-from .tools.builtin import (
-    ChatTool,
-    SearchMemoryTool, AddMemoryTool, SummarizeMemoriesTool,
-    CreateTaskTool, ListTasksTool, CompleteTaskTool, DeleteTasksTool,
-    WebSearchTool,
-    SwitchPersonalityTool, ClearHistoryTool,
-)
 
 if TYPE_CHECKING:
     from memory import MemorySystem
@@ -29,7 +22,8 @@ def create_agent_system(
     search_tool: Optional['SearchTool'] = None,
     personality_manager: Optional['PersonalityManager'] = None,
     chat_session=None,
-    fast_path_classifier=None
+    fast_path_classifier=None,
+    plan_cache_path: Optional[str] = None
 ) -> SupervisorAgent:
     """
     创建并配置 Agent 系统
@@ -42,10 +36,20 @@ def create_agent_system(
         personality_manager: 人格管理器（可选）
         chat_session: 对话会话（用于清空历史，可选）
         fast_path_classifier: 快速路径分类器（可选）
+        plan_cache_path: 执行计划缓存的持久化路径（可选，需要记忆系统提供嵌入函数）
 
     Returns:
         配置好的 SupervisorAgent
     """
+    # 内置工具延迟导入：只加载本次实际需要的工具模块，缩短启动时间
+    from .tools.builtin.chat_tool import ChatTool
+    from .tools.builtin.memory_tools import (
+        SearchMemoryTool, AddMemoryTool, SummarizeMemoriesTool,
+    )
+    from .tools.builtin.task_tools import (
+        CreateTaskTool, ListTasksTool, CompleteTaskTool, DeleteTasksTool,
+    )
+
     # 创建工具注册表
     registry = ToolRegistry()
 
@@ -68,17 +72,27 @@ def create_agent_system(
 
     # 可选工具
     if search_tool:
+        from .tools.builtin.search_tools import WebSearchTool
         tools.append(WebSearchTool(search_tool))
 
     if personality_manager:
+        from .tools.builtin.system_tools import SwitchPersonalityTool
         tools.append(SwitchPersonalityTool(personality_manager))
 
     if chat_session:
+        from .tools.builtin.system_tools import ClearHistoryTool
         tools.append(ClearHistoryTool(chat_session))
 
     # 注册所有工具
     registry.register_multiple(tools)
 
+    # 执行计划语义缓存：复用记忆系统的嵌入函数
+    plan_cache = None
+    embedding_func = getattr(getattr(memory_system, 'retrieval', None), 'embedding_func', None)
+    if embedding_func:
+        from .plan_cache import PlanCache
+        plan_cache = PlanCache(embedding_func, db_path=plan_cache_path)
+
     # 创建 Supervisor Agent
     agent = SupervisorAgent(
         llm_client=llm_client,
@@ -89,7 +103,8 @@ def create_agent_system(
         retry_attempts=3,
         retry_delay=1.0,
         enable_memory_context=True,
-        context_memory_limit=5
+        context_memory_limit=5,
+        plan_cache=plan_cache
     )
 
     return agent
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""
+意图关键词
+
+Supervisor 的意图分析、静态计划、反思校验和计划缓存的意图校验共用同一张关键词表，
+一次扫描得到全部类别的位掩码。
+"""
+import re
+from typing import Iterable
+
+try:
+    import ahocorasick
+    HAS_AHOCORASICK = True
+except ImportError:
+    ahocorasick = None
+    HAS_AHOCORASICK = False
+
+# 关键词类别（位掩码）
+KW_SIMPLE = 1 << 0            # 简单问候 → Fast Path
+KW_MULTI = 1 << 1             # 复杂多步指示 → Multi Step
+KW_DELETE_TASK = 1 << 2       # 任务清理/删除 → Single Step
+KW_VIEW_TASK = 1 << 3         # 任务查看 → Single Step
+KW_REFLECT_DELETE = 1 << 4    # 反思：删除类动词
+KW_REFLECT_VIEW = 1 << 5      # 反思：查看类动词
+KW_REFLECT_DELETE_STRICT = 1 << 6  # 反思：明确的删除动词
+KW_CLEAR_TASKS = 1 << 7       # 静态计划：清理全部任务
+KW_LIST_TASKS = 1 << 8        # 静态计划：查看任务列表
+KW_COMPLETE_TASK = 1 << 9     # 完成任务
+KW_CREATE_TASK = 1 << 10      # 创建任务
+
+INTENT_KEYWORDS: dict[int, tuple[str, ...]] = {
+    KW_SIMPLE: ("你好", "嗨", "hello", "hi", "谢谢", "再见", "拜拜"),
+    KW_MULTI: ("然后", "先...再", "帮我...然后", "整理并", "总结所有", "分析并"),
+    KW_DELETE_TASK: ("清理任务", "删除任务", "清空任务", "移除任务", "删除这些", "清理这些"),
+    KW_VIEW_TASK: ("有什么任务", "查看任务", "待办", "显示任务", "列出"),
+    KW_REFLECT_DELETE: ("清理", "删除", "移除", "清空", "不要", "去掉", "删掉"),
+    KW_REFLECT_VIEW: ("查看", "显示", "有什么", "列出", "看看"),
+    KW_REFLECT_DELETE_STRICT: ("清理", "删除", "移除"),
+    KW_CLEAR_TASKS: ("清理任务", "清空任务", "清理这些任务", "清理所有任务", "删除所有任务"),
+    KW_LIST_TASKS: ("有什么任务", "查看任务", "显示任务", "任务列表", "待办事项", "有什么待办"),
+    KW_COMPLETE_TASK: ("完成", "做完"),
+    KW_CREATE_TASK: ("创建", "添加", "提醒我"),
+}
+
+
+class KeywordMatcher:
+    """
+    多类别关键词匹配器
+
+    一次扫描返回命中类别的位掩码。安装了 pyahocorasick 时使用 Aho-Corasick
+    自动机（单次线性扫描），否则每个类别一个预编译正则。
+    """
+
+    def __init__(self, keywords: dict[int, Iterable[str]]):
+        self._automaton = None
+        self._patterns: list[tuple[int, re.Pattern]] = []
+
+        if HAS_AHOCORASICK:
+            merged: dict[str, int] = {}
+            for bit, words in keywords.items():
+                for word in words:
+                    merged[word] = merged.get(word, 0) | bit
+
+            automaton = ahocorasick.Automaton()
+            for word, bits in merged.items():
+                automaton.add_word(word, bits)
+            automaton.make_automaton()
+            self._automaton = automaton
+        else:
+            for bit, words in keywords.items():
+                pattern = "|".join(re.escape(w) for w in sorted(words, key=len, reverse=True))
+                self._patterns.append((bit, re.compile(pattern)))
+
+    def match(self, text: str) -> int:
+        """返回 text 命中的类别位掩码"""
+        mask = 0
+        if self._automaton is not None:
+            for _, bits in self._automaton.iter(text):
+                mask |= bits
+            return mask
+
+        for bit, pattern in self._patterns:
+            if pattern.search(text):
+                mask |= bit
+        return mask
+
+
+INTENT_MATCHER = KeywordMatcher(INTENT_KEYWORDS)
@@ -5,16 +5,92 @@ LLM 适配器
 提供统一的工具调用接口，适配不同 LLM 提供商
 """
 import asyncio
+import functools
 import json
 import logging
+import re
+import threading
+import weakref
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import AsyncGenerator, Optional
+from typing import Any, AsyncGenerator, Callable, Iterable, Optional
+
+from ..utils.helpers import json_dumps, json_loads
+
+try:
+    import ijson
+    HAS_IJSON = True
+except ImportError:
+    HAS_IJSON = False
+    ijson = None
 
 logger = logging.getLogger('agent.llm_adapter')
 
+# HTTP 连接池配置
+HTTP_TIMEOUT = 120                  # 单次请求超时（秒）
+HTTP_MAX_CONNECTIONS = 100          # 连接池总连接数
+HTTP_MAX_CONNECTIONS_PER_HOST = 20  # 每个主机的最大连接数
+HTTP_PREWARM_TIMEOUT = 5            # 预热探测超时（秒）
+
+# 按 (事件循环, base_url) 共享的 aiohttp.ClientSession，避免短生命周期的适配器丢失 keep-alive
+# 会话绑定创建它的事件循环，不能跨循环复用；循环被回收后对应的条目自动清除
+_http_sessions: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, Any]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+# 同步 LLM 客户端调用使用的线程池（限制并发，避免默认执行器过度占用线程）
+LLM_EXECUTOR_WORKERS = 8
+_LLM_EXECUTOR = ThreadPoolExecutor(max_workers=LLM_EXECUTOR_WORKERS, thread_name_prefix="llm")
+
+# 提示工程模式下的工具调用标记
+_TOOL_CALL_RE = re.compile(r'<tool_call>\s*(\{.*?\})\s*</tool_call>', re.DOTALL)
+
+# 不支持 tools 参数时的提示工程模板（只有 tools_desc 会变化）
+_FALLBACK_SYSTEM_PROMPT_TMPL = """你是一个智能助手，必须使用以下工具来帮助用户完成任务：
+
+{tools_desc}
+
+【关键规则 - 必须遵守】
+1. 用户说"清理任务"、"删除任务"、"清空任务" → 必须使用 delete_tasks
+2. 用户说"查看任务"、"有什么任务"、"显示任务" → 使用 list_tasks
+3. 用户说"完成任务"、"做完了" → 使用 complete_task
+4. 用户说"创建任务"、"提醒我" → 使用 create_task
+
+【回复格式】
+如果需要使用工具，必须严格按照以下格式回复（不要添加其他内容）：
+<tool_call>
+{{"name": "工具名", "arguments": {{"参数名": "值"}}}}
+</tool_call>
+
+如果不需要工具，直接回复用户。
+
+【示例】
+用户：查看我的任务
+助手：<tool_call>
+{{"name": "list_tasks", "arguments": {{}}}}
+</tool_call>
+
+用户：清理这些任务
+助手：<tool_call>
+{{"name": "delete_tasks", "arguments": {{"delete_all": true, "confirmed": false}}}}
+</tool_call>"""
+
+# Ollama 提示工程模板
+_OLLAMA_SYSTEM_PROMPT_TMPL = """你是一个智能助手，可以使用以下工具来帮助用户：
+
+{tools_desc}
+
+重要规则：
+1. 如果需要使用工具，请严格按照以下 JSON 格式回复，不要添加其他内容：
+   {{"tool": "工具名", "params": {{"参数名": "值"}}}}
+
+2. 如果不需要工具，直接回复用户。
+
+3. 只能使用上面列出的工具。"""
+
 
-@dataclass
+@dataclass(slots=True)
 class ToolCall:
     """工具调用"""
     id: str
@@ -22,7 +98,7 @@ class ToolCall:
     arguments: dict
 
 
-@dataclass
+@dataclass(slots=True)
 class LLMResponse:
     """LLM 响应"""
     content: Optional[str] = None
@@ -34,6 +110,201 @@ class LLMResponse:
             self.tool_calls = []
 
 
+def _parse_args(raw) -> dict:
+    """
+    统一工具调用参数为 dict
+
+    API 返回 JSON 字符串，提示工程路径可能已是 dict，这里只解析一次
+    """
+    if isinstance(raw, dict):
+        return raw
+    if not raw:
+        return {}
+    return json_loads(raw)
+
+
+def _iter_tool_params(params: dict):
+    """遍历工具参数，产出 (参数名, 描述, 必需标记)"""
+    required_params = params.get("required", [])
+    for param_name, param_info in params["properties"].items():
+        required = " (必需)" if param_name in required_params else ""
+        yield param_name, param_info.get('description', ''), required
+
+
+def _render_tool_block(tool: dict) -> str:
+    """渲染单个工具（分段样式），末尾带空行分隔"""
+    func = tool.get("function", {})
+    params = func.get("parameters", {})
+    text = f"工具名: {func.get('name', '')}\n描述: {func.get('description', '')}\n"
+
+    if "properties" in params:
+        text += "参数:\n" + "".join(
+            f"  - {name}: {desc}{required}\n"
+            for name, desc, required in _iter_tool_params(params)
+        )
+    return text
+
+
+def _render_tool_bullet(tool: dict) -> str:
+    """渲染单个工具（列表样式）"""
+    func = tool.get("function", {})
+    params = func.get("parameters", {})
+    text = f"- {func.get('name', '')}: {func.get('description', '')}"
+
+    if "properties" in params:
+        text += "".join(
+            f"\n    {name}: {desc}{required}"
+            for name, desc, required in _iter_tool_params(params)
+        )
+    return text
+
+
+def _get_shared_session(base_url: str):
+    """获取当前事件循环中 base_url 对应的共享 HTTP 会话（惰性创建，需在事件循环内调用）"""
+    import aiohttp
+
+    sessions = _http_sessions.setdefault(asyncio.get_running_loop(), {})
+    session = sessions.get(base_url)
+    if session is None or session.closed:
+        session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=HTTP_MAX_CONNECTIONS,
+                limit_per_host=HTTP_MAX_CONNECTIONS_PER_HOST,
+            ),
+            timeout=aiohttp.ClientTimeout(total=HTTP_TIMEOUT),
+        )
+        sessions[base_url] = session
+    return session
+
+
+async def prewarm(base_url: str) -> None:
+    """
+    预热到 base_url 的连接
+
+    发送一次 HEAD 探测，让首个真实请求免去 TCP/TLS 握手。
+    探测结果不重要，失败只记录日志。
+    """
+    import aiohttp
+
+    session = _get_shared_session(base_url)
+    try:
+        async with session.head(
+            base_url, timeout=aiohttp.ClientTimeout(total=HTTP_PREWARM_TIMEOUT)
+        ):
+            pass
+        logger.debug("连接预热完成: %s", base_url)
+    except Exception as e:
+        logger.debug("连接预热失败: %s, %s", base_url, e)
+
+
+async def close_http_session(base_url: str) -> None:
+    """关闭当前事件循环中 base_url 对应的共享 HTTP 会话"""
+    sessions = _http_sessions.get(asyncio.get_running_loop(), {})
+    session = sessions.pop(base_url, None)
+    if session is not None and not session.closed:
+        await session.close()
+
+
+# 工具提示样式 -> 单个工具的渲染函数
+_TOOL_RENDERERS: dict[str, Callable[[dict], str]] = {
+    "block": _render_tool_block,
+    "bullet": _render_tool_bullet,
+}
+
+
+async def _read_first_choice(response) -> Optional[dict]:
+    """
+    读取 chat/completions 响应中的第一个 choice
+
+    安装了 ijson 时边下载边解析 choices 数组，不在内存中保留完整响应体；
+    后续 choice 会被丢弃，但仍会读完响应体以便连接放回连接池。
+
+    Args:
+        response: aiohttp 响应对象
+
+    Returns:
+        第一个 choice，没有时返回 None
+    """
+    if not HAS_IJSON:
+        choices = json_loads(await response.read())["choices"]
+        return choices[0] if choices else None
+
+    first_choice = None
+    async for choice in ijson.items_async(response.content, 'choices.item', use_float=True):
+        if first_choice is None:
+            first_choice = choice
+    return first_choice
+
+
+# 流式输出结束标记
+_STREAM_END = object()
+
+
+async def _async_stream_from_sync(
+    gen_factory: Callable[[], Iterable[str]]
+) -> AsyncGenerator[str, None]:
+    """
+    将同步生成器转换为异步生成器
+
+    在后台线程消费同步生成器，每个 chunk 通过 loop.call_soon_threadsafe
+    直接放入 asyncio.Queue，消费端 await 即可被唤醒，无需轮询。
+    消费端提前关闭时，后台线程在下一个 chunk 到达后停止并关闭同步生成器。
+
+    Args:
+        gen_factory: 返回同步生成器的函数（在后台线程中调用）
+
+    Yields:
+        生成器产出的 chunk
+    """
+    loop = asyncio.get_running_loop()
+    chunk_queue: asyncio.Queue = asyncio.Queue()
+    exception_holder: list[Optional[BaseException]] = [None]
+
+    def put(item) -> bool:
+        """线程安全地投递到事件循环，循环已关闭时返回 False"""
+        try:
+            loop.call_soon_threadsafe(chunk_queue.put_nowait, item)
+            return True
+        except RuntimeError:
+            return False
+
+    # 调用方提前停止消费时置位，后台线程随之停止读取上游
+    stop = threading.Event()
+
+    def run_stream():
+        """在后台线程运行同步生成器"""
+        gen = None
+        try:
+            gen = gen_factory()
+            for chunk in gen:
+                if stop.is_set() or not put(chunk):
+                    return
+        except Exception as e:
+            exception_holder[0] = e
+        finally:
+            close = getattr(gen, 'close', None)
+            if close is not None:
+                close()
+            put(_STREAM_END)
+
+    # 守护线程：调用方提前退出时不阻塞进程关闭
+    thread = threading.Thread(target=run_stream, daemon=True)
+    thread.start()
+
+    try:
+        while True:
+            chunk = await chunk_queue.get()
+            if chunk is _STREAM_END:
+                break
+            yield chunk
+    finally:
+        stop.set()
+
+    # 检查是否有异常
+    if exception_holder[0]:
+        raise exception_holder[0]
+
+
 class LLMAdapter(ABC):
     """LLM 适配器基类"""
 
@@ -82,17 +353,101 @@ class LLMAdapter(ABC):
         """流式文本生成"""
         pass
 
+    async def prewarm(self) -> None:
+        """预热到服务端的连接"""
+        pass
+
+    async def aclose(self) -> None:
+        """释放适配器持有的连接等资源"""
+        pass
+
 
-class OpenAICompatibleAdapter(LLMAdapter):
+class _SyncClientAdapterMixin:
+    """
+    同步 LLM 客户端适配器的公共实现
+
+    提供异步 generate / stream_generate 包装和工具提示渲染，
+    子类通过 _TOOL_FMT_STYLE 选择工具描述样式
+    """
+
+    _TOOL_FMT_STYLE = "block"
+
+    def __init__(self, llm_client):
+        self.client = llm_client
+        # (工具列表, 渲染结果)：调用方复用同一个 schema 列表时直接命中
+        self._tools_prompt_cache: tuple[Optional[list], str] = (None, "")
+
+    def _format_tools_for_prompt(self, tools: list[dict]) -> str:
+        """将工具格式化为提示文本（同一工具列表只渲染一次）"""
+        cached_tools, cached_desc = self._tools_prompt_cache
+        if tools is cached_tools:
+            return cached_desc
+
+        render = _TOOL_RENDERERS[self._TOOL_FMT_STYLE]
+        tools_desc = "\n".join(render(tool) for tool in tools)
+        self._tools_prompt_cache = (tools, tools_desc)
+        return tools_desc
+
+    async def generate(
+        self,
+        messages: list[dict],
+        temperature: float = 0.7,
+        max_tokens: int = 2000,
+        response_format: Optional[dict] = None
+    ) -> str:
+        """普通文本生成"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            _LLM_EXECUTOR,
+            functools.partial(
+                self.client.generate, messages, temperature, max_tokens, response_format
+            )
+        )
+
+    async def stream_generate(
+        self,
+        messages: list[dict],
+        temperature: float = 0.7,
+        max_tokens: int = 2000
+    ) -> AsyncGenerator[str, None]:
+        """流式文本生成 - 真正的异步流式"""
+        async for chunk in _async_stream_from_sync(
+            lambda: self.client.stream_generate(messages, temperature, max_tokens)
+        ):
+            yield chunk
+
+
+class OpenAICompatibleAdapter(_SyncClientAdapterMixin, LLMAdapter):
     """
     OpenAI 兼容适配器
 
     适用于 OpenAI、MiniMax 等兼容 OpenAI API 的提供商
     """
 
+    _TOOL_FMT_STYLE = "block"
+
     def __init__(self, llm_client):
-        self.client = llm_client
-        self.provider = getattr(llm_client, '__class__.__name__', 'unknown')
+        super().__init__(llm_client)
+        self.provider = type(llm_client).__name__
+        # 请求地址和请求头在客户端生命周期内不变，只计算一次
+        base_url = getattr(llm_client, 'base_url', None) or ''
+        self._url = f"{base_url.rstrip('/')}/chat/completions"
+        self._headers = {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {getattr(llm_client, 'api_key', None)}"
+        }
+
+    async def _get_session(self):
+        """获取按 base_url 共享的 HTTP 会话"""
+        return _get_shared_session(self.client.base_url)
+
+    async def prewarm(self) -> None:
+        """预热到 base_url 的连接"""
+        await prewarm(self.client.base_url)
+
+    async def aclose(self) -> None:
+        """关闭 base_url 对应的共享 HTTP 会话"""
+        await close_http_session(self.client.base_url)
 
     async def generate_with_tools(
         self,
@@ -107,11 +462,6 @@ class OpenAICompatibleAdapter(LLMAdapter):
 
         通过直接调用 HTTP API 支持 tools 参数
         """
-        import urllib.request
-        import urllib.error
-
-        url = f"{self.client.base_url}/chat/completions"
-
         data = {
             "model": self.client.model,
             "messages": messages,
@@ -121,53 +471,51 @@ class OpenAICompatibleAdapter(LLMAdapter):
             "max_tokens": max_tokens,
         }
 
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {self.client.api_key}"
-        }
-
-        req = urllib.request.Request(
-            url,
-            data=json.dumps(data).encode('utf-8'),
-            headers=headers,
-            method="POST"
-        )
+        session = await self._get_session()
 
         try:
-            with urllib.request.urlopen(req, timeout=120) as response:
-                result = json.loads(response.read().decode('utf-8'))
-                message = result["choices"][0]["message"]
-
-                # 解析工具调用
-                tool_calls = []
-                if "tool_calls" in message:
-                    for tc in message["tool_calls"]:
-                        if tc.get("type") == "function":
-                            tool_calls.append(ToolCall(
-                                id=tc.get("id", ""),
-                                name=tc["function"]["name"],
-                                arguments=json.loads(tc["function"]["arguments"])
-                            ))
-
-                return LLMResponse(
-                    content=message.get("content"),
-                    tool_calls=tool_calls,
-                    finish_reason=result["choices"][0].get("finish_reason", "stop")
-                )
-
-        except urllib.error.HTTPError as e:
-            error_body = e.read().decode('utf-8') if hasattr(e, 'read') else "Unknown error"
-            logger.error(f"LLM API HTTP 错误 {e.code}: {error_body}")
+            async with session.post(self._url, data=json_dumps(data), headers=self._headers) as response:
+                status = response.status
+                if status >= 400:
+                    error_body = await response.text()
+                else:
+                    choice = await _read_first_choice(response)
+        except Exception as e:
+            logger.error("LLM API 错误: %s", e)
+            raise
+
+        if status >= 400:
+            logger.error("LLM API HTTP 错误 %s: %s", status, error_body)
 
             # 如果是 400 错误，可能是 provider 不支持 tools 参数
-            if e.code == 400:
-                logger.warning(f"{self.provider} 可能不支持 tools 参数，回退到提示工程模式")
+            if status == 400:
+                logger.warning("%s 可能不支持 tools 参数，回退到提示工程模式", self.provider)
                 return await self._fallback_with_prompt(messages, tools, temperature, max_tokens)
 
-            raise Exception(f"LLM API 错误 ({e.code}): {error_body}")
+            raise Exception(f"LLM API 错误 ({status}): {error_body}")
+
+        try:
+            message = choice["message"]
+
+            # 解析工具调用
+            tool_calls = []
+            if "tool_calls" in message:
+                for tc in message["tool_calls"]:
+                    if tc.get("type") == "function":
+                        tool_calls.append(ToolCall(
+                            id=tc.get("id", ""),
+                            name=tc["function"]["name"],
+                            arguments=_parse_args(tc["function"].get("arguments"))
+                        ))
+
+            return LLMResponse(
+                content=message.get("content"),
+                tool_calls=tool_calls,
+                finish_reason=choice.get("finish_reason", "stop")
+            )
 
         except Exception as e:
-            logger.error(f"LLM API 错误: {e}")
+            logger.error("LLM API 错误: %s", e)
             raise
 
     async def _fallback_with_prompt(
@@ -185,34 +533,7 @@ class OpenAICompatibleAdapter(LLMAdapter):
         # 构建工具描述
         tools_desc = self._format_tools_for_prompt(tools)
 
-        system_prompt = f"""你是一个智能助手，必须使用以下工具来帮助用户完成任务：
-
-{tools_desc}
-
-【关键规则 - 必须遵守】
-1. 用户说"清理任务"、"删除任务"、"清空任务" → 必须使用 delete_tasks
-2. 用户说"查看任务"、"有什么任务"、"显示任务" → 使用 list_tasks
-3. 用户说"完成任务"、"做完了" → 使用 complete_task
-4. 用户说"创建任务"、"提醒我" → 使用 create_task
-
-【回复格式】
-如果需要使用工具，必须严格按照以下格式回复（不要添加其他内容）：
-<tool_call>
-{{"name": "工具名", "arguments": {{"参数名": "值"}}}}
-</tool_call>
-
-如果不需要工具，直接回复用户。
-
-【示例】
-用户：查看我的任务
-助手：<tool_call>
-{{"name": "list_tasks", "arguments": {{}}}}
-</tool_call>
-
-用户：清理这些任务
-助手：<tool_call>
-{{"name": "delete_tasks", "arguments": {{"delete_all": true, "confirmed": false}}}}
-</tool_call>"""
+        system_prompt = _FALLBACK_SYSTEM_PROMPT_TMPL.format(tools_desc=tools_desc)
 
         # 添加系统提示
         enhanced_messages = [{"role": "system", "content": system_prompt}] + messages
@@ -224,110 +545,30 @@ class OpenAICompatibleAdapter(LLMAdapter):
         tool_calls = []
         if "<tool_call>" in content:
             try:
-                import re
-                match = re.search(r'<tool_call>\s*(\{.*?\})\s*</tool_call>', content, re.DOTALL)
+                match = _TOOL_CALL_RE.search(content)
                 if match:
-                    tool_data = json.loads(match.group(1))
+                    tool_data = json_loads(match.group(1))
                     tool_calls.append(ToolCall(
                         id="call_0",
                         name=tool_data["name"],
-                        arguments=tool_data.get("arguments", {})
+                        arguments=_parse_args(tool_data.get("arguments"))
                     ))
                     # 移除工具调用标记，保留其他内容
-                    content = re.sub(r'<tool_call>.*?</tool_call>', '', content, flags=re.DOTALL).strip()
+                    content = (content[:match.start()] + content[match.end():]).strip()
             except Exception as e:
-                logger.warning(f"解析工具调用失败: {e}")
+                logger.warning("解析工具调用失败: %s", e)
 
         return LLMResponse(content=content, tool_calls=tool_calls)
 
-    def _format_tools_for_prompt(self, tools: list[dict]) -> str:
-        """将工具格式化为提示文本"""
-        lines = []
-        for tool in tools:
-            func = tool.get("function", {})
-            name = func.get("name", "")
-            desc = func.get("description", "")
-            params = func.get("parameters", {})
-
-            lines.append(f"工具名: {name}")
-            lines.append(f"描述: {desc}")
-
-            if "properties" in params:
-                lines.append("参数:")
-                for param_name, param_info in params["properties"].items():
-                    required = " (必需)" if param_name in params.get("required", []) else ""
-                    lines.append(f"  - {param_name}: {param_info.get('description', '')}{required}")
-
-            lines.append("")
-
-        return "\n".join(lines)
-
-    async def generate(
-        self,
-        messages: list[dict],
-        temperature: float = 0.7,
-        max_tokens: int = 2000,
-        response_format: Optional[dict] = None
-    ) -> str:
-        """普通文本生成"""
-        # 使用底层客户端的 generate 方法
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(
-            None,
-            lambda: self.client.generate(messages, temperature, max_tokens, response_format)
-        )
-
-    async def stream_generate(
-        self,
-        messages: list[dict],
-        temperature: float = 0.7,
-        max_tokens: int = 2000
-    ) -> AsyncGenerator[str, None]:
-        """流式文本生成 - 真正的异步流式"""
-        import threading
-        import queue as thread_queue
-
-        _loop = asyncio.get_event_loop()  # noqa: F841 - reserved for future async operations
-        chunk_queue: thread_queue.Queue = thread_queue.Queue()
-        done_event = threading.Event()
-        exception_holder = [None]
 
-        def run_stream():
-            """在后台线程运行同步生成器"""
-            try:
-                for chunk in self.client.stream_generate(messages, temperature, max_tokens):
-                    chunk_queue.put(chunk)
-            except Exception as e:
-                exception_holder[0] = e
-            finally:
-                done_event.set()
-
-        # 启动后台线程
-        thread = threading.Thread(target=run_stream, daemon=True)
-        thread.start()
-
-        # 异步 yield chunks
-        while not done_event.is_set() or not chunk_queue.empty():
-            try:
-                chunk = chunk_queue.get(timeout=0.01)
-                yield chunk
-            except thread_queue.Empty:
-                await asyncio.sleep(0.001)  # 短暂让出控制权
-
-        # 检查是否有异常
-        if exception_holder[0]:
-            raise exception_holder[0]
-
-
-class OllamaAdapter(LLMAdapter):
+class OllamaAdapter(_SyncClientAdapterMixin, LLMAdapter):
     """
     Ollama 适配器
 
     Ollama 不支持标准的 tools 参数，使用提示工程模拟
     """
 
-    def __init__(self, llm_client):
-        self.client = llm_client
+    _TOOL_FMT_STYLE = "bullet"
 
     async def generate_with_tools(
         self,
@@ -342,17 +583,7 @@ class OllamaAdapter(LLMAdapter):
         # 构建工具描述
         tools_desc = self._format_tools_for_prompt(tools)
 
-        system_prompt = f"""你是一个智能助手，可以使用以下工具来帮助用户：
-
-{tools_desc}
-
-重要规则：
-1. 如果需要使用工具，请严格按照以下 JSON 格式回复，不要添加其他内容：
-   {{"tool": "工具名", "params": {{"参数名": "值"}}}}
-
-2. 如果不需要工具，直接回复用户。
-
-3. 只能使用上面列出的工具。"""
+        system_prompt = _OLLAMA_SYSTEM_PROMPT_TMPL.format(tools_desc=tools_desc)
 
         # 添加系统提示
         enhanced_messages = [{"role": "system", "content": system_prompt}] + messages
@@ -364,93 +595,29 @@ class OllamaAdapter(LLMAdapter):
         tool_calls = []
         try:
             # 尝试解析 JSON
-            data = json.loads(content.strip())
+            data = json_loads(content.strip())
             if "tool" in data:
                 tool_calls.append(ToolCall(
                     id="call_0",
                     name=data["tool"],
-                    arguments=data.get("params", {})
+                    arguments=_parse_args(data.get("params"))
                 ))
                 content = None  # 工具调用时没有文本内容
         except json.JSONDecodeError:
             # 不是 JSON，当作普通文本回复
             pass
         except Exception as e:
-            logger.warning(f"解析工具调用失败: {e}")
+            logger.warning("解析工具调用失败: %s", e)
 
         return LLMResponse(content=content, tool_calls=tool_calls)
 
-    def _format_tools_for_prompt(self, tools: list[dict]) -> str:
-        """将工具格式化为提示文本"""
-        lines = []
-        for tool in tools:
-            func = tool.get("function", {})
-            name = func.get("name", "")
-            desc = func.get("description", "")
-            params = func.get("parameters", {})
-
-            lines.append(f"- {name}: {desc}")
-            if "properties" in params:
-                for param_name, param_info in params["properties"].items():
-                    required = " (必需)" if param_name in params.get("required", []) else ""
-                    lines.append(f"    {param_name}: {param_info.get('description', '')}{required}")
-
-        return "\n".join(lines)
-
-    async def generate(
-        self,
-        messages: list[dict],
-        temperature: float = 0.7,
-        max_tokens: int = 2000,
-        response_format: Optional[dict] = None
-    ) -> str:
-        """普通文本生成"""
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(
-            None,
-            lambda: self.client.generate(messages, temperature, max_tokens, response_format)
-        )
-
-    async def stream_generate(
-        self,
-        messages: list[dict],
-        temperature: float = 0.7,
-        max_tokens: int = 2000
-    ) -> AsyncGenerator[str, None]:
-        """流式文本生成 - 真正的异步流式"""
-        import threading
-        import queue as thread_queue
-
-        _loop = asyncio.get_event_loop()  # noqa: F841 - reserved for future async operations
-        chunk_queue: thread_queue.Queue = thread_queue.Queue()
-        done_event = threading.Event()
-        exception_holder = [None]
-
-        def run_stream():
-            """在后台线程运行同步生成器"""
-            try:
-                for chunk in self.client.stream_generate(messages, temperature, max_tokens):
-                    chunk_queue.put(chunk)
-            except Exception as e:
-                exception_holder[0] = e
-            finally:
-                done_event.set()
-
-        # 启动后台线程
-        thread = threading.Thread(target=run_stream, daemon=True)
-        thread.start()
-
-        # 异步 yield chunks
-        while not done_event.is_set() or not chunk_queue.empty():
-            try:
-                chunk = chunk_queue.get(timeout=0.01)
-                yield chunk
-            except thread_queue.Empty:
-                await asyncio.sleep(0.001)  # 短暂让出控制权
 
-        # 检查是否有异常
-        if exception_holder[0]:
-            raise exception_holder[0]
+# 客户端类名 -> 适配器类
+_ADAPTER_BY_CLASS: dict[str, type[LLMAdapter]] = {
+    "OpenAIClient": OpenAICompatibleAdapter,
+    "MiniMaxClient": OpenAICompatibleAdapter,
+    "OllamaClient": OllamaAdapter,
+}
 
 
 def create_llm_adapter(llm_client) -> LLMAdapter:
@@ -463,13 +630,11 @@ def create_llm_adapter(llm_client) -> LLMAdapter:
     Returns:
         LLMAdapter 实例
     """
-    class_name = llm_client.__class__.__name__
+    class_name = type(llm_client).__name__
+    adapter_cls = _ADAPTER_BY_CLASS.get(class_name)
 
-    if class_name in ["OpenAIClient", "MiniMaxClient"]:
-        return OpenAICompatibleAdapter(llm_client)
-    elif class_name == "OllamaClient":
-        return OllamaAdapter(llm_client)
-    else:
+    if adapter_cls is None:
         # 默认使用 OpenAI 兼容适配器
-        logger.warning(f"未知的 LLM 客户端类型: {class_name}，尝试使用 OpenAI 兼容适配器")
-        return OpenAICompatibleAdapter(llm_client)
+        logger.warning("未知的 LLM 客户端类型: %s，尝试使用 OpenAI 兼容适配器", class_name)
+        adapter_cls = OpenAICompatibleAdapter
+    return adapter_cls(llm_client)
@@ -0,0 +1,280 @@
+# -*- coding: utf-8 -*-
+"""
+执行计划语义缓存
+
+对用户输入做嵌入，余弦相似度足够高时直接复用之前 LLM 生成的执行计划，
+跳过规划阶段的 LLM 调用。
+
+- L1: 精确文本 LRU（命中无需计算嵌入）
+- L2: 归一化嵌入矩阵上的内积检索（等价于 FAISS IndexFlatIP）
+- 命中前按意图关键词校验，避免 "清理" / "查看" 这类近义误命中
+- 可选 SQLite 持久化
+"""
+import asyncio
+import copy
+import logging
+import sqlite3
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Optional
+
+import numpy as np
+
+from .intent_keywords import (
+    INTENT_MATCHER,
+    KW_CLEAR_TASKS,
+    KW_COMPLETE_TASK,
+    KW_CREATE_TASK,
+    KW_DELETE_TASK,
+    KW_LIST_TASKS,
+    KW_REFLECT_DELETE,
+    KW_REFLECT_VIEW,
+    KW_VIEW_TASK,
+)
+from .tools.base import CONFIRM_PARAMS
+from ..utils.helpers import json_dumps, json_loads
+
+logger = logging.getLogger('agent.plan_cache')
+
+# 各执行模式的命中阈值：多步计划选错工具代价更高，阈值更严格
+DEFAULT_THRESHOLDS = {
+    'single_step': 0.92,
+    'multi_step': 0.95,
+}
+
+# 计划缓存的意图类别：由 Supervisor 共用的关键词位合并而成
+# "帮我清理任务" 和 "帮我查看任务" 嵌入非常接近，却需要相反的工具，
+# 命中前要求两边的意图类别完全一致
+INTENT_GROUPS: tuple[int, ...] = (
+    KW_REFLECT_DELETE | KW_DELETE_TASK | KW_CLEAR_TASKS,  # 删除
+    KW_REFLECT_VIEW | KW_VIEW_TASK | KW_LIST_TASKS,       # 查看
+    KW_COMPLETE_TASK,                                     # 完成
+    KW_CREATE_TASK,                                       # 创建
+)
+
+
+def intent_mask(text: str) -> int:
+    """计算文本命中的意图类别位掩码（每个 INTENT_GROUPS 类别一位）"""
+    bits = INTENT_MATCHER.match(text.lower())
+    mask = 0
+    for index, group in enumerate(INTENT_GROUPS):
+        if bits & group:
+            mask |= 1 << index
+    return mask
+
+
+def _contains_str(value) -> bool:
+    """值中（包括嵌套的列表/字典）是否含有字符串"""
+    if isinstance(value, str):
+        return True
+    if isinstance(value, dict):
+        return any(_contains_str(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return any(_contains_str(v) for v in value)
+    return False
+
+
+def same_intent(query: str, cached_query: str) -> bool:
+    """校验两个输入的意图类别是否一致（计划缓存的默认命中校验）"""
+    return intent_mask(query) == intent_mask(cached_query)
+
+
+class PlanCache:
+    """
+    执行计划语义缓存
+
+    缓存内容是与执行模式绑定的步骤列表 [{"tool": str, "params": dict}]，
+    命中时返回深拷贝，调用方可以放心修改参数。
+    """
+
+    def __init__(
+        self,
+        embedding_func: Callable[[str], list[float]],
+        db_path: Optional[str] = None,
+        max_entries: int = 1000,
+        lru_size: int = 1000,
+        thresholds: Optional[dict[str, float]] = None,
+        verifier: Optional[Callable[[str, str], bool]] = same_intent
+    ):
+        self.embedding_func = embedding_func
+        self.verifier = verifier
+        self.max_entries = max_entries
+        self.lru_size = lru_size
+        self.thresholds = {**DEFAULT_THRESHOLDS, **(thresholds or {})}
+
+        # L1: (mode, query) -> steps
+        self._lru: OrderedDict[tuple[str, str], list[dict]] = OrderedDict()
+
+        # L2: 每个模式一个索引，行与条目一一对应
+        self._vectors: dict[str, Optional[np.ndarray]] = {}
+        self._entries: dict[str, list[tuple[str, list[dict]]]] = {}
+
+        # 最近一次计算的嵌入：未命中后紧接着 store 同一输入时复用
+        self._last_embedding: tuple[Optional[str], Optional[np.ndarray]] = (None, None)
+
+        self._conn: Optional[sqlite3.Connection] = None
+        if db_path:
+            self._init_db(Path(db_path))
+
+        self.stats = {'hits': 0, 'misses': 0}
+
+    @staticmethod
+    def is_cacheable(steps: list[dict]) -> bool:
+        """
+        判断步骤是否可以缓存
+
+        字符串参数（任意嵌套层级）通常是从用户输入中抽取的内容（标题、查询词、
+        任务ID），相似但不同的输入需要不同的值，这类计划不缓存。
+        带确认参数的步骤也不缓存，避免相似输入跳过确认直接执行。
+        """
+        return bool(steps) and not any(
+            key in CONFIRM_PARAMS or _contains_str(value)
+            for step in steps
+            for key, value in step.get("params", {}).items()
+        )
+
+    def _init_db(self, db_path: Path):
+        """初始化持久化存储并加载已有条目"""
+        try:
+            db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS plan_cache (
+                    mode TEXT NOT NULL,
+                    query TEXT NOT NULL,
+                    embedding BLOB NOT NULL,
+                    steps TEXT NOT NULL,
+                    PRIMARY KEY (mode, query)
+                )
+            """)
+            self._conn.commit()
+
+            rows = self._conn.execute(
+                "SELECT mode, query, embedding, steps FROM plan_cache ORDER BY rowid"
+            ).fetchall()
+            for mode, query, blob, steps in rows:
+                vector = np.frombuffer(blob, dtype=np.float32)
+                self._add(mode, query, vector, json_loads(steps))
+            logger.info(f"计划缓存已加载 {len(rows)} 条: {db_path}")
+        except sqlite3.Error as e:
+            logger.warning(f"计划缓存持久化不可用: {e}")
+            self._conn = None
+
+    async def _embed(self, query: str) -> np.ndarray:
+        """计算归一化嵌入（嵌入函数是同步的，放到线程中执行）"""
+        last_query, last_vector = self._last_embedding
+        if query == last_query:
+            return last_vector
+
+        raw = await asyncio.to_thread(self.embedding_func, query)
+        vector = np.asarray(raw, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector = vector / norm
+        self._last_embedding = (query, vector)
+        return vector
+
+    def _add(self, mode: str, query: str, vector: np.ndarray, steps: list[dict]):
+        """加入向量索引，超出容量时淘汰最早的条目"""
+        entries = self._entries.setdefault(mode, [])
+        matrix = self._vectors.get(mode)
+
+        if matrix is not None and matrix.shape[1] != vector.shape[0]:
+            # 嵌入维度变化（切换了嵌入提供商），旧索引作废
+            entries.clear()
+            matrix = None
+
+        entries.append((query, steps))
+        row = vector[np.newaxis, :]
+        matrix = row if matrix is None else np.vstack((matrix, row))
+
+        if len(entries) > self.max_entries:
+            del entries[0]
+            matrix = matrix[1:]
+        self._vectors[mode] = matrix
+
+    def _remember(self, mode: str, query: str, steps: list[dict]):
+        """写入 L1 LRU"""
+        key = (mode, query)
+        self._lru[key] = steps
+        self._lru.move_to_end(key)
+        if len(self._lru) > self.lru_size:
+            self._lru.popitem(last=False)
+
+    async def lookup(self, query: str, mode: str) -> Optional[list[dict]]:
+        """
+        查找缓存的执行步骤
+
+        Args:
+            query: 用户输入
+            mode: 执行模式（ExecutionMode.value）
+
+        Returns:
+            步骤列表的副本，未命中返回 None
+        """
+        key = (mode, query)
+        steps = self._lru.get(key)
+        if steps is not None:
+            self._lru.move_to_end(key)
+            self.stats['hits'] += 1
+            return copy.deepcopy(steps)
+
+        matrix = self._vectors.get(mode)
+        if matrix is None:
+            self.stats['misses'] += 1
+            return None
+
+        vector = await self._embed(query)
+        if vector.shape[0] != matrix.shape[1]:
+            self.stats['misses'] += 1
+            return None
+
+        scores = matrix @ vector
+        candidates = np.flatnonzero(scores >= self.thresholds.get(mode, 1.0))
+
+        # 按相似度从高到低，取第一个通过意图校验的条目
+        for index in candidates[np.argsort(-scores[candidates])]:
+            cached_query, steps = self._entries[mode][index]
+            if self.verifier and not self.verifier(query, cached_query):
+                logger.debug(f"计划缓存校验未通过: '{query}' vs '{cached_query}'")
+                continue
+
+            logger.debug(f"计划缓存命中: '{query}' ≈ '{cached_query}' ({scores[index]:.3f})")
+            self.stats['hits'] += 1
+            self._remember(mode, query, steps)
+            return copy.deepcopy(steps)
+
+        self.stats['misses'] += 1
+        return None
+
+    async def store(self, query: str, mode: str, steps: list[dict]):
+        """
+        缓存 LLM 生成的执行步骤
+
+        Args:
+            query: 用户输入
+            mode: 执行模式（ExecutionMode.value）
+            steps: 步骤列表 [{"tool": str, "params": dict}]
+        """
+        steps = copy.deepcopy(steps)
+        vector = await self._embed(query)
+        self._add(mode, query, vector, steps)
+        self._remember(mode, query, steps)
+
+        if self._conn is not None:
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO plan_cache (mode, query, embedding, steps) "
+                    "VALUES (?, ?, ?, ?)",
+                    (mode, query, vector.astype(np.float32).tobytes(),
+                     json_dumps(steps).decode('utf-8'))
+                )
+                self._conn.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"计划缓存持久化失败: {e}")
+
+    def close(self):
+        """关闭持久化连接"""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
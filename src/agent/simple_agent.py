@@ -10,6 +10,7 @@ SimpleAgent - 简化版 Agent
 参考: docs/plans/optimization-proposal-v2.md
 """
 import logging
+import re
 import time
 from dataclasses import dataclass, field
 from typing import Any, AsyncGenerator, Optional
@@ -20,8 +21,32 @@ from .llm_adapter import LLMAdapter, LLMResponse
 
 logger = logging.getLogger('agent.simple')
 
+# 确认/取消关键词（子串匹配，忽略大小写）
+_CONFIRM_RE = re.compile(r'是|确认|确定|yes|ok|好的', re.IGNORECASE)
+_CANCEL_RE = re.compile(r'否|取消|no|cancel|算了', re.IGNORECASE)
 
-@dataclass
+# 上下文保留的最近对话条数
+HISTORY_WINDOW = 10
+
+
+def _describe_tool(tool: Any) -> str:
+    """渲染单个工具的描述"""
+    desc = f"- `{tool.name}`: {tool.description}"
+    if hasattr(tool, 'parameters') and tool.parameters:
+        params = ", ".join(tool.parameters.get('properties', {}).keys())
+        if params:
+            desc += f"\n  参数: {params}"
+    return desc
+
+
+def _recent_history(history: list[dict]) -> list[dict]:
+    """保留最近 HISTORY_WINDOW 条对话，足够短时不复制"""
+    if len(history) <= HISTORY_WINDOW:
+        return history
+    return history[-HISTORY_WINDOW:]
+
+
+@dataclass(slots=True)
 class AgentContext:
     """Agent 上下文"""
     session_id: str
@@ -31,7 +56,7 @@ class AgentContext:
     personality: str = ""
 
 
-@dataclass
+@dataclass(slots=True)
 class PendingAction:
     """待确认的操作"""
     tool_name: str
@@ -75,6 +100,15 @@ class SimpleAgent:
         # 待确认的操作
         self._pending_action: Optional[PendingAction] = None
 
+        # (注册表版本, 工具描述)
+        self._tools_desc_cache: tuple[int, str] = (-1, "")
+
+        # 没有记忆和人格时跳过对应的检索
+        if memory_system or personality_manager:
+            self._build_context = self._build_context_full
+        else:
+            self._build_context = self._build_context_minimal
+
         # 统计
         self.stats = {
             "total_requests": 0,
@@ -112,6 +146,8 @@ class SimpleAgent:
 
         # 3. Agent Loop
         messages = self._build_messages(context)
+        # 单次请求内注册表不变，循环外取一次工具定义
+        tools = self.tools.get_tool_definitions()
 
         iteration = 0
         while iteration < self.max_iterations:
@@ -119,7 +155,7 @@ class SimpleAgent:
             self.stats["llm_calls"] += 1
 
             # 调用 LLM
-            response = await self._call_llm(messages)
+            response = await self._call_llm(messages, tools)
 
             if response.has_tool_calls:
                 # 执行工具调用
@@ -141,7 +177,7 @@ class SimpleAgent:
                     messages.append({
                         "role": "tool",
                         "tool_call_id": tool_call.id,
-                        "content": result.content if hasattr(result, 'content') else str(result)
+                        "content": result.to_message_content()
                     })
                     self.stats["tool_calls"] += 1
             else:
@@ -155,10 +191,8 @@ class SimpleAgent:
 
     async def _handle_confirmation(self, user_input: str) -> AsyncGenerator[str, None]:
         """处理确认/取消"""
-        normalized = user_input.lower().strip()
-
         # 检查确认
-        if any(word in normalized for word in ["是", "确认", "确定", "yes", "ok", "好的"]):
+        if _CONFIRM_RE.search(user_input):
             action = self._pending_action
             self._pending_action = None
 
@@ -168,11 +202,11 @@ class SimpleAgent:
             if result.success:
                 yield f"✅ 已执行: {action.description}"
             else:
-                yield f"❌ 执行失败: {result.content if hasattr(result, 'content') else str(result)}"
+                yield f"❌ 执行失败: {result.to_message_content()}"
             return
 
         # 检查取消
-        if any(word in normalized for word in ["否", "取消", "no", "cancel", "算了"]):
+        if _CANCEL_RE.search(user_input):
             self._pending_action = None
             yield "已取消操作。"
             return
@@ -181,7 +215,20 @@ class SimpleAgent:
         self._pending_action = None
         yield "操作已取消。"
 
-    async def _build_context(
+    async def _build_context_minimal(
+        self,
+        user_input: str,
+        session_id: str,
+        history: list[dict]
+    ) -> AgentContext:
+        """构建上下文（无记忆、无人格）"""
+        return AgentContext(
+            session_id=session_id,
+            user_input=user_input,
+            history=_recent_history(history)
+        )
+
+    async def _build_context_full(
         self,
         user_input: str,
         session_id: str,
@@ -191,7 +238,7 @@ class SimpleAgent:
         context = AgentContext(
             session_id=session_id,
             user_input=user_input,
-            history=history[-10:]  # 保留最近 10 轮对话
+            history=_recent_history(history)
         )
 
         # 添加记忆上下文
@@ -199,7 +246,7 @@ class SimpleAgent:
             try:
                 context.memory_context = self.memory.recall(user_input, top_k=3)
             except Exception as e:
-                logger.warning(f"记忆检索失败: {e}")
+                logger.warning("记忆检索失败: %s", e)
 
         # 添加人格
         if self.personality:
@@ -208,25 +255,18 @@ class SimpleAgent:
                 if personality:
                     context.personality = f"你是{personality.name}，{personality.description}"
             except Exception as e:
-                logger.warning(f"获取人格失败: {e}")
+                logger.warning("获取人格失败: %s", e)
 
         return context
 
     def _build_messages(self, context: AgentContext) -> list[dict]:
         """构建消息列表"""
-        messages = []
-
-        # 系统提示
-        system_prompt = self._build_system_prompt(context)
-        messages.append({"role": "system", "content": system_prompt})
-
-        # 历史对话
-        messages.extend(context.history)
-
-        # 当前输入
-        messages.append({"role": "user", "content": context.user_input})
-
-        return messages
+        # 系统提示 + 历史对话 + 当前输入，一次性按最终长度构建
+        return [
+            {"role": "system", "content": self._build_system_prompt(context)},
+            *context.history,
+            {"role": "user", "content": context.user_input},
+        ]
 
     def _build_system_prompt(self, context: AgentContext) -> str:
         """构建系统提示"""
@@ -266,33 +306,35 @@ class SimpleAgent:
         return "\n".join(parts)
 
     def _get_tools_description(self) -> str:
-        """获取工具描述"""
-        descriptions = []
-        for tool in self.tools.get_all_tools():
-            desc = f"- `{tool.name}`: {tool.description}"
-            if hasattr(tool, 'parameters') and tool.parameters:
-                params = ", ".join(tool.parameters.get('properties', {}).keys())
-                if params:
-                    desc += f"\n  参数: {params}"
-            descriptions.append(desc)
-        return "\n".join(descriptions)
-
-    async def _call_llm(self, messages: list[dict]) -> LLMResponse:
+        """获取工具描述（工具集未变化时复用上次结果）"""
+        version = self.tools.version
+        cached_version, cached_desc = self._tools_desc_cache
+        if version == cached_version:
+            return cached_desc
+
+        tools_desc = self._render_tools_description()
+        self._tools_desc_cache = (version, tools_desc)
+        return tools_desc
+
+    def _render_tools_description(self) -> str:
+        """渲染工具描述"""
+        return "\n".join(_describe_tool(tool) for tool in self.tools.get_all_tools())
+
+    async def _call_llm(self, messages: list[dict], tools: list[dict]) -> LLMResponse:
         """调用 LLM"""
-        tools = self.tools.get_tool_definitions()
         return await self.llm.chat(messages=messages, tools=tools)
 
     async def _execute_tool(self, name: str, params: dict) -> ToolResult:
         """执行工具"""
-        start_time = time.time()
+        start_time = time.perf_counter()
         try:
             result = await self.tools.execute(name, params)
-            duration = time.time() - start_time
-            logger.info(f"工具执行完成: {name}, 耗时: {duration:.2f}s")
+            duration = time.perf_counter() - start_time
+            logger.info("工具执行完成: %s, 耗时: %.2fs", name, duration)
             return result
         except Exception as e:
-            logger.error(f"工具执行失败: {name}, 错误: {e}")
-            return ToolResult(success=False, content=f"执行失败: {str(e)}")
+            logger.error("工具执行失败: %s, 错误: %s", name, e)
+            return ToolResult(success=False, data=None, observation=f"执行失败: {str(e)}", error=str(e))
 
     def _format_confirmation_prompt(self) -> str:
         """格式化确认提示"""
@@ -7,23 +7,255 @@ Supervisor Agent
 """
 import asyncio
 import inspect
-import json
 import logging
+import math
 import time
+from array import array
+from collections import deque
 from dataclasses import dataclass, field
 from enum import Enum
+from contextlib import aclosing
 from functools import wraps
 from typing import AsyncGenerator, Optional, TYPE_CHECKING
 
-from .tools.base import ToolResult
+from .intent_keywords import (
+    INTENT_MATCHER,
+    KW_CLEAR_TASKS,
+    KW_DELETE_TASK,
+    KW_LIST_TASKS,
+    KW_MULTI,
+    KW_REFLECT_DELETE,
+    KW_REFLECT_DELETE_STRICT,
+    KW_REFLECT_VIEW,
+    KW_SIMPLE,
+    KW_VIEW_TASK,
+)
+from .tools.base import CONFIRM_PARAMS, ToolResult
 from .tools.registry import ToolRegistry
 from .llm_adapter import create_llm_adapter, LLMAdapter
+from ..utils.helpers import json_loads
 
 if TYPE_CHECKING:
     from memory import MemorySystem
+    from .plan_cache import PlanCache
 
 logger = logging.getLogger('agent.supervisor')
 
+# 意图明确的短句直接生成单步计划，跳过 LLM 规划
+# delete_tasks 未确认时只列出待删除任务并请求确认，误判的代价是一次确认提示
+STATIC_PLAN_MAX_LEN = 12
+STATIC_PLANS: tuple[tuple[int, str, dict], ...] = (
+    (KW_CLEAR_TASKS, "delete_tasks", {"delete_all": True, "confirmed": False}),
+    (KW_LIST_TASKS, "list_tasks", {}),
+)
+# 静态计划关键词本身会连带命中的类别；掩码中出现其余任何类别（创建、完成、多步等）都交给 LLM
+STATIC_PLAN_BITS = (
+    KW_CLEAR_TASKS | KW_DELETE_TASK | KW_REFLECT_DELETE | KW_REFLECT_DELETE_STRICT
+    | KW_LIST_TASKS | KW_VIEW_TASK | KW_REFLECT_VIEW
+)
+
+
+
+# 对话与单步规划最多注入的记忆条数（多步规划使用 context_memory_limit）
+CHAT_MEMORY_TOP_K = 3
+
+# 待确认操作的回复词：整句完全匹配（"算了吧，再帮我做一次" 不算取消）
+CONFIRMATION_WORDS = frozenset({'确认', 'yes', '是', '确定', '好的', '执行', '删除', '清理'})
+CANCEL_WORDS = frozenset({'取消', 'cancel', 'no', '否', '不', '算了', '不要'})
+
+# 对话系统提示模板（只有当前时间会变化）
+_BASE_SYSTEM_TMPL = """你是用户的个人 AI 助手，性格友好、高效、可靠。
+
+【当前时间】{current_time}
+
+【核心职责】
+1. 准确理解用户意图，选择正确的工具执行任务
+2. 当用户说"清理"、"删除"、"移除"时，应该执行删除操作，而不是只查看
+3. 当用户说"查看"、"显示"、"有什么"时，才执行查看操作
+
+【工具选择指南】
+- 用户说"清理任务/删除任务" → delete_tasks（执行删除）
+- 用户说"查看任务/有什么任务" → list_tasks（仅查看）
+- 用户说"完成任务" → complete_task
+- 用户说"创建任务/提醒我" → create_task"""
+
+# 单步规划追加的强制性工具选择规则（关键！）
+_TOOL_SELECTION_RULES = """
+
+【强制性工具选择规则】
+你必须根据用户输入的关键词选择正确的工具：
+1. 关键词包含"清理"、"删除"、"移除"、"清空" → 必须使用 delete_tasks
+2. 关键词包含"查看"、"显示"、"有什么"、"列出" → 使用 list_tasks
+3. 关键词包含"完成"、"做完了" → 使用 complete_task
+4. 关键词包含"创建"、"添加"、"提醒我" → 使用 create_task
+
+【Few-shot 示例】
+输入: "帮我清理这些任务" → 工具: delete_tasks
+输入: "删除无效的任务" → 工具: delete_tasks
+输入: "我有什么任务" → 工具: list_tasks
+输入: "查看待办列表" → 工具: list_tasks
+输入: "完成任务 xxx" → 工具: complete_task
+输入: "提醒我明天开会" → 工具: create_task"""
+
+# 多步规划提示模板（静态部分只构建一次）
+_MULTI_STEP_PROMPT_TMPL = """【当前时间】{current_time}
+
+【任务分析】
+分析用户需求，选择正确的工具执行任务。
+
+【用户输入】
+{user_input}{memory_context}
+
+【可用工具】
+{tools}
+
+【工具选择规则】（非常重要！）
+1. "清理任务"、"删除任务"、"清空列表" → 必须使用 delete_tasks
+2. "查看任务"、"有什么任务"、"显示列表" → 使用 list_tasks
+3. "完成任务"、"做完了" → 使用 complete_task
+4. "创建任务"、"提醒我" → 使用 create_task
+
+【正确示例】
+示例1:
+输入: "帮我清理这些任务"
+输出: {{"goal": "清理用户的任务列表", "steps": [{{"tool": "delete_tasks", "params": {{"delete_all": true, "confirmed": false}}, "reason": "用户说清理任务，需要执行删除操作"}}]}}
+
+示例2:
+输入: "删除无效的任务"
+输出: {{"goal": "删除无效任务", "steps": [{{"tool": "delete_tasks", "params": {{"confirmed": false}}, "reason": "用户要删除任务，使用 delete_tasks"}}]}}
+
+示例3:
+输入: "我有什么待办事项"
+输出: {{"goal": "查看任务列表", "steps": [{{"tool": "list_tasks", "params": {{}}, "reason": "用户只是想查看，不是删除"}}]}}
+
+【错误示例】❌
+输入: "帮我清理这些任务"
+错误输出: {{"goal": "查看任务", "steps": [{{"tool": "list_tasks", ...}}]}}  // 错误！用户说"清理"应该用 delete_tasks
+
+现在请分析用户输入并生成执行计划，返回 JSON 格式：
+{{
+    "goal": "任务目标",
+    "steps": [
+        {{"tool": "工具名", "params": {{"参数名": "值"}}, "reason": "选择此工具的理由", "depends_on": [0]}}
+    ]
+}}
+depends_on 填写必须先完成的步骤序号（从 0 开始），与前面步骤无关时省略。"""
+
+
+class _JsonObjectScanner:
+    """
+    增量扫描文本，提取第一个完整的顶层 JSON 对象
+
+    跟踪括号深度和字符串状态，对象闭合时即可返回，
+    不需要等待完整响应，也不依赖贪婪正则。
+    """
+
+    __slots__ = ('_parts', '_depth', '_in_string', '_escape')
+
+    def __init__(self):
+        self._parts: list[str] = []
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+
+    def feed(self, chunk: str) -> Optional[str]:
+        """输入一段文本，第一个对象闭合时返回该对象的完整文本"""
+        start = 0 if self._depth else None
+        for i, ch in enumerate(chunk):
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == '\\':
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '{':
+                if self._depth == 0:
+                    start = i
+                self._depth += 1
+            elif self._depth:
+                if ch == '"':
+                    self._in_string = True
+                elif ch == '}':
+                    self._depth -= 1
+                    if self._depth == 0:
+                        self._parts.append(chunk[start:i + 1])
+                        return "".join(self._parts)
+
+        if self._depth:
+            self._parts.append(chunk[start:])
+        return None
+
+
+# 延迟直方图：64 个 log2 桶，第 i 个桶覆盖 [2^i, 2^(i+1)) 微秒
+LATENCY_BUCKETS = 64
+MAX_RECORDED_ERRORS = 1000  # 只保留最近的错误明细，总数单独计数
+LATENCY_UNIT_NS = 1_000  # 第 0 个桶的上界：1 微秒
+NS_PER_SEC = 1_000_000_000
+
+
+class LatencyHistogram:
+    """
+    固定大小的延迟直方图
+
+    记录为 O(1) 的整数自增，内存固定；同时维护 count / sum / min / max，
+    均值 O(1)，分位数扫描 64 个桶。直方图可以合并。
+
+    记录使用整数纳秒，桶下标用 bit_length 计算，热路径上没有浮点运算；
+    均值和分位数以秒返回。
+    """
+
+    __slots__ = ('buckets', 'count', 'total', 'min', 'max')
+
+    def __init__(self):
+        self.buckets = array('Q', bytes(8 * LATENCY_BUCKETS))
+        self.count = 0
+        self.total = 0
+        self.min = math.inf
+        self.max = 0
+
+    def record(self, duration_ns: int):
+        """记录一次耗时（纳秒）"""
+        index = (duration_ns // LATENCY_UNIT_NS).bit_length() - 1
+        self.buckets[min(max(index, 0), LATENCY_BUCKETS - 1)] += 1
+        self.count += 1
+        self.total += duration_ns
+        if duration_ns < self.min:
+            self.min = duration_ns
+        if duration_ns > self.max:
+            self.max = duration_ns
+
+    def merge(self, other: 'LatencyHistogram'):
+        """合并另一个直方图"""
+        for i, n in enumerate(other.buckets):
+            self.buckets[i] += n
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def mean(self) -> float:
+        """平均耗时（秒）"""
+        return self.total / self.count / NS_PER_SEC if self.count else 0
+
+    def percentile(self, q: float) -> float:
+        """
+        估算分位数（秒）
+
+        返回目标样本所在桶的上界，并限制在 [min, max] 内
+        """
+        if not self.count:
+            return 0
+        rank = max(1, math.ceil(self.count * q / 100))
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if seen >= rank:
+                upper = (1 << (i + 1)) * LATENCY_UNIT_NS
+                return min(max(upper, self.min), self.max) / NS_PER_SEC
+        return self.max / NS_PER_SEC
+
 
 class MetricsCollector:
     """性能指标收集器"""
@@ -31,30 +263,39 @@ class MetricsCollector:
     def __init__(self):
         self.metrics = {
             'llm_calls': 0,
-            'llm_latency': [],
+            'llm_latency': LatencyHistogram(),
             'tool_calls': {},
             'tool_latency': {},
+            'timings': {},
             'mode_usage': {
                 'fast_path': 0,
                 'single_step': 0,
                 'multi_step': 0
             },
-            'errors': []
+            'errors': deque(maxlen=MAX_RECORDED_ERRORS),
+            'error_count': 0
         }
 
-    def record_llm_call(self, duration: float):
-        """记录 LLM 调用"""
+    def record_llm_call(self, duration_ns: int):
+        """记录 LLM 调用（耗时单位：纳秒）"""
         self.metrics['llm_calls'] += 1
-        self.metrics['llm_latency'].append(duration)
+        self.metrics['llm_latency'].record(duration_ns)
 
-    def record_tool_call(self, tool_name: str, duration: float, success: bool):
-        """记录工具调用"""
+    def record_tool_call(self, tool_name: str, duration_ns: int, success: bool):
+        """记录工具调用（耗时单位：纳秒）"""
         if tool_name not in self.metrics['tool_calls']:
             self.metrics['tool_calls'][tool_name] = {'success': 0, 'failed': 0}
-            self.metrics['tool_latency'][tool_name] = []
+            self.metrics['tool_latency'][tool_name] = LatencyHistogram()
 
         self.metrics['tool_calls'][tool_name]['success' if success else 'failed'] += 1
-        self.metrics['tool_latency'][tool_name].append(duration)
+        self.metrics['tool_latency'][tool_name].record(duration_ns)
+
+    def record_timing(self, name: str, duration_ns: int):
+        """记录 @timed 方法的耗时（纳秒）"""
+        histogram = self.metrics['timings'].get(name)
+        if histogram is None:
+            histogram = self.metrics['timings'][name] = LatencyHistogram()
+        histogram.record(duration_ns)
 
     def record_mode(self, mode: str):
         """记录执行模式使用"""
@@ -62,57 +303,82 @@ class MetricsCollector:
 
     def record_error(self, error: str):
         """记录错误"""
-        self.metrics['errors'].append({'time': time.time(), 'error': error})
+        self.metrics['errors'].append({'time': time.time_ns(), 'error': error})
+        self.metrics['error_count'] += 1
 
     def get_summary(self) -> dict:
         """获取统计摘要"""
+        llm_latency = self.metrics['llm_latency']
         summary = {
             'llm_calls': self.metrics['llm_calls'],
-            'llm_avg_latency': sum(self.metrics['llm_latency']) / len(self.metrics['llm_latency']) if self.metrics['llm_latency'] else 0,
+            'llm_avg_latency': llm_latency.mean,
+            'llm_latency_percentiles': {
+                'p50': llm_latency.percentile(50),
+                'p95': llm_latency.percentile(95),
+                'p99': llm_latency.percentile(99),
+            },
             'tool_usage': self.metrics['tool_calls'],
             'mode_distribution': self.metrics['mode_usage'],
-            'error_count': len(self.metrics['errors'])
+            'error_count': self.metrics['error_count']
         }
 
         # 计算各工具平均延迟
-        tool_avg_latency = {}
-        for tool_name, latencies in self.metrics['tool_latency'].items():
-            if latencies:
-                tool_avg_latency[tool_name] = sum(latencies) / len(latencies)
-        summary['tool_avg_latency'] = tool_avg_latency
+        summary['tool_avg_latency'] = {
+            tool_name: histogram.mean
+            for tool_name, histogram in self.metrics['tool_latency'].items()
+            if histogram.count
+        }
+
+        # 各阶段耗时
+        summary['timings'] = {
+            name: {'avg': histogram.mean, 'p95': histogram.percentile(95)}
+            for name, histogram in self.metrics['timings'].items()
+        }
 
         return summary
 
 
 def timed(metric_name: str = None):
-    """性能计时装饰器（支持异步函数和异步生成器）"""
+    """
+    性能计时装饰器（支持异步函数和异步生成器）
+
+    耗时记录到 self.metrics（MetricsCollector）中，DEBUG 日志开启时同时输出日志。
+    未指定 metric_name 且 DEBUG 未开启时不做包装。
+    """
     def decorator(func):
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            start = time.time()
-            name = metric_name or func.__name__
-
-            # 使用 inspect 更可靠地检测异步生成器
-            if inspect.isasyncgenfunction(func):
-                # 异步生成器
-                async def async_gen_wrapper():
-                    try:
-                        async for item in func(*args, **kwargs):
+        if metric_name is None and not logger.isEnabledFor(logging.DEBUG):
+            return func
+
+        name = metric_name or func.__name__
+
+        def finish(args, start: int):
+            duration_ns = time.perf_counter_ns() - start
+            metrics = getattr(args[0], 'metrics', None) if args else None
+            if isinstance(metrics, MetricsCollector):
+                metrics.record_timing(name, duration_ns)
+            logger.debug("[性能] %s: %.3fs", name, duration_ns / NS_PER_SEC)
+
+        # 在装饰时判断函数类型，而不是每次调用时
+        if inspect.isasyncgenfunction(func):
+            @wraps(func)
+            async def async_gen_wrapper(*args, **kwargs):
+                start = time.perf_counter_ns()
+                try:
+                    async with aclosing(func(*args, **kwargs)) as agen:
+                        async for item in agen:
                             yield item
-                    finally:
-                        duration = time.time() - start
-                        logger.debug(f"[性能] {name}: {duration:.3f}s")
-                return async_gen_wrapper()
-            else:
-                # 普通异步函数
-                async def async_wrapper():
-                    try:
-                        return await func(*args, **kwargs)
-                    finally:
-                        duration = time.time() - start
-                        logger.debug(f"[性能] {name}: {duration:.3f}s")
-                return async_wrapper()
-        return wrapper
+                finally:
+                    finish(args, start)
+            return async_gen_wrapper
+
+        @wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            start = time.perf_counter_ns()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                finish(args, start)
+        return async_wrapper
     return decorator
 
 
@@ -123,18 +389,19 @@ class ExecutionMode(Enum):
     MULTI_STEP = "multi_step"    # Tier 4: 多步 Agent 模式
 
 
-@dataclass
+@dataclass(slots=True)
 class Step:
     """执行步骤"""
     id: str
     tool_name: str
     parameters: dict
     status: str = "pending"  # pending, running, completed, failed
+    depends_on: list[str] = field(default_factory=list)  # 必须先完成的步骤 ID
     result: Optional[ToolResult] = None
     observation: str = ""
 
 
-@dataclass
+@dataclass(slots=True)
 class ExecutionPlan:
     """执行计划"""
     mode: ExecutionMode
@@ -158,7 +425,7 @@ class ExecutionPlan:
         return self.current
 
 
-@dataclass
+@dataclass(slots=True)
 class AgentContext:
     """Agent 上下文"""
     session_id: str
@@ -166,6 +433,8 @@ class AgentContext:
     plan: Optional[ExecutionPlan] = None
     history: list[dict] = field(default_factory=list)
     metadata: dict = field(default_factory=dict)
+    memory_snippet: Optional[str] = None  # 本轮检索到的记忆，None 表示尚未检索
+    user_input_lower: Optional[str] = None  # strip + lower 后的输入，供关键词判断复用
 
 
 class SupervisorAgent:
@@ -189,34 +458,61 @@ class SupervisorAgent:
         retry_attempts: int = 3,
         retry_delay: float = 1.0,
         enable_memory_context: bool = True,
-        context_memory_limit: int = 5
+        context_memory_limit: int = 5,
+        plan_cache: Optional['PlanCache'] = None,
+        max_parallel_steps: int = 3
     ):
         self.llm: LLMAdapter = create_llm_adapter(llm_client)
         self.tools = tool_registry
         self.fast_path = fast_path_classifier
         self.memory = memory_system
         self.max_steps = max_steps
+        self.max_parallel_steps = max_parallel_steps
         self.retry_attempts = retry_attempts
         self.retry_delay = retry_delay
         self.enable_memory_context = enable_memory_context
         self.context_memory_limit = context_memory_limit
-        self.schemas = tool_registry.get_schemas()
         self._current_context: Optional[AgentContext] = None
         self.metrics = MetricsCollector()
         self.enable_streaming = True  # 默认启用流式输出
+        self.plan_cache = plan_cache  # 执行计划语义缓存（可选）
+
+        # (注册表版本, 工具列表文本)
+        self._tools_formatted: tuple[int, str] = (-1, "")
+
+        # (分钟时间戳, 当前时间文本)
+        self._time_cache: tuple[int, str] = (-1, "")
 
         # 确认状态跟踪
         self._pending_confirmation: Optional[dict] = None  # 等待确认的工具调用
 
-    def _is_confirmation(self, user_input: str) -> bool:
-        """检查用户输入是否是确认"""
-        confirmation_keywords = ['确认', 'yes', '是', '确定', '好的', '执行', '删除', '清理']
-        return user_input.lower().strip() in confirmation_keywords
+    @property
+    def schemas(self) -> list[dict]:
+        """工具 Schema（注册表按版本缓存的共享列表，不要修改）"""
+        return self.tools.get_tool_definitions()
 
-    def _is_cancel(self, user_input: str) -> bool:
-        """检查用户输入是否是取消"""
-        cancel_keywords = ['取消', 'cancel', 'no', '否', '不', '算了', '不要']
-        return user_input.lower().strip() in cancel_keywords
+    def _now_str(self) -> str:
+        """
+        当前时间文本（精确到分钟，每分钟只格式化一次）
+
+        同一分钟内的提示词前缀保持一致，便于下游的提示词缓存命中
+        """
+        minute = int(time.time()) // 60
+        if minute != self._time_cache[0]:
+            self._time_cache = (minute, time.strftime("%Y-%m-%d %H:%M", time.localtime(minute * 60)))
+        return self._time_cache[1]
+
+    def _is_confirmation(self, user_input: str, user_input_lower: Optional[str] = None) -> bool:
+        """检查用户输入是否是确认（user_input_lower 为已 strip + lower 的输入，可复用）"""
+        if user_input_lower is None:
+            user_input_lower = user_input.strip().lower()
+        return user_input_lower in CONFIRMATION_WORDS
+
+    def _is_cancel(self, user_input: str, user_input_lower: Optional[str] = None) -> bool:
+        """检查用户输入是否是取消（user_input_lower 为已 strip + lower 的输入，可复用）"""
+        if user_input_lower is None:
+            user_input_lower = user_input.strip().lower()
+        return user_input_lower in CANCEL_WORDS
 
     async def _execute_confirmation(self, user_input: str) -> AsyncGenerator[str, None]:
         """执行确认的操作"""
@@ -253,32 +549,6 @@ class SupervisorAgent:
         else:
             yield f"操作失败: {result.observation}\n"
 
-    async def _generate_response_stream(
-        self,
-        messages: list[dict],
-        temperature: float = 0.7,
-        max_tokens: int = 1000
-    ) -> AsyncGenerator[str, None]:
-        """
-        流式生成回复
-
-        Args:
-            messages: 消息列表
-            temperature: 温度
-            max_tokens: 最大token数
-
-        Yields:
-            文本片段
-        """
-        try:
-            async for chunk in self.llm.stream_generate(messages, temperature, max_tokens):
-                yield chunk
-        except Exception as e:
-            logger.warning(f"流式生成失败: {e}")
-            # 降级到批量生成
-            response = await self.llm.generate(messages, temperature, max_tokens)
-            yield response
-
     async def handle(
         self,
         user_input: str,
@@ -297,8 +567,11 @@ class SupervisorAgent:
             str: 流式输出文本
             dict: 需要用户输入 {"type": "need_input", "prompt": str}
         """
+        # 各处关键词判断共用同一份规范化输入，每轮只做一次 strip + lower
+        user_input_lower = user_input.strip().lower()
+
         # 检查是否有待处理的确认
-        if self._pending_confirmation and self._is_confirmation(user_input):
+        if self._pending_confirmation and self._is_confirmation(user_input, user_input_lower):
             # 执行确认的操作
             async for output in self._execute_confirmation(user_input):
                 yield output
@@ -307,17 +580,29 @@ class SupervisorAgent:
         agent_context = AgentContext(
             session_id=session_id,
             user_input=user_input,
+            user_input_lower=user_input_lower,
             metadata=context or {}
         )
         self._current_context = agent_context
 
+        # 记忆检索与意图分析并行：检索放到线程中，不阻塞事件循环
+        # 按对话/单步的数量检索；多步规划需要更多记忆时再补一次
+        memory_task = None
+        if self.enable_memory_context and self.memory:
+            memory_task = asyncio.create_task(
+                self._recall_memory(user_input, self._chat_memory_top_k)
+            )
+
         # Step 1: 意图分析
-        mode = await self._analyze_intent(user_input)
+        mode = await self._analyze_intent(user_input, user_input_lower)
         logger.debug(f"执行模式: {mode.value}")
 
         # Step 2: 规划
         yield "🤔 "
-        agent_context.plan = await self._plan(user_input, mode)
+        agent_context.memory_snippet = await self._memory_for_mode(memory_task, user_input, mode)
+        agent_context.plan = await self._plan(
+            user_input, mode, agent_context.memory_snippet, user_input_lower
+        )
 
         if mode == ExecutionMode.MULTI_STEP:
             yield f"计划 {len(agent_context.plan.steps)} 步\n"
@@ -333,49 +618,83 @@ class SupervisorAgent:
             async for output in self._execute_multi_step(agent_context):
                 yield output
 
-    def _build_context_messages(self, user_input: str) -> list[dict]:
+    @property
+    def _chat_memory_top_k(self) -> int:
+        """对话与单步规划注入的记忆数量"""
+        return min(self.context_memory_limit, CHAT_MEMORY_TOP_K)
+
+    async def _memory_for_mode(
+        self, memory_task: Optional[asyncio.Task], user_input: str, mode: 'ExecutionMode'
+    ) -> str:
+        """
+        取出预先检索的记忆
+
+        预检索按对话/单步的数量进行；多步规划使用完整的 context_memory_limit，
+        数量更多时放弃预检索结果重新检索
+        """
+        if memory_task is None:
+            return ""
+        if mode == ExecutionMode.MULTI_STEP and self.context_memory_limit > self._chat_memory_top_k:
+            memory_task.cancel()
+            return await self._recall_memory(user_input, self.context_memory_limit)
+        return await memory_task
+
+    async def _recall_memory(self, user_input: str, top_k: int) -> str:
+        """
+        异步检索相关记忆
+
+        recall 是同步的向量检索，放到线程中执行；未启用、失败或为空时返回空字符串
+        """
+        if not (self.enable_memory_context and self.memory):
+            return ""
+        try:
+            raw_memory = await asyncio.to_thread(self.memory.recall, query=user_input, top_k=top_k)
+        except Exception as e:
+            logger.warning(f"检索记忆失败: {e}")
+            return ""
+        return raw_memory if raw_memory and raw_memory.strip() else ""
+
+    def _recall_memory_sync(self, user_input: str, top_k: int) -> str:
+        """同步检索相关记忆（调用方没有预先检索时使用）"""
+        if not (self.enable_memory_context and self.memory):
+            return ""
+        try:
+            raw_memory = self.memory.recall(query=user_input, top_k=top_k)
+        except Exception as e:
+            logger.warning(f"检索记忆失败: {e}")
+            return ""
+        return raw_memory if raw_memory and raw_memory.strip() else ""
+
+    def _build_context_messages(
+        self,
+        user_input: str,
+        memory_snippet: Optional[str] = None
+    ) -> list[dict]:
         """
         构建带记忆上下文的 messages
 
-        如果启用了 memory_context，会搜索相关记忆并注入系统提示
+        如果启用了 memory_context，会注入相关记忆到系统提示。
+        memory_snippet 为 None 时在这里检索。
         """
-        from datetime import datetime
         messages = []
 
         # 基础系统提示词（参考 OpenClaw 架构）
-        current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        base_system = f"""你是用户的个人 AI 助手，性格友好、高效、可靠。
-
-【当前时间】{current_time}
+        current_time = self._now_str()
+        base_system = _BASE_SYSTEM_TMPL.format(current_time=current_time)
 
-【核心职责】
-1. 准确理解用户意图，选择正确的工具执行任务
-2. 当用户说"清理"、"删除"、"移除"时，应该执行删除操作，而不是只查看
-3. 当用户说"查看"、"显示"、"有什么"时，才执行查看操作
-
-【工具选择指南】
-- 用户说"清理任务/删除任务" → delete_tasks（执行删除）
-- 用户说"查看任务/有什么任务" → list_tasks（仅查看）
-- 用户说"完成任务" → complete_task
-- 用户说"创建任务/提醒我" → create_task"""
+        if memory_snippet is None:
+            memory_snippet = self._recall_memory_sync(
+                user_input,
+                top_k=self._chat_memory_top_k  # 限制记忆数量
+            )
 
-        # 如果启用记忆上下文且有记忆系统
+        # 限制记忆内容长度（最多 1500 字符）
         memory_context = ""
-        if self.enable_memory_context and self.memory:
-            try:
-                # 使用 recall 方法检索相关记忆
-                raw_memory = self.memory.recall(
-                    query=user_input,
-                    top_k=min(self.context_memory_limit, 3)  # 限制记忆数量
-                )
-                # 限制记忆内容长度（最多 1500 字符）
-                if raw_memory and raw_memory.strip():
-                    memory_context = raw_memory[:1500]
-                    if len(raw_memory) > 1500:
-                        memory_context += "\n...（记忆内容已截断）"
-                    logger.debug(f"已注入相关记忆上下文 ({len(memory_context)} 字符)")
-            except Exception as e:
-                logger.warning(f"检索记忆失败: {e}")
+        if memory_snippet:
+            memory_context = memory_snippet[:1500]
+            if len(memory_snippet) > 1500:
+                memory_context += "\n...（记忆内容已截断）"
+            logger.debug(f"已注入相关记忆上下文 ({len(memory_context)} 字符)")
 
         # 组合系统提示词
         if memory_context:
@@ -393,42 +712,42 @@ class SupervisorAgent:
         return messages
 
     @timed("analyze_intent")
-    async def _analyze_intent(self, user_input: str) -> ExecutionMode:
+    async def _analyze_intent(self, user_input: str, user_input_lower: Optional[str] = None) -> ExecutionMode:
         """
         分析意图，决定执行模式
 
         启发式判断，避免不必要的 LLM 调用
         """
-        user_input_lower = user_input.lower()
+        if user_input_lower is None:
+            user_input_lower = user_input.strip().lower()
+
+        # 一次扫描得到所有关键词类别（统一在小写文本上匹配）
+        mask = INTENT_MATCHER.match(user_input_lower)
 
         # 简单问候 → Fast Path
-        simple_patterns = ["你好", "嗨", "hello", "hi", "谢谢", "再见", "拜拜"]
-        if any(p in user_input_lower for p in simple_patterns):
+        if mask & KW_SIMPLE:
             if len(user_input) < 20:  # 短消息才走 fast path
                 return ExecutionMode.FAST_PATH
 
         # 复杂多步指示 → Multi Step（需要规划和多工具协作）
-        complex_multi_indicators = [
-            "然后", "先...再", "帮我...然后", "整理并", "总结所有", "分析并"
-        ]
-        if any(i in user_input for i in complex_multi_indicators):
+        if mask & KW_MULTI:
             return ExecutionMode.MULTI_STEP
 
-        # 任务清理/删除 → Single Step（直接 Function Calling，工具会处理确认流程）
-        # 注意：不再走 Multi Step，让 LLM 直接选择 delete_tasks 工具
-        delete_keywords = ["清理任务", "删除任务", "清空任务", "移除任务", "删除这些", "清理这些"]
-        if any(kw in user_input for kw in delete_keywords):
-            return ExecutionMode.SINGLE_STEP
-
-        # 查看/查询 → Single Step
-        view_keywords = ["有什么任务", "查看任务", "待办", "显示任务", "列出"]
-        if any(kw in user_input for kw in view_keywords):
+        # 任务清理/删除、查看/查询 → Single Step（直接 Function Calling，工具会处理确认流程）
+        # 注意：删除不再走 Multi Step，让 LLM 直接选择 delete_tasks 工具
+        if mask & (KW_DELETE_TASK | KW_VIEW_TASK):
             return ExecutionMode.SINGLE_STEP
 
         # 默认 → Single Step (Function Calling)
         return ExecutionMode.SINGLE_STEP
 
-    async def _plan(self, user_input: str, mode: ExecutionMode) -> ExecutionPlan:
+    async def _plan(
+        self,
+        user_input: str,
+        mode: ExecutionMode,
+        memory_snippet: Optional[str] = None,
+        user_input_lower: Optional[str] = None
+    ) -> ExecutionPlan:
         """生成执行计划"""
 
         if mode == ExecutionMode.FAST_PATH:
@@ -440,20 +759,114 @@ class SupervisorAgent:
             )
 
         elif mode == ExecutionMode.SINGLE_STEP:
+            plan = self._static_plan(user_input, user_input_lower)
+            if plan:
+                return plan
             # 使用 Function Calling 选择工具（带重试）
-            return await self._plan_single_step_with_retry(user_input)
+            return await self._plan_single_step_with_retry(user_input, memory_snippet)
 
         elif mode == ExecutionMode.MULTI_STEP:
             # 使用 LLM 进行多步规划（带重试）
-            return await self._plan_multi_step_with_retry(user_input)
+            return await self._plan_multi_step_with_retry(user_input, memory_snippet)
 
         return ExecutionPlan(mode=mode, goal=user_input, steps=[])
 
-    async def _plan_single_step_with_retry(self, user_input: str) -> ExecutionPlan:
+    def _static_plan(self, user_input: str, user_input_lower: Optional[str] = None) -> Optional[ExecutionPlan]:
+        """
+        关键词足以确定工具时直接构造单步计划
+
+        只处理短句，且只命中一类静态计划、不含其他意图类别；其余情况返回 None，交给 LLM 规划。
+        """
+        if user_input_lower is None:
+            user_input_lower = user_input.strip().lower()
+        if len(user_input_lower) > STATIC_PLAN_MAX_LEN:
+            return None
+
+        mask = INTENT_MATCHER.match(user_input_lower)
+        matches = [(tool, params) for bit, tool, params in STATIC_PLANS if mask & bit]
+        if len(matches) != 1 or mask & ~STATIC_PLAN_BITS:
+            return None
+
+        tool_name, params = matches[0]
+        if not self.tools.has(tool_name):
+            return None
+
+        logger.debug("静态计划: '%s' → %s", user_input, tool_name)
+        self.metrics.record_mode(ExecutionMode.SINGLE_STEP.value)
+        return ExecutionPlan(
+            mode=ExecutionMode.SINGLE_STEP,
+            goal=user_input,
+            steps=[Step(id="step_0", tool_name=tool_name, parameters=dict(params))]
+        )
+
+    async def _lookup_cached_plan(
+        self,
+        user_input: str,
+        mode: ExecutionMode
+    ) -> Optional[ExecutionPlan]:
+        """从计划缓存中查找，命中时以当前输入为目标重建计划"""
+        if not self.plan_cache:
+            return None
+
+        try:
+            steps = await self.plan_cache.lookup(user_input, mode.value)
+        except Exception as e:
+            logger.warning(f"计划缓存查找失败: {e}")
+            return None
+
+        if steps is None:
+            return None
+
+        self.metrics.record_mode(mode.value)
+        return ExecutionPlan(
+            mode=mode,
+            goal=user_input,
+            steps=[
+                Step(
+                    id=f"step_{i}",
+                    tool_name=s["tool"],
+                    parameters=s["params"],
+                    depends_on=s.get("depends_on", [])
+                )
+                for i, s in enumerate(steps)
+            ]
+        )
+
+    async def _cache_plan(self, user_input: str, plan: ExecutionPlan):
+        """缓存 LLM 生成的执行计划"""
+        if not self.plan_cache:
+            return
+
+        steps = [
+            {"tool": s.tool_name, "params": s.parameters, "depends_on": s.depends_on}
+            for s in plan.steps
+        ]
+        # 可能要求确认的工具（删除等）不缓存：相似输入复用会作用到错误的对象上
+        if not self.plan_cache.is_cacheable(steps) or any(
+            self._may_need_confirmation(s) for s in plan.steps
+        ):
+            return
+
+        try:
+            await self.plan_cache.store(user_input, plan.mode.value, steps)
+        except Exception as e:
+            logger.warning(f"计划缓存写入失败: {e}")
+
+    async def _plan_single_step_with_retry(
+        self,
+        user_input: str,
+        memory_snippet: Optional[str] = None
+    ) -> ExecutionPlan:
         """单步规划（带重试机制）"""
+        cached = await self._lookup_cached_plan(user_input, ExecutionMode.SINGLE_STEP)
+        if cached:
+            return cached
+
         for attempt in range(self.retry_attempts):
             try:
-                return await self._plan_single_step(user_input)
+                plan = await self._plan_single_step(user_input, memory_snippet)
+                await self._cache_plan(user_input, plan)
+                return plan
             except Exception as e:
                 logger.warning(f"单步规划尝试 {attempt + 1} 失败: {e}")
                 if attempt < self.retry_attempts - 1:
@@ -473,36 +886,22 @@ class SupervisorAgent:
         )
 
     @timed("plan_single_step")
-    async def _plan_single_step(self, user_input: str) -> ExecutionPlan:
+    async def _plan_single_step(
+        self,
+        user_input: str,
+        memory_snippet: Optional[str] = None
+    ) -> ExecutionPlan:
         """单步规划核心逻辑"""
-        start_time = time.time()
-        messages = self._build_context_messages(user_input)
+        start_time = time.perf_counter_ns()
+        messages = self._build_context_messages(user_input, memory_snippet)
 
         # 增强系统提示，强调工具选择规则
         enhanced_system = messages[0].get("content", "") if messages else ""
 
-        # 添加强制性工具选择规则（关键！）
-        tool_selection_rules = """
-
-【强制性工具选择规则】
-你必须根据用户输入的关键词选择正确的工具：
-1. 关键词包含"清理"、"删除"、"移除"、"清空" → 必须使用 delete_tasks
-2. 关键词包含"查看"、"显示"、"有什么"、"列出" → 使用 list_tasks
-3. 关键词包含"完成"、"做完了" → 使用 complete_task
-4. 关键词包含"创建"、"添加"、"提醒我" → 使用 create_task
-
-【Few-shot 示例】
-输入: "帮我清理这些任务" → 工具: delete_tasks
-输入: "删除无效的任务" → 工具: delete_tasks
-输入: "我有什么任务" → 工具: list_tasks
-输入: "查看待办列表" → 工具: list_tasks
-输入: "完成任务 xxx" → 工具: complete_task
-输入: "提醒我明天开会" → 工具: create_task"""
-
-        # 更新系统提示
+        # 更新系统提示，添加强制性工具选择规则
         for msg in messages:
             if msg.get("role") == "system":
-                msg["content"] = enhanced_system + tool_selection_rules
+                msg["content"] = enhanced_system + _TOOL_SELECTION_RULES
                 break
 
         response = await self.llm.generate_with_tools(
@@ -512,7 +911,7 @@ class SupervisorAgent:
         )
 
         # 记录性能指标
-        self.metrics.record_llm_call(time.time() - start_time)
+        self.metrics.record_llm_call(time.perf_counter_ns() - start_time)
         self.metrics.record_mode("single_step")
 
         if response.tool_calls:
@@ -538,11 +937,21 @@ class SupervisorAgent:
                 )]
             )
 
-    async def _plan_multi_step_with_retry(self, user_input: str) -> ExecutionPlan:
+    async def _plan_multi_step_with_retry(
+        self,
+        user_input: str,
+        memory_snippet: Optional[str] = None
+    ) -> ExecutionPlan:
         """多步规划（带重试机制）"""
+        cached = await self._lookup_cached_plan(user_input, ExecutionMode.MULTI_STEP)
+        if cached:
+            return cached
+
         for attempt in range(self.retry_attempts):
             try:
-                return await self._plan_multi_step(user_input)
+                plan = await self._plan_multi_step(user_input, memory_snippet)
+                await self._cache_plan(user_input, plan)
+                return plan
             except Exception as e:
                 logger.warning(f"多步规划尝试 {attempt + 1} 失败: {e}")
                 if attempt < self.retry_attempts - 1:
@@ -551,98 +960,64 @@ class SupervisorAgent:
                     logger.error(f"多步规划最终失败: {e}")
 
         # Fallback 到单步
-        return await self._plan_single_step_with_retry(user_input)
+        return await self._plan_single_step_with_retry(user_input, memory_snippet)
 
     @timed("plan_multi_step")
-    async def _plan_multi_step(self, user_input: str) -> ExecutionPlan:
+    async def _plan_multi_step(
+        self,
+        user_input: str,
+        memory_snippet: Optional[str] = None
+    ) -> ExecutionPlan:
         """多步规划核心逻辑"""
-        start_time = time.time()
-        from datetime import datetime
-        current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        start_time = time.perf_counter_ns()
+        current_time = self._now_str()
 
         # 构建带记忆上下文的规划提示
-        memory_context = ""
-        if self.enable_memory_context and self.memory:
-            try:
-                relevant_memories = self.memory.recall(
-                    query=user_input,
-                    top_k=self.context_memory_limit
-                )
-                if relevant_memories and relevant_memories.strip():
-                    memory_context = f"\n【相关记忆】\n{relevant_memories}"
-            except Exception as e:
-                logger.warning(f"检索记忆失败: {e}")
+        if memory_snippet is None:
+            memory_snippet = self._recall_memory_sync(user_input, self.context_memory_limit)
+        memory_context = f"\n【相关记忆】\n{memory_snippet}" if memory_snippet else ""
 
         # 使用增强的规划提示词（参考 OpenClaw 架构）
-        prompt = f"""【当前时间】{current_time}
-
-【任务分析】
-分析用户需求，选择正确的工具执行任务。
-
-【用户输入】
-{user_input}{memory_context}
-
-【可用工具】
-{self._format_tools()}
-
-【工具选择规则】（非常重要！）
-1. "清理任务"、"删除任务"、"清空列表" → 必须使用 delete_tasks
-2. "查看任务"、"有什么任务"、"显示列表" → 使用 list_tasks
-3. "完成任务"、"做完了" → 使用 complete_task
-4. "创建任务"、"提醒我" → 使用 create_task
-
-【正确示例】
-示例1:
-输入: "帮我清理这些任务"
-输出: {{"goal": "清理用户的任务列表", "steps": [{{"tool": "delete_tasks", "params": {{"delete_all": true, "confirmed": false}}, "reason": "用户说清理任务，需要执行删除操作"}}]}}
-
-示例2:
-输入: "删除无效的任务"
-输出: {{"goal": "删除无效任务", "steps": [{{"tool": "delete_tasks", "params": {{"confirmed": false}}, "reason": "用户要删除任务，使用 delete_tasks"}}]}}
-
-示例3:
-输入: "我有什么待办事项"
-输出: {{"goal": "查看任务列表", "steps": [{{"tool": "list_tasks", "params": {{}}, "reason": "用户只是想查看，不是删除"}}]}}
-
-【错误示例】❌
-输入: "帮我清理这些任务"
-错误输出: {{"goal": "查看任务", "steps": [{{"tool": "list_tasks", ...}}]}}  // 错误！用户说"清理"应该用 delete_tasks
-
-现在请分析用户输入并生成执行计划，返回 JSON 格式：
-{{
-    "goal": "任务目标",
-    "steps": [
-        {{"tool": "工具名", "params": {{"参数名": "值"}}, "reason": "选择此工具的理由"}}
-    ]
-}}"""
+        prompt = _MULTI_STEP_PROMPT_TMPL.format(
+            current_time=current_time,
+            user_input=user_input,
+            memory_context=memory_context,
+            tools=self._format_tools(),
+        )
 
-        response = await self.llm.generate(
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.1  # 使用低温度确保稳定的工具选择和 JSON 输出
+        # 流式接收，第一个完整的 JSON 对象闭合后立即停止，不再等待剩余输出
+        scanner = _JsonObjectScanner()
+        received: list[str] = []
+        json_text = None
+        stream = self.llm.stream_generate(
+            [{"role": "user", "content": prompt}],
+            0.1,  # 使用低温度确保稳定的工具选择和 JSON 输出
+            2000
         )
+        async with aclosing(stream):
+            async for chunk in stream:
+                received.append(chunk)
+                json_text = scanner.feed(chunk)
+                if json_text is not None:
+                    break
 
         # 记录性能指标
-        self.metrics.record_llm_call(time.time() - start_time)
+        self.metrics.record_llm_call(time.perf_counter_ns() - start_time)
         self.metrics.record_mode("multi_step")
 
+        response = "".join(received)
+
         # 检查空响应
-        if not response or not response.strip():
+        if not response.strip():
             raise ValueError("LLM 返回空响应")
 
-        # 尝试解析 JSON，失败时尝试提取 JSON 片段
+        if json_text is None:
+            raise ValueError(f"响应中未找到 JSON: {response[:200]}")
+
         try:
-            plan_data = json.loads(response.strip())
-        except json.JSONDecodeError as e:
-            # 尝试从响应中提取 JSON 对象
-            import re
-            json_match = re.search(r'\{[\s\S]*\}', response)
-            if json_match:
-                try:
-                    plan_data = json.loads(json_match.group(0))
-                except json.JSONDecodeError:
-                    raise ValueError(f"无法解析 JSON 响应: {response[:200]}") from e
-            else:
-                raise ValueError(f"响应中未找到 JSON: {response[:200]}") from e
+            plan_data = json_loads(json_text)
+        except ValueError as e:
+            raise ValueError(f"无法解析 JSON 响应: {response[:200]}") from e
 
         return ExecutionPlan(
             mode=ExecutionMode.MULTI_STEP,
@@ -651,7 +1026,11 @@ class SupervisorAgent:
                 Step(
                     id=f"step_{i}",
                     tool_name=s["tool"],
-                    parameters=s.get("params", {})
+                    parameters=s.get("params", {}),
+                    depends_on=[
+                        f"step_{d}" if isinstance(d, int) else str(d)
+                        for d in s.get("depends_on") or []
+                    ]
                 )
                 for i, s in enumerate(plan_data.get("steps", []))
             ]
@@ -685,7 +1064,7 @@ class SupervisorAgent:
             yield "快速路径未配置\n"
             return
 
-        start_time = time.time()
+        start_time = time.perf_counter_ns()
         try:
             intent = self.fast_path.classify(context.user_input)
             intent_value = intent.type.value if hasattr(intent.type, 'value') else str(intent.type)
@@ -705,7 +1084,7 @@ class SupervisorAgent:
                 result = await self.tools.execute(tool_name, timeout=30.0, **{})
 
             # 记录性能指标
-            self.metrics.record_tool_call(tool_name, time.time() - start_time, result.success)
+            self.metrics.record_tool_call(tool_name, time.perf_counter_ns() - start_time, result.success)
 
             # 对于 chat 工具，使用流式生成回复
             if tool_name == "chat" and self.enable_streaming:
@@ -731,25 +1110,28 @@ class SupervisorAgent:
             return
 
         step.status = "running"
-        start_time = time.time()
+        start_time = time.perf_counter_ns()
 
         result = await self.tools.execute(step.tool_name, timeout=30.0, **step.parameters)
 
         # 记录性能指标
-        self.metrics.record_tool_call(step.tool_name, time.time() - start_time, result.success)
+        self.metrics.record_tool_call(step.tool_name, time.perf_counter_ns() - start_time, result.success)
 
         step.result = result
         step.status = "completed" if result.success else "failed"
 
         if result.success:
             # 执行反思：验证结果是否符合用户意图
-            retry_tool = await self._reflect_on_result(context.user_input, step.tool_name, result)
+            retry_tool = await self._reflect_on_result(
+                context.user_input, step.tool_name, result, context.user_input_lower
+            )
             if retry_tool:
                 logger.info(f"反思检测到需要重试，原工具: {step.tool_name} -> 新工具: {retry_tool}")
                 # 直接切换到正确工具，不再依赖LLM重新规划
                 yield f"⚠️ 重新调整策略，使用 {retry_tool}...\n"
+                retry_start = time.perf_counter_ns()
                 new_result = await self.tools.execute(retry_tool, timeout=30.0)
-                self.metrics.record_tool_call(retry_tool, time.time() - start_time, new_result.success)
+                self.metrics.record_tool_call(retry_tool, time.perf_counter_ns() - retry_start, new_result.success)
                 if new_result.success:
                     result = new_result
                     step.tool_name = retry_tool
@@ -774,40 +1156,49 @@ class SupervisorAgent:
         else:
             yield f"操作失败: {result.observation}\n"
 
-    async def _reflect_on_result(self, user_input: str, tool_name: str, result: ToolResult) -> str | None:
+    async def _reflect_on_result(
+        self,
+        user_input: str,
+        tool_name: str,
+        result: ToolResult,
+        user_input_lower: Optional[str] = None
+    ) -> str | None:
         """
         执行反思：验证结果是否符合用户意图
 
         Returns:
             应该使用的工具名，或 None 表示不需要重试
         """
-        user_input_lower = user_input.lower()
+        if user_input_lower is None:
+            user_input_lower = user_input.strip().lower()
+        mask = INTENT_MATCHER.match(user_input_lower)
 
         # 反思规则：用户说"清理/删除"但使用了 list_tasks
-        if tool_name == "list_tasks":
-            delete_keywords = ["清理", "删除", "移除", "清空", "不要", "去掉", "删掉"]
-            if any(kw in user_input_lower for kw in delete_keywords):
-                logger.warning(f"反思: 用户说'{user_input}'但使用了 list_tasks，应使用 delete_tasks")
-                return "delete_tasks"
+        if tool_name == "list_tasks" and mask & KW_REFLECT_DELETE:
+            logger.warning(f"反思: 用户说'{user_input}'但使用了 list_tasks，应使用 delete_tasks")
+            return "delete_tasks"
 
         # 反思规则：用户说"查看/显示"但使用了 delete_tasks
-        if tool_name == "delete_tasks":
-            view_keywords = ["查看", "显示", "有什么", "列出", "看看"]
-            if any(kw in user_input_lower for kw in view_keywords):
-                # 但如果有"清理"关键词，则删除是正确的
-                if not any(kw in user_input_lower for kw in ["清理", "删除", "移除"]):
-                    logger.warning(f"反思: 用户说'{user_input}'但使用了 delete_tasks，应使用 list_tasks")
-                    return "list_tasks"
+        # 但如果有"清理"关键词，则删除是正确的
+        if tool_name == "delete_tasks" and mask & KW_REFLECT_VIEW:
+            if not mask & KW_REFLECT_DELETE_STRICT:
+                logger.warning(f"反思: 用户说'{user_input}'但使用了 delete_tasks，应使用 list_tasks")
+                return "list_tasks"
 
         return None
 
     async def _generate_chat_response_stream(self, context: AgentContext) -> AsyncGenerator[str, None]:
         """流式生成聊天回复"""
-        messages = self._build_context_messages(context.user_input)
+        messages = self._build_context_messages(context.user_input, context.memory_snippet)
 
-        # 流式生成回复
-        async for chunk in self._generate_response_stream(messages, temperature=0.7, max_tokens=800):
-            yield chunk
+        # 直接转发 LLM 流，不再经过额外的生成器包装
+        try:
+            async for chunk in self.llm.stream_generate(messages, 0.7, 800):
+                yield chunk
+        except Exception as e:
+            logger.warning("流式生成失败: %s", e)
+            # 降级到批量生成
+            yield await self.llm.generate(messages, 0.7, 800)
 
     @timed("execute_multi_step")
     async def _execute_multi_step(self, context: AgentContext) -> AsyncGenerator[str, None]:
@@ -815,55 +1206,118 @@ class SupervisorAgent:
         plan = context.plan
         step_count = 0
 
-        while not plan.is_complete and step_count < self.max_steps:
-            step = plan.current
-            if not step:
-                break
+        # 已提前启动的步骤：step_id -> Task；输出仍按计划顺序逐步产出
+        prefetched: dict[str, asyncio.Task] = {}
+        try:
+            while not plan.is_complete and step_count < self.max_steps:
+                step = plan.current
+                if not step:
+                    break
+
+                self._prefetch_steps(plan, prefetched, self.max_steps - step_count)
+
+                step.status = "running"
+                yield f"  [{plan.current_step + 1}/{len(plan.steps)}] {step.tool_name}... "
+
+                task = prefetched.pop(step.id, None)
+                result, elapsed = await (task if task else self._run_step(step))
+
+                # 记录性能指标
+                self.metrics.record_tool_call(step.tool_name, elapsed, result.success)
+
+                step.result = result
+
+                # 检查是否需要确认
+                if result.data.get("needs_confirmation"):
+                    step.status = "needs_clarification"
+                    yield f"\n💭 {result.observation}\n"
+                    yield {
+                        "type": "need_input",
+                        "prompt": "确认执行吗？(yes/no/show)",
+                        "context": {"step_id": step.id, "data": result.data}
+                    }
+                    return
+
+                if result.success:
+                    step.status = "completed"
+                    yield "✓\n"
+                    if result.observation:
+                        yield f"    {result.observation}\n"
+                else:
+                    step.status = "failed"
+                    yield "✗\n"
+                    yield f"    错误: {result.observation}\n"
+                    self.metrics.record_error(f"{step.tool_name}: {result.observation}")
 
-            step.status = "running"
-            yield f"  [{plan.current_step + 1}/{len(plan.steps)}] {step.tool_name}... "
+                plan.next()
+                step_count += 1
+        finally:
+            # 提前结束（等待确认或调用方关闭生成器）时取消未消费的预取步骤
+            for task in prefetched.values():
+                task.cancel()
+
+    async def _run_step(self, step: Step) -> tuple[ToolResult, int]:
+        """执行单个步骤，返回结果和耗时（纳秒）"""
+        start_time = time.perf_counter_ns()
+        result = await self.tools.execute(step.tool_name, timeout=30.0, **step.parameters)
+        return result, time.perf_counter_ns() - start_time
 
-            start_time = time.time()
-            result = await self.tools.execute(step.tool_name, timeout=30.0, **step.parameters)
+    def _may_need_confirmation(self, step: Step) -> bool:
+        """工具是否带有确认参数"""
+        tool = self.tools.get(step.tool_name)
+        return tool is not None and any(p.name in CONFIRM_PARAMS for p in tool.parameters)
 
-            # 记录性能指标
-            self.metrics.record_tool_call(step.tool_name, time.time() - start_time, result.success)
+    def _is_read_only(self, step: Step) -> bool:
+        """工具是否声明为只读（未注册的工具按有副作用处理）"""
+        tool = self.tools.get(step.tool_name)
+        return tool is not None and tool.read_only
 
-            step.result = result
+    def _prefetch_steps(self, plan: ExecutionPlan, prefetched: dict[str, asyncio.Task], budget: int):
+        """
+        提前启动依赖已满足的后续步骤，让相互独立的工具 I/O 并发执行
 
-            # 检查是否需要确认
-            if result.data.get("needs_confirmation"):
-                step.status = "needs_clarification"
-                yield f"\n💭 {result.observation}\n"
-                yield {
-                    "type": "need_input",
-                    "prompt": "确认执行吗？(yes/no/show)",
-                    "context": {"step_id": step.id, "data": result.data}
-                }
-                return
+        只有只读工具（Tool.read_only）会被提前启动：从当前步骤起连续的只读步骤
+        可以并发，遇到第一个有副作用的步骤（写入、删除、需要确认等）即停止，
+        它和其后的步骤按计划顺序串行执行。depends_on 缺省不代表相互独立。
+        只在剩余步数预算内向前看，并发数不超过 max_parallel_steps。
 
-            if result.success:
-                step.status = "completed"
-                yield "✓\n"
-                if result.observation:
-                    yield f"    {result.observation}\n"
-            else:
-                step.status = "failed"
-                yield "✗\n"
-                yield f"    错误: {result.observation}\n"
-                self.metrics.record_error(f"{step.tool_name}: {result.observation}")
+        Args:
+            plan: 执行计划
+            prefetched: 已启动的步骤任务（原地更新）
+            budget: 本轮还可执行的步数
+        """
+        finished = {s.id for s in plan.steps if s.status in ("completed", "failed")}
+        window = plan.steps[plan.current_step:plan.current_step + budget]
 
-            plan.next()
-            step_count += 1
+        for step in window:
+            if len(prefetched) >= self.max_parallel_steps:
+                break
+            if step.id in prefetched:
+                continue
+            if not self._is_read_only(step):
+                break
+            if all(dep in finished for dep in step.depends_on):
+                prefetched[step.id] = asyncio.create_task(self._run_step(step))
 
     def _format_tools(self) -> str:
-        """格式化工具列表"""
-        lines = []
-        for name in self.tools.get_names():
-            tool = self.tools.get(name)
-            if tool:
-                lines.append(f"- {name}: {tool.description}")
-        return "\n".join(lines)
+        """格式化工具列表（按注册表版本缓存）"""
+        version, tools_formatted = self._tools_formatted
+        if version != self.tools.version:
+            tools_formatted = "\n".join(
+                f"- {tool.name}: {tool.description}" for tool in self.tools.list_tools()
+            )
+            self._tools_formatted = (self.tools.version, tools_formatted)
+        return tools_formatted
+
+    async def prewarm(self) -> None:
+        """预热 LLM 适配器的连接"""
+        await self.llm.prewarm()
+
+    async def close(self) -> None:
+        """释放 LLM 适配器持有的连接和计划缓存"""
+        await self.llm.aclose()
+        if self.plan_cache:
+            self.plan_cache.close()
 
     def get_metrics(self) -> dict:
         """获取性能指标摘要"""
@@ -6,11 +6,13 @@
 """
 import asyncio
 import logging
+import sys
 import time
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
-from typing import Any, Optional
 from datetime import datetime
+from functools import lru_cache
+from typing import Any, Callable, ClassVar, Optional
 
 
 logger = logging.getLogger('agent.tools.base')
@@ -19,9 +21,39 @@ logger = logging.getLogger('agent.tools.base')
 MAX_STRING_LENGTH = 10000  # 字符串参数最大长度
 MAX_ARRAY_LENGTH = 100     # 数组参数最大长度
 MAX_INTEGER_VALUE = 10**9  # 整数最大值
+NO_TIMEOUT = 1e6           # 超时不小于该值时视为不限时
 
+PARAM_ERROR_PREFIX = "参数错误: "
 
-@dataclass
+# 确认参数名：带这些参数的工具（删除等）可能要求用户先确认
+CONFIRM_PARAMS = frozenset({'confirm', 'confirmed'})
+
+# 工具类别
+TOOL_CATEGORY_TASK = "task"
+TOOL_CATEGORY_MEMORY = "memory"
+TOOL_CATEGORY_OTHER = "other"
+
+# 工具元数据属性，Schema 和参数校验都由它们决定
+_METADATA_ATTRS = frozenset({'name', 'description', 'parameters'})
+
+
+@lru_cache(maxsize=1)
+def _second_isoformat(second: int) -> str:
+    """整秒部分的 ISO-8601 字符串（同一秒内的多次调用直接复用）"""
+    return datetime.fromtimestamp(second).isoformat()
+
+
+def _format_timestamp(ts: float) -> str:
+    """Unix 时间戳 → 本地时间 ISO-8601 字符串，与 datetime.isoformat() 输出一致"""
+    second = int(ts)
+    micro = round((ts - second) * 1_000_000)
+    if micro >= 1_000_000:
+        return datetime.fromtimestamp(ts).isoformat()
+    prefix = _second_isoformat(second)
+    return f"{prefix}.{micro:06d}" if micro else prefix
+
+
+@dataclass(slots=True)
 class ToolResult:
     """
     工具执行结果
@@ -49,8 +81,14 @@ class ToolResult:
             'metadata': self.metadata,
         }
 
+    def to_message_content(self) -> str:
+        """转换为回填给 LLM 的消息内容"""
+        if self.success:
+            return self.observation
+        return self.error or self.observation
+
 
-@dataclass
+@dataclass(slots=True)
 class ToolParameter:
     """
     工具参数定义
@@ -76,6 +114,10 @@ class ToolParameter:
     min_value: Optional[float] = None
     max_value: Optional[float] = None
 
+    def __post_init__(self):
+        # 参数名会作为 Schema 和调用参数的字典键反复使用，驻留后各处共享同一对象
+        self.name = sys.intern(self.name)
+
     def to_schema(self) -> dict:
         """转换为 JSON Schema 格式"""
         schema = {
@@ -93,6 +135,156 @@ class ToolParameter:
         return schema
 
 
+# 参数类型到 Python 类型的映射
+TYPE_MAPPING: dict[str, type | tuple[type, ...]] = {
+    "string": str,
+    "integer": int,
+    "number": (int, float),
+    "boolean": bool,
+    "array": list,
+    "object": dict,
+}
+
+# JSON 解码出的值都是这些具体类型，先做精确类型比较，子类才回退到 isinstance
+EXACT_TYPES: dict[str, frozenset[type]] = {
+    ptype: frozenset(expected if isinstance(expected, tuple) else (expected,))
+    for ptype, expected in TYPE_MAPPING.items()
+}
+
+
+def _type_matches(ptype: str, value: Any) -> bool:
+    """值是否符合参数类型（未知类型视为符合）"""
+    exact = EXACT_TYPES.get(ptype)
+    if exact is None or type(value) in exact:
+        return True
+    return isinstance(value, TYPE_MAPPING[ptype])
+
+ParamCheck = Callable[[Any], Optional[str]]
+
+
+def _compile_param_check(param: ToolParameter) -> Optional[ParamCheck]:
+    """
+    为单个参数生成专用检查函数
+
+    只包含该参数类型/约束实际需要的检查，调用时不再按类型分派。
+    检查顺序与错误信息和逐项校验一致：类型 → 枚举 → 长度 → 数值范围。
+
+    Returns:
+        value -> 错误信息（通过返回 None）；没有任何检查时返回 None
+    """
+    name, ptype = param.name, param.type
+    checks: list[ParamCheck] = []
+
+    # 类型（Python 中 bool 是 int 子类，integer 需要单独排除）
+    # bool 不能被继承，type(v) is bool 与 isinstance(v, bool) 等价
+    if ptype == "integer":
+        checks.append(lambda v: f"参数 {name} 必须是整数，不能是布尔值" if type(v) is bool else None)
+    expected = TYPE_MAPPING.get(ptype)
+    if isinstance(expected, type):
+        checks.append(lambda v: None if type(v) is expected or isinstance(v, expected)
+                      else f"参数 {name} 类型错误，期望 {ptype}，实际 {type(v).__name__}")
+    elif expected is not None:
+        checks.append(lambda v: None if _type_matches(ptype, v)
+                      else f"参数 {name} 类型错误，期望 {ptype}，实际 {type(v).__name__}")
+
+    if param.enum:
+        enum = param.enum
+        allowed = enum
+        # 标量类型通过类型检查后一定可哈希，改用集合查找
+        if ptype in ("string", "integer", "number", "boolean"):
+            try:
+                allowed = frozenset(enum)
+            except TypeError:
+                pass
+        checks.append(lambda v: None if v in allowed else f"参数 {name} 值 '{v}' 无效，可选值: {enum}")
+
+    if ptype == "string":
+        max_len = param.max_length or MAX_STRING_LENGTH
+        checks.append(lambda v: f"参数 {name} 超过最大长度 {max_len}" if len(v) > max_len else None)
+    elif ptype == "array":
+        max_len = param.max_length or MAX_ARRAY_LENGTH
+        checks.append(lambda v: f"参数 {name} 超过最大数组长度 {max_len}" if len(v) > max_len else None)
+    elif ptype in ("integer", "number"):
+        min_value, max_value = param.min_value, param.max_value
+        if min_value is not None:
+            checks.append(lambda v: f"参数 {name} 不能小于 {min_value}" if v < min_value else None)
+        if max_value is not None:
+            checks.append(lambda v: f"参数 {name} 不能大于 {max_value}" if v > max_value else None)
+        if ptype == "integer":
+            checks.append(lambda v: None if -MAX_INTEGER_VALUE <= v <= MAX_INTEGER_VALUE
+                          else f"参数 {name} 超出允许范围")
+
+    if not checks:
+        return None
+    if len(checks) == 1:
+        return checks[0]
+
+    def check(value):
+        for step in checks:
+            error = step(value)
+            if error:
+                return error
+        return None
+    return check
+
+
+_VALID = (True, None)
+
+
+def _accept_all(params: dict) -> tuple[bool, Optional[str]]:
+    """无参数工具的校验函数"""
+    return _VALID
+
+
+def _compile_single_validator(
+    name: str, required: bool, check: Optional[ParamCheck]
+) -> Callable[[dict], tuple[bool, Optional[str]]]:
+    """单参数工具的校验函数"""
+    missing = (False, f"缺少必需参数: {name}")
+
+    def validate(params: dict) -> tuple[bool, Optional[str]]:
+        value = params.get(name)
+        if value is None:
+            return missing if required else _VALID
+        if check is not None:
+            error = check(value)
+            if error:
+                return False, error
+        return _VALID
+    return validate
+
+
+def _compile_validator(parameters: list[ToolParameter]) -> Callable[[dict], tuple[bool, Optional[str]]]:
+    """
+    把参数定义编译为一个校验函数
+
+    每个参数只保留校验需要的 (名称, 是否必需, 检查函数)，
+    放在一个不可变元组里顺序遍历，不再访问 ToolParameter 的属性。
+    """
+    plan = tuple((p.name, p.required, _compile_param_check(p)) for p in parameters)
+
+    # 常见形状单独生成，省掉循环和元组解包
+    if not plan:
+        return _accept_all
+    if len(plan) == 1:
+        return _compile_single_validator(*plan[0])
+
+    def validate(params: dict) -> tuple[bool, Optional[str]]:
+        get = params.get
+        for name, required, check in plan:
+            value = get(name)
+            if value is None:
+                if required:
+                    return False, f"缺少必需参数: {name}"
+                continue
+            if check is not None:
+                error = check(value)
+                if error:
+                    return False, error
+        return _VALID
+    return validate
+
+
 class Tool(ABC):
     """
     工具基类
@@ -104,7 +296,14 @@ class Tool(ABC):
     # 工具元数据
     name: str = ""
     description: str = ""
-    parameters: list[ToolParameter] = field(default_factory=list)
+    parameters: ClassVar[list[ToolParameter]] = []
+    category: str = ""  # 工具类别，为空时按名称推断
+    # execute 内没有任何 await（纯内存操作）：超时无法也无需生效，直接执行，不经过 wait_for
+    is_synchronous: ClassVar[bool] = False
+    # 只读取状态、没有副作用：多步执行时可以与相邻的只读步骤并发，提前启动
+    read_only: ClassVar[bool] = False
+    # 预期内的失败（外部服务不可用、参数不合理等）只记一行警告，不格式化堆栈
+    expected_exceptions: ClassVar[tuple[type[BaseException], ...]] = ()
 
     def __init__(self):
         """初始化工具"""
@@ -113,20 +312,50 @@ class Tool(ABC):
         if not self.description:
             raise ValueError(f"工具 {self.__class__.__name__} 必须定义 description")
 
+    def get_category(self) -> str:
+        """
+        获取工具类别
+
+        未显式声明 category 时按工具名推断（task / memory / other）
+
+        Returns:
+            工具类别
+        """
+        if self.category:
+            return self.category
+
+        name = self.name.lower()
+        if 'task' in name:
+            return TOOL_CATEGORY_TASK
+        if 'memory' in name:
+            return TOOL_CATEGORY_MEMORY
+        return TOOL_CATEGORY_OTHER
+
+    def _metadata_owner(self) -> object:
+        """元数据派生缓存（Schema、参数校验函数）的存放位置：类，或单独设置了元数据的实例"""
+        return self if _METADATA_ATTRS.intersection(vars(self)) else type(self)
+
     def get_schema(self) -> dict:
         """
         获取 Function Calling Schema
 
+        元数据通常是类属性，Schema 按类缓存；实例上单独设置了元数据时
+        （如 @tool 装饰器生成的工具）改为按实例缓存。
+
         Returns:
-            OpenAI Function Calling 格式
+            OpenAI Function Calling 格式（共享对象，不要修改）
         """
-        properties = {}
-        required = []
+        owner = self._metadata_owner()
+        schema = vars(owner).get('_schema_cache')
+        if schema is None:
+            schema = self._build_schema()
+            setattr(owner, '_schema_cache', schema)
+        return schema
 
-        for param in self.parameters:
-            properties[param.name] = param.to_schema()
-            if param.required:
-                required.append(param.name)
+    def _build_schema(self) -> dict:
+        """根据元数据构建 Function Calling Schema"""
+        properties = {p.name: p.to_schema() for p in self.parameters}
+        required = [p.name for p in self.parameters if p.required]
 
         return {
             'type': 'function',
@@ -165,7 +394,7 @@ class Tool(ABC):
         - 超时处理
 
         Args:
-            timeout: 超时时间（秒），默认30秒
+            timeout: 超时时间（秒），默认30秒；None 或不小于 NO_TIMEOUT 表示不限时
             **kwargs: 参数值
 
         Returns:
@@ -178,41 +407,41 @@ class Tool(ABC):
             # 参数验证
             valid, error = self.validate_params(kwargs)
             if not valid:
-                logger.warning(f"[{tool_name}] 参数验证失败: {error}")
+                logger.warning("[%s] 参数验证失败: %s", tool_name, error)
                 return ToolResult(
                     success=False,
                     data=None,
-                    observation=f"参数错误: {error}",
+                    observation=PARAM_ERROR_PREFIX + error,
                     error=error
                 )
 
             # 执行（带超时）
-            logger.debug(f"[{tool_name}] 开始执行, 参数: {kwargs}, 超时: {timeout}s")
-            result = await asyncio.wait_for(
-                self.execute(**kwargs),
-                timeout=timeout
-            )
-
-            # 记录日志
-            duration = time.time() - start_time
-            logger.info(
-                f"[{tool_name}] 执行完成",
-                extra={
-                    "tool": tool_name,
-                    "success": result.success,
-                    "duration": duration,
-                    "params": kwargs
-                }
-            )
+            debug = logger.isEnabledFor(logging.DEBUG)
+            if debug:
+                logger.debug("[%s] 开始执行, 参数: %s, 超时: %ss", tool_name, kwargs, timeout)
+            if self.is_synchronous or timeout is None or timeout >= NO_TIMEOUT:
+                result = await self.execute(**kwargs)
+            else:
+                result = await asyncio.wait_for(self.execute(**kwargs), timeout=timeout)
+
+            # 记录日志（参数只在 DEBUG 级别附带）
+            end_time = time.time()
+            duration = end_time - start_time
+            if logger.isEnabledFor(logging.INFO):
+                extra = {"tool": tool_name, "success": result.success, "duration": duration}
+                if debug:
+                    extra["params"] = kwargs
+                logger.info("[%s] 执行完成", tool_name, extra=extra)
 
             # 添加元数据
             result.metadata["duration"] = duration
-            result.metadata["timestamp"] = datetime.now().isoformat()
+            result.metadata["timestamp"] = _format_timestamp(end_time)
 
             return result
 
         except asyncio.TimeoutError:
-            duration = time.time() - start_time
+            end_time = time.time()
+            duration = end_time - start_time
             logger.error(f"[{tool_name}] 执行超时 ({timeout}s)")
             return ToolResult(
                 success=False,
@@ -221,14 +450,18 @@ class Tool(ABC):
                 error=f"Timeout after {timeout}s",
                 metadata={
                     "duration": duration,
-                    "timestamp": datetime.now().isoformat(),
+                    "timestamp": _format_timestamp(end_time),
                     "exception_type": "TimeoutError"
                 }
             )
 
         except Exception as e:
-            duration = time.time() - start_time
-            logger.exception(f"[{tool_name}] 执行异常")
+            end_time = time.time()
+            duration = end_time - start_time
+            if isinstance(e, self.expected_exceptions):
+                logger.warning("[%s] 执行失败: %s", tool_name, e)
+            else:
+                logger.exception("[%s] 执行异常", tool_name)
 
             return ToolResult(
                 success=False,
@@ -237,7 +470,7 @@ class Tool(ABC):
                 error=str(e),
                 metadata={
                     "duration": duration,
-                    "timestamp": datetime.now().isoformat(),
+                    "timestamp": _format_timestamp(end_time),
                     "exception_type": type(e).__name__
                 }
             )
@@ -252,77 +485,28 @@ class Tool(ABC):
         - 枚举值验证
         - 长度/范围限制
 
+        参数定义首次使用时编译为专用校验函数，与 Schema 一样按类（或实例）缓存。
+
         Args:
             params: 参数字典
 
         Returns:
             (是否有效, 错误信息)
         """
-        for param in self.parameters:
-            value = params.get(param.name)
-
-            # 必需参数检查
-            if param.required and value is None:
-                return False, f"缺少必需参数: {param.name}"
-
-            if value is None:
-                continue
-
-            # 类型验证
-            type_valid, type_error = self._validate_type(param, value)
-            if not type_valid:
-                return False, type_error
-
-            # 枚举值验证
-            if param.enum and value not in param.enum:
-                return False, f"参数 {param.name} 值 '{value}' 无效，可选值: {param.enum}"
-
-            # 字符串长度限制
-            if param.type == "string":
-                max_len = param.max_length or MAX_STRING_LENGTH
-                if isinstance(value, str) and len(value) > max_len:
-                    return False, f"参数 {param.name} 超过最大长度 {max_len}"
-
-            # 数组长度限制
-            if param.type == "array":
-                max_len = param.max_length or MAX_ARRAY_LENGTH
-                if isinstance(value, list) and len(value) > max_len:
-                    return False, f"参数 {param.name} 超过最大数组长度 {max_len}"
-
-            # 数值范围验证
-            if param.type in ("integer", "number"):
-                if not isinstance(value, (int, float)):
-                    return False, f"参数 {param.name} 必须是数字"
-                if param.min_value is not None and value < param.min_value:
-                    return False, f"参数 {param.name} 不能小于 {param.min_value}"
-                if param.max_value is not None and value > param.max_value:
-                    return False, f"参数 {param.name} 不能大于 {param.max_value}"
-                # 全局整数上限
-                if param.type == "integer" and abs(value) > MAX_INTEGER_VALUE:
-                    return False, f"参数 {param.name} 超出允许范围"
-
-        return True, None
+        owner = self._metadata_owner()
+        validator = vars(owner).get('_validator_cache')
+        if validator is None:
+            validator = _compile_validator(self.parameters)
+            setattr(owner, '_validator_cache', validator)
+        return validator(params)
 
     def _validate_type(self, param: ToolParameter, value: Any) -> tuple[bool, Optional[str]]:
         """验证参数类型"""
-        type_mapping = {
-            "string": str,
-            "integer": int,
-            "number": (int, float),
-            "boolean": bool,
-            "array": list,
-            "object": dict,
-        }
-
-        expected_type = type_mapping.get(param.type)
-        if expected_type is None:
-            return True, None  # 未知类型跳过验证
-
         # integer 也接受 bool=False/True 的情况（Python 中 bool 是 int 子类）
-        if param.type == "integer" and isinstance(value, bool):
+        if param.type == "integer" and type(value) is bool:
             return False, f"参数 {param.name} 必须是整数，不能是布尔值"
 
-        if not isinstance(value, expected_type):
+        if not _type_matches(param.type, value):
             return False, f"参数 {param.name} 类型错误，期望 {param.type}，实际 {type(value).__name__}"
 
         return True, None
@@ -3,13 +3,25 @@
 内置工具集
 
 常用功能的工具实现
+
+工具类按需导入（PEP 562），访问时才加载对应子模块
 """
+import importlib
 
-from .chat_tool import ChatTool
-from .memory_tools import SearchMemoryTool, AddMemoryTool, SummarizeMemoriesTool
-from .task_tools import CreateTaskTool, ListTasksTool, CompleteTaskTool, DeleteTasksTool
-from .search_tools import WebSearchTool
-from .system_tools import SwitchPersonalityTool, ClearHistoryTool
+# 工具类名 -> 所在子模块
+_TOOL_MODULES = {
+    'ChatTool': 'chat_tool',
+    'SearchMemoryTool': 'memory_tools',
+    'AddMemoryTool': 'memory_tools',
+    'SummarizeMemoriesTool': 'memory_tools',
+    'CreateTaskTool': 'task_tools',
+    'ListTasksTool': 'task_tools',
+    'CompleteTaskTool': 'task_tools',
+    'DeleteTasksTool': 'task_tools',
+    'WebSearchTool': 'search_tools',
+    'SwitchPersonalityTool': 'system_tools',
+    'ClearHistoryTool': 'system_tools',
+}
 
 __all__ = [
     # 聊天
@@ -29,3 +41,13 @@ __all__ = [
     'SwitchPersonalityTool',
     'ClearHistoryTool',
 ]
+
+
+def __getattr__(name: str):
+    module_name = _TOOL_MODULES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
@@ -6,6 +6,9 @@
 """
 from ..base import Tool, ToolResult, ToolParameter
 
+DIRECT_RESPONSE = "direct_response"
+CHAT_OBSERVATION = "直接回复用户"
+
 
 class ChatTool(Tool):
     """
@@ -25,6 +28,8 @@ class ChatTool(Tool):
             required=True
         )
     ]
+    is_synchronous = True
+    read_only = True
 
     async def execute(self, message: str, **kwargs) -> ToolResult:
         """
@@ -38,6 +43,6 @@ class ChatTool(Tool):
         """
         return ToolResult(
             success=True,
-            data={"type": "direct_response", "input": message},
-            observation="直接回复用户"
+            data={"type": DIRECT_RESPONSE, "input": message},
+            observation=CHAT_OBSERVATION
         )
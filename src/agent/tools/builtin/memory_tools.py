@@ -4,13 +4,56 @@
 
 记忆系统的 Function Calling 接口
 """
-from typing import TYPE_CHECKING
+import asyncio
+from collections import OrderedDict
+from typing import Optional, TYPE_CHECKING
 
 from ..base import Tool, ToolResult, ToolParameter
+from ....memory.write_batcher import MemoryWriteBatcher
 
 if TYPE_CHECKING:
     from memory import MemorySystem
 
+# 每个工具实例缓存的 recall 结果条数
+RECALL_CACHE_SIZE = 128
+
+
+class _RecallCache:
+    """
+    recall 结果的 LRU 缓存
+
+    同一轮对话中规划、重新规划、执行会以相同参数多次检索，
+    嵌入 + 向量检索是整个流程里最重的操作。
+    记忆写入、整合或工作记忆变化（MemorySystem.generation 递增）后整体失效。
+    """
+
+    def __init__(self, memory_system: 'MemorySystem', maxsize: int = RECALL_CACHE_SIZE):
+        self.memory = memory_system
+        self.maxsize = maxsize
+        self._entries: OrderedDict[tuple[str, int], str] = OrderedDict()
+        self._generation: Optional[int] = None
+
+    async def recall(self, query: str, top_k: int) -> str:
+        """带缓存的 recall（未命中时在线程中执行）"""
+        generation = self.memory.generation
+        if generation != self._generation:
+            self._entries.clear()
+            self._generation = generation
+
+        key = (query, top_k)
+        result = self._entries.get(key)
+        if result is not None:
+            self._entries.move_to_end(key)
+            return result
+
+        result = await asyncio.to_thread(self.memory.recall, query, top_k=top_k)
+        # 检索期间有新写入时不缓存，避免把旧结果记到新代次下
+        if self.memory.generation == generation:
+            self._entries[key] = result
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return result
+
 
 class SearchMemoryTool(Tool):
     """搜索记忆"""
@@ -40,15 +83,17 @@ class SearchMemoryTool(Tool):
             default=5
         )
     ]
+    read_only = True
 
     def __init__(self, memory_system: 'MemorySystem'):
         super().__init__()
         self.memory = memory_system
+        self._recall = _RecallCache(memory_system)
 
     async def execute(self, query: str, time_range: str = "all", limit: int = 5) -> ToolResult:
         """搜索记忆"""
         try:
-            results = self.memory.recall(query, top_k=limit)
+            results = await self._recall.recall(query, limit)
 
             if not results or not results.strip():
                 return ToolResult(
@@ -66,6 +111,7 @@ class SearchMemoryTool(Tool):
         except Exception as e:
             return ToolResult(
                 success=False,
+                data=None,
                 observation=f"搜索记忆失败: {str(e)}",
                 error=str(e)
             )
@@ -103,13 +149,15 @@ class AddMemoryTool(Tool):
     def __init__(self, memory_system: 'MemorySystem'):
         super().__init__()
         self.memory = memory_system
+        # 同一轮中的多次写入合并为一个事务，并串行化对数据库的访问
+        self._writer = MemoryWriteBatcher(memory_system)
 
     async def execute(self, content: str, category: str = "general", importance: int = 5) -> ToolResult:
         """添加记忆"""
         try:
             importance = max(1, min(10, importance))
 
-            memory_id = self.memory.capture(
+            memory_id = await self._writer.capture(
                 content=content,
                 memory_type="observation",
                 confidence="fact" if importance >= 7 else "event",
@@ -125,6 +173,7 @@ class AddMemoryTool(Tool):
         except Exception as e:
             return ToolResult(
                 success=False,
+                data=None,
                 observation=f"添加记忆失败: {str(e)}",
                 error=str(e)
             )
@@ -151,15 +200,17 @@ class SummarizeMemoriesTool(Tool):
             enum=["today", "week", "month", "all"]
         )
     ]
+    read_only = True
 
     def __init__(self, memory_system: 'MemorySystem'):
         super().__init__()
         self.memory = memory_system
+        self._recall = _RecallCache(memory_system)
 
     async def execute(self, topic: str, time_range: str = "all") -> ToolResult:
         """总结记忆"""
         try:
-            results = self.memory.recall(topic, top_k=10)
+            results = await self._recall.recall(topic, 10)
 
             if not results or not results.strip():
                 return ToolResult(
@@ -181,6 +232,7 @@ class SummarizeMemoriesTool(Tool):
         except Exception as e:
             return ToolResult(
                 success=False,
+                data=None,
                 observation=f"总结记忆失败: {str(e)}",
                 error=str(e)
             )
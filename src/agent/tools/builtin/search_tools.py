@@ -4,6 +4,7 @@
 
 Web 搜索的 Function Calling 接口
 """
+import asyncio
 from typing import TYPE_CHECKING
 
 from ..base import Tool, ToolResult, ToolParameter
@@ -39,6 +40,7 @@ class WebSearchTool(Tool):
             default=True
         )
     ]
+    read_only = True
 
     def __init__(self, search_tool: 'SearchTool'):
         super().__init__()
@@ -52,7 +54,8 @@ class WebSearchTool(Tool):
     ) -> ToolResult:
         """执行 Web 搜索"""
         try:
-            results_text = self.search.search(
+            results_text = await asyncio.to_thread(
+                self.search.search,
                 query=query,
                 num_results=num_results,
                 summarize=summarize
@@ -67,6 +70,7 @@ class WebSearchTool(Tool):
         except Exception as e:
             return ToolResult(
                 success=False,
+                data=None,
                 observation=f"搜索失败: {str(e)}",
                 error=str(e)
             )
@@ -11,6 +11,8 @@ from ..base import Tool, ToolResult, ToolParameter
 if TYPE_CHECKING:
     from personality import PersonalityManager
 
+CLEAR_HISTORY_PROMPT = "⚠️ 确定要清空对话历史吗？"
+
 
 class SwitchPersonalityTool(Tool):
     """切换性格"""
@@ -26,6 +28,7 @@ class SwitchPersonalityTool(Tool):
             enum=["nekomata_assistant", "ojousama_assistant", "default_assistant"]
         )
     ]
+    is_synchronous = True
 
     def __init__(self, personality_manager: 'PersonalityManager'):
         super().__init__()
@@ -75,6 +78,7 @@ class ClearHistoryTool(Tool):
             default=False
         )
     ]
+    is_synchronous = True
 
     def __init__(self, chat_session=None):
         super().__init__()
@@ -83,10 +87,11 @@ class ClearHistoryTool(Tool):
     async def execute(self, confirm: bool = False) -> ToolResult:
         """清空历史"""
         if not confirm:
+            # 每次返回新的结果：execute_safe 会写入 metadata，调用方也可能修改 data
             return ToolResult(
                 success=True,
                 data={"needs_confirmation": True},
-                observation="⚠️ 确定要清空对话历史吗？"
+                observation=CLEAR_HISTORY_PROMPT
             )
 
         try:
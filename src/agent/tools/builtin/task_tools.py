@@ -12,6 +12,9 @@ from ..base import Tool, ToolResult, ToolParameter
 if TYPE_CHECKING:
     from task import TaskManager
 
+_PRIORITY_ICON = {"high": "🔴", "urgent": "🔴", "medium": "🟡", "low": "🟢"}
+_STATUS_TEXT = {"pending": "待办", "completed": "已完成", "all": ""}
+
 
 class CreateTaskTool(Tool):
     """创建任务"""
@@ -63,7 +66,8 @@ class CreateTaskTool(Tool):
             parsed_due = None
             if due_date:
                 try:
-                    parsed_due = datetime.fromisoformat(due_date.replace('Z', '+00:00'))
+                    # Python 3.11+ 的 fromisoformat 原生支持 "Z" 后缀
+                    parsed_due = datetime.fromisoformat(due_date)
                 except ValueError:
                     pass
 
@@ -110,6 +114,7 @@ class ListTasksTool(Tool):
             default=10
         )
     ]
+    read_only = True
 
     def __init__(self, task_manager: 'TaskManager'):
         super().__init__()
@@ -126,35 +131,27 @@ class ListTasksTool(Tool):
             tasks = tasks[:limit]
 
             task_list = []
-            for task in tasks:
+            lines = []
+            for i, task in enumerate(tasks, 1):
+                priority = task.priority.value if hasattr(task.priority, 'value') else str(task.priority)
                 task_list.append({
                     "id": task.id,
                     "title": task.title,
                     "status": task.status.value if hasattr(task.status, 'value') else str(task.status),
                     "due_date": task.due_date.isoformat() if task.due_date else None,
-                    "priority": task.priority.value if hasattr(task.priority, 'value') else str(task.priority)
+                    "priority": priority
                 })
+                # 直接格式化原始 datetime，不再把刚序列化的字符串解析回来
+                time_str = f" ⏰ {task.due_date.strftime('%m-%d %H:%M')}" if task.due_date else ""
+                lines.append(f"  {i}. {_PRIORITY_ICON.get(priority, '⚪')} {task.title}{time_str}")
 
             count = len(task_list)
-            status_text = {"pending": "待办", "completed": "已完成", "all": ""}.get(status, "")
+            status_text = _STATUS_TEXT.get(status, "")
 
             if count == 0:
                 observation = f"📋 当前没有{status_text}任务"
             else:
-                lines = [f"📋 找到 {count} 个{status_text}任务:"]
-                for i, task in enumerate(task_list, 1):
-                    priority_icon = {"high": "🔴", "urgent": "🔴", "medium": "🟡", "low": "🟢"}.get(
-                        task.get("priority", "medium"), "⚪"
-                    )
-                    time_str = ""
-                    if task.get("due_date"):
-                        try:
-                            dt = datetime.fromisoformat(task["due_date"].replace('Z', '+00:00'))
-                            time_str = f" ⏰ {dt.strftime('%m-%d %H:%M')}"
-                        except (ValueError, KeyError):
-                            pass
-                    lines.append(f"  {i}. {priority_icon} {task['title']}{time_str}")
-                observation = "\n".join(lines)
+                observation = f"📋 找到 {count} 个{status_text}任务:\n" + "\n".join(lines)
 
             return ToolResult(
                 success=True,
@@ -213,10 +210,7 @@ class CompleteTaskTool(Tool):
                     )
 
             if title_keyword:
-                candidates = [
-                    t for t in self.tasks.list_tasks(status="pending")
-                    if title_keyword.lower() in t.title.lower()
-                ]
+                candidates = self.tasks.search_pending(title_keyword)
 
                 if len(candidates) == 0:
                     return ToolResult(
@@ -322,7 +316,7 @@ class DeleteTasksTool(Tool):
             # 执行删除
             if delete_all:
                 pending = self.tasks.list_tasks(status="pending")
-                count = sum(1 for t in pending if self.tasks.delete(t.id))
+                count = self.tasks.delete_many([t.id for t in pending])
 
                 return ToolResult(
                     success=True,
@@ -331,7 +325,7 @@ class DeleteTasksTool(Tool):
                 )
 
             if task_ids:
-                count = sum(1 for tid in task_ids if self.tasks.delete(tid))
+                count = self.tasks.delete_many(task_ids)
 
                 return ToolResult(
                     success=True,
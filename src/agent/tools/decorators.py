@@ -5,10 +5,12 @@
 提供简洁的工具定义方式，自动从函数签名生成 OpenAI Function Schema
 """
 import asyncio
+import functools
 import inspect
 import logging
-from dataclasses import dataclass, field
-from typing import Any, Callable, Optional, get_type_hints
+import types
+from dataclasses import dataclass, field, replace
+from typing import Any, Callable, Optional, Union, get_args, get_origin, get_type_hints
 
 from .base import Tool, ToolParameter, ToolResult
 
@@ -33,43 +35,56 @@ TYPE_MAP = {
 }
 
 
-def _python_type_to_json(py_type: Any) -> str:
-    """将 Python 类型转换为 JSON Schema 类型"""
-    if py_type in TYPE_MAP:
-        return TYPE_MAP[py_type]
+# 泛型容器（list[int]、Dict[str, Any] 等）按 get_origin 的结果映射
+_ORIGIN_MAP = {
+    list: "array",
+    tuple: "array",
+    set: "array",
+    frozenset: "array",
+    dict: "object",
+}
+
+_UNION_TYPES = (Union, types.UnionType)
+_NONE_TYPE = type(None)
 
-    # 处理 typing 模块的类型
-    type_str = str(py_type)
 
-    # Optional[X] 或 Union[X, None]
-    if 'Optional' in type_str or 'Union' in type_str:
-        # 提取内部类型
-        if hasattr(py_type, '__args__'):
-            inner_type = py_type.__args__[0]
-            return _python_type_to_json(inner_type)
+def _python_type_to_json(py_type: Any) -> str:
+    """将 Python 类型转换为 JSON Schema 类型"""
+    json_type = TYPE_MAP.get(py_type)
+    if json_type is not None:
+        return json_type
 
-    # List[X]
-    if 'list' in type_str.lower():
-        return "array"
+    origin = get_origin(py_type)
 
-    # Dict[X, Y]
-    if 'dict' in type_str.lower():
-        return "object"
+    # Optional[X]、Union[X, None]、X | None：取第一个非 None 的类型
+    if origin in _UNION_TYPES:
+        for arg in get_args(py_type):
+            if arg is not _NONE_TYPE:
+                return _python_type_to_json(arg)
+        return "string"
 
     # 默认为 string
-    return "string"
+    return _ORIGIN_MAP.get(origin, "string")
 
 
 def _extract_parameters(func: Callable) -> list[ToolParameter]:
-    """从函数签名提取参数定义"""
+    """从函数签名提取参数定义（按函数对象缓存解析结果，每次返回新的参数对象）"""
+    return [replace(p) for p in _cached_parameters(func)]
+
+
+@functools.lru_cache(maxsize=256)
+def _cached_parameters(func: Callable) -> tuple[ToolParameter, ...]:
+    """解析函数签名与类型提示（get_type_hints 会 eval 前向引用，开销较大）"""
     params = []
     sig = inspect.signature(func)
 
-    # 获取类型提示
-    try:
-        type_hints = get_type_hints(func)
-    except Exception:
-        type_hints = {}
+    # 获取类型提示（没有注解时跳过解析）
+    type_hints = {}
+    if getattr(func, '__annotations__', None):
+        try:
+            type_hints = get_type_hints(func)
+        except Exception:
+            pass
 
     for name, param in sig.parameters.items():
         # 跳过 self 和 cls
@@ -95,7 +110,7 @@ def _extract_parameters(func: Callable) -> list[ToolParameter]:
             default=default
         ))
 
-    return params
+    return tuple(params)
 
 
 def _extract_description(func: Callable) -> str:
@@ -112,6 +127,8 @@ class DecoratedTool(Tool):
     _func: Callable = field(default=None)
     _is_async: bool = field(default=False)
     _timeout: float = field(default=30.0)
+    # 同步函数放到线程池执行，避免阻塞事件循环（函数需要是线程安全的）
+    _sync_in_thread: bool = field(default=True)
 
     def __post_init__(self):
         if not self.name:
@@ -121,10 +138,14 @@ class DecoratedTool(Tool):
         """执行工具函数"""
         try:
             if self._is_async:
-                result = await asyncio.wait_for(
-                    self._func(**kwargs),
-                    timeout=self._timeout
-                )
+                if self._timeout and self._timeout > 0:
+                    async with asyncio.timeout(self._timeout):
+                        result = await self._func(**kwargs)
+                else:
+                    # 不限时：直接等待，不注册超时回调
+                    result = await self._func(**kwargs)
+            elif self._sync_in_thread:
+                result = await asyncio.to_thread(self._func, **kwargs)
             else:
                 result = self._func(**kwargs)
 
@@ -161,11 +182,17 @@ class DecoratedTool(Tool):
             )
 
 
+class InlineDecoratedTool(DecoratedTool):
+    """在事件循环线程内直接执行的同步函数工具（超时无法生效，execute_safe 不再包装）"""
+    is_synchronous = True
+
+
 def tool(
     name: Optional[str] = None,
     description: Optional[str] = None,
     timeout: float = 30.0,
-    parameters: Optional[list[ToolParameter]] = None
+    parameters: Optional[list[ToolParameter]] = None,
+    sync_in_thread: bool = True
 ) -> Callable:
     """
     装饰器: 将函数转换为工具
@@ -177,6 +204,8 @@ def tool(
         description: 工具描述 (默认从 docstring 提取)
         timeout: 执行超时时间 (秒)
         parameters: 自定义参数列表 (默认从函数签名提取)
+        sync_in_thread: 同步函数是否在线程池中执行 (默认是；
+            只做内存计算、耗时极短或非线程安全的函数可以关闭)
 
     Returns:
         装饰后的工具实例
@@ -205,11 +234,13 @@ def tool(
         # 判断是否是异步函数
         is_async = inspect.iscoroutinefunction(func)
 
-        # 创建工具实例
-        tool_instance = DecoratedTool(
+        # 创建工具实例（在事件循环线程内直接执行的同步函数使用 InlineDecoratedTool）
+        tool_cls = DecoratedTool if is_async or sync_in_thread else InlineDecoratedTool
+        tool_instance = tool_cls(
             _func=func,
             _is_async=is_async,
-            _timeout=timeout
+            _timeout=timeout,
+            _sync_in_thread=sync_in_thread
         )
 
         # 设置工具属性
@@ -25,6 +25,10 @@ class ToolRegistry:
     def __init__(self):
         self._tools: dict[str, Tool] = {}
         self._schemas: list[dict] = []
+        self._by_category: dict[str, list[Tool]] = {}
+        self._version = 0  # 每次注册递增，供调用方判断缓存是否失效
+        self._defs_cache: list[dict] = []
+        self._defs_version = -1
 
     def register(self, tool: Tool) -> 'ToolRegistry':
         """
@@ -42,10 +46,15 @@ class ToolRegistry:
                 s for s in self._schemas
                 if s.get('function', {}).get('name') != tool.name
             ]
+            # 移除旧的分类记录
+            old_tool = self._tools[tool.name]
+            self._by_category[old_tool.get_category()].remove(old_tool)
             logger.warning(f"工具 {tool.name} 已存在，将被覆盖")
 
         self._tools[tool.name] = tool
         self._schemas.append(tool.get_schema())
+        self._by_category.setdefault(tool.get_category(), []).append(tool)
+        self._version += 1
 
         logger.debug(f"注册工具: {tool.name}")
         return self
@@ -64,6 +73,18 @@ class ToolRegistry:
             self.register(tool)
         return self
 
+    @property
+    def version(self) -> int:
+        """
+        注册表版本号
+
+        每次注册工具后递增，可用于缓存基于工具集生成的内容
+
+        Returns:
+            版本号
+        """
+        return self._version
+
     def get(self, name: str) -> Optional[Tool]:
         """
         获取工具
@@ -97,6 +118,21 @@ class ToolRegistry:
         """
         return list(self._tools.values())
 
+    def get_by_category(self) -> dict[str, list[Tool]]:
+        """
+        按类别获取工具
+
+        分类在注册时完成，这里直接返回预先分好的列表
+
+        Returns:
+            类别 -> 工具列表
+        """
+        return {
+            category: list(tools)
+            for category, tools in self._by_category.items()
+            if tools
+        }
+
     def get_schemas(self) -> list[dict]:
         """
         获取所有工具的 Function Calling Schema
@@ -106,6 +142,20 @@ class ToolRegistry:
         """
         return self._schemas.copy()
 
+    def get_tool_definitions(self) -> list[dict]:
+        """
+        获取工具定义（按注册表版本缓存）
+
+        与 get_schemas 不同，返回的是共享列表，调用方不应修改
+
+        Returns:
+            Schema 列表
+        """
+        if self._defs_version != self._version:
+            self._defs_cache = self._schemas.copy()
+            self._defs_version = self._version
+        return self._defs_cache
+
     def get_names(self) -> list[str]:
         """
         获取所有工具名
@@ -6,12 +6,18 @@
 """
 import asyncio
 import logging
-from typing import Callable, Awaitable
+from collections import defaultdict
+from typing import Awaitable, Callable, Optional
 
 from .events import InboundMessage, OutboundMessage
 
 logger = logging.getLogger('bus')
 
+# 同时执行的入站处理器调用上限
+DEFAULT_INBOUND_CONCURRENCY = 32
+# 合并发送的出站队列容量（队列满时 publish_outbound 等待，形成背压）
+DEFAULT_OUTBOUND_QUEUE_SIZE = 256
+
 
 class MessageBus:
     """
@@ -23,13 +29,24 @@ class MessageBus:
     3. 解耦通道与Agent
     """
 
-    def __init__(self):
+    def __init__(self, inbound_concurrency: int = DEFAULT_INBOUND_CONCURRENCY):
+        """
+        Args:
+            inbound_concurrency: 同时执行的入站处理器调用上限（消息突发时提供背压）
+        """
         # 入站消息处理器列表
         self._inbound_handlers: list[Callable[[InboundMessage], Awaitable[None]]] = []
         # 出站消息处理器 (每个通道一个)
         self._outbound_handlers: dict[str, Callable[[OutboundMessage], Awaitable[None]]] = {}
+        # 可选的出站批量处理器 (一次发送同一通道的多条消息)
+        self._outbound_batch_handlers: dict[str, Callable[[list[OutboundMessage]], Awaitable[None]]] = {}
+        # 出站合并发送：通道 -> 合并窗口（秒）、队列、发送协程
+        self._coalesce_windows: dict[str, float] = {}
+        self._out_queues: dict[str, asyncio.Queue] = {}
+        self._out_flushers: dict[str, asyncio.Task] = {}
         # 运行状态
         self._running = False
+        self._inbound_slots = asyncio.Semaphore(inbound_concurrency)
 
     def subscribe_inbound(self, handler: Callable[[InboundMessage], Awaitable[None]]) -> None:
         """
@@ -49,7 +66,9 @@ class MessageBus:
     def register_outbound_handler(
         self,
         channel: str,
-        handler: Callable[[OutboundMessage], Awaitable[None]]
+        handler: Callable[[OutboundMessage], Awaitable[None]],
+        batch_handler: Optional[Callable[[list[OutboundMessage]], Awaitable[None]]] = None,
+        coalesce_window: float = 0.0
     ) -> None:
         """
         注册出站消息处理器
@@ -57,8 +76,19 @@ class MessageBus:
         Args:
             channel: 通道名称
             handler: 发送消息的异步函数
+            batch_handler: 可选，一次发送多条消息的异步函数（publish_outbound_many 优先使用）
+            coalesce_window: 合并窗口（秒）。大于 0 时 publish_outbound 只入队，
+                由后台协程收集窗口内的消息后一次发送（适合有速率限制的通道）
         """
         self._outbound_handlers[channel] = handler
+        if batch_handler:
+            self._outbound_batch_handlers[channel] = batch_handler
+        else:
+            self._outbound_batch_handlers.pop(channel, None)
+        if coalesce_window > 0:
+            self._coalesce_windows[channel] = coalesce_window
+        else:
+            self._coalesce_windows.pop(channel, None)
         logger.debug(f"出站消息处理器已注册: {channel}")
 
     async def publish_inbound(self, message: InboundMessage) -> None:
@@ -69,25 +99,109 @@ class MessageBus:
         """
         logger.debug(f"入站消息: {message.channel}:{message.sender_id}")
 
-        # 并行调用所有处理器
-        if self._inbound_handlers:
-            await asyncio.gather(*[
-                self._safe_call(handler, message)
-                for handler in self._inbound_handlers
-            ])
+        handlers = self._inbound_handlers
+        if len(handlers) == 1:
+            # 常见情况：只有一个处理器，不需要创建任务
+            await self._call_inbound(handlers[0], message)
+        elif handlers:
+            # 并行调用所有处理器（快照，避免处理期间订阅变化）
+            async with asyncio.TaskGroup() as tg:
+                for handler in tuple(handlers):
+                    tg.create_task(self._call_inbound(handler, message))
 
     async def publish_outbound(self, message: OutboundMessage) -> None:
         """
         发布出站消息
 
-        根据 channel 路由到对应处理器
+        根据 channel 路由到对应处理器；开启合并发送的通道只入队
         """
+        if message.channel in self._coalesce_windows:
+            await self._ensure_flusher(message.channel).put(message)
+            return
+
         handler = self._outbound_handlers.get(message.channel)
         if handler:
             await self._safe_call(handler, message)
         else:
             logger.warning(f"无出站处理器: {message.channel}")
 
+    async def publish_outbound_many(self, messages: list[OutboundMessage]) -> None:
+        """
+        批量发布出站消息
+
+        按通道分组，不同通道并行发送；同一通道内保持顺序。
+        通道注册了批量处理器时一次交给它发送。
+        """
+        by_channel: dict[str, list[OutboundMessage]] = defaultdict(list)
+        for message in messages:
+            by_channel[message.channel].append(message)
+
+        if len(by_channel) == 1:
+            channel, channel_messages = next(iter(by_channel.items()))
+            await self._dispatch_channel(channel, channel_messages)
+        elif by_channel:
+            async with asyncio.TaskGroup() as tg:
+                for channel, channel_messages in by_channel.items():
+                    tg.create_task(self._dispatch_channel(channel, channel_messages))
+
+    async def _dispatch_channel(self, channel: str, messages: list[OutboundMessage]) -> None:
+        """把同一通道的消息按顺序发送出去"""
+        batch_handler = self._outbound_batch_handlers.get(channel)
+        if batch_handler:
+            await self._safe_call(batch_handler, messages)
+            return
+
+        handler = self._outbound_handlers.get(channel)
+        if not handler:
+            logger.warning(f"无出站处理器: {channel}")
+            return
+        for message in messages:
+            await self._safe_call(handler, message)
+
+    def _ensure_flusher(self, channel: str) -> asyncio.Queue:
+        """获取通道的出站队列，首次使用时启动发送协程"""
+        flusher = self._out_flushers.get(channel)
+        if flusher is None or flusher.done():
+            queue = asyncio.Queue(maxsize=DEFAULT_OUTBOUND_QUEUE_SIZE)
+            self._out_queues[channel] = queue
+            self._out_flushers[channel] = asyncio.get_running_loop().create_task(
+                self._flush_loop(channel, queue)
+            )
+        return self._out_queues[channel]
+
+    async def _flush_loop(self, channel: str, queue: asyncio.Queue) -> None:
+        """等待合并窗口后取出队列中的全部消息，一次发送"""
+        while True:
+            batch = [await queue.get()]
+            await asyncio.sleep(self._coalesce_windows.get(channel, 0))
+            while not queue.empty():
+                batch.append(queue.get_nowait())
+
+            try:
+                await self._dispatch_channel(channel, batch)
+            finally:
+                for _ in batch:
+                    queue.task_done()
+
+    async def flush_outbound(self) -> None:
+        """等待所有合并队列中的消息发送完成"""
+        for queue in list(self._out_queues.values()):
+            await queue.join()
+
+    async def aclose(self) -> None:
+        """停止出站发送协程（未发送的消息被丢弃）"""
+        flushers = list(self._out_flushers.values())
+        for flusher in flushers:
+            flusher.cancel()
+        await asyncio.gather(*flushers, return_exceptions=True)
+        self._out_flushers.clear()
+        self._out_queues.clear()
+
+    async def _call_inbound(self, handler, message) -> None:
+        """占用一个并发名额后调用入站处理器"""
+        async with self._inbound_slots:
+            await self._safe_call(handler, message)
+
     async def _safe_call(self, handler, message) -> None:
         """安全调用处理器，捕获异常"""
         try:
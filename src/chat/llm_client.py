@@ -18,6 +18,7 @@ except ImportError:
     repair_json = None
 
 from .exceptions import LLMClientError, ModelNotSupportedError
+from ..utils.helpers import json_loads
 
 logger = logging.getLogger('chat.llm')
 
@@ -143,7 +144,7 @@ class OpenAIClient(LLMClient):
 
         try:
             with urllib.request.urlopen(req, timeout=120) as response:
-                result = json.loads(response.read().decode('utf-8'))
+                result = json_loads(response.read())
                 return result["choices"][0]["message"]["content"]
         except Exception as e:
             logger.error(f"OpenAI API 错误: {e}")
@@ -220,11 +221,11 @@ class MiniMaxClient(LLMClient):
 
         try:
             with urllib.request.urlopen(req, timeout=120) as response:
-                result = json.loads(response.read().decode('utf-8'))
+                result = json_loads(response.read())
                 return result["choices"][0]["message"]["content"]
         except urllib.error.HTTPError as e:
             try:
-                error_body = e.read().decode('utf-8')
+                error_body = e.read().decode('utf-8', errors='replace')
             except (UnicodeDecodeError, OSError):
                 error_body = "No error body"
             logger.error(f"MiniMax HTTP 错误 {e.code}: {error_body}")
@@ -305,7 +306,7 @@ class MiniMaxClient(LLMClient):
                         raise
         except urllib.error.HTTPError as e:
             try:
-                error_body = e.read().decode('utf-8')
+                error_body = e.read().decode('utf-8', errors='replace')
             except (UnicodeDecodeError, OSError):
                 error_body = "No error body"
             logger.error(f"MiniMax HTTP 错误 {e.code}: {error_body}")
@@ -365,7 +366,7 @@ class OllamaClient(LLMClient):
 
         try:
             with urllib.request.urlopen(req, timeout=300) as response:
-                result = json.loads(response.read().decode('utf-8'))
+                result = json_loads(response.read())
                 return result["message"]["content"]
         except Exception as e:
             logger.error(f"Ollama 错误: {e}")
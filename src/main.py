@@ -8,6 +8,7 @@ Personal AI Assistant - 主入口
 import argparse
 import asyncio
 import logging
+import logging.handlers
 import os
 import sys
 from pathlib import Path
@@ -40,6 +41,17 @@ from src.personality import get_personality_manager
 from src.agent import create_agent_system, SupervisorAgent
 
 
+class _FlushBufferHandler(logging.Handler):
+    """不输出记录，只在处理前刷新指定的缓冲处理器"""
+
+    def __init__(self, buffer: logging.handlers.MemoryHandler):
+        super().__init__()
+        self.buffer = buffer
+
+    def emit(self, record: logging.LogRecord):
+        self.buffer.flush()
+
+
 def setup_logging(level: str = "INFO"):
     """设置日志"""
     Path("data").mkdir(exist_ok=True)
@@ -66,9 +78,30 @@ def setup_logging(level: str = "INFO"):
         '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     ))
 
+    # 工具执行日志经内存缓冲批量落盘：工具调用密集时减少写入次数，
+    # 缓冲满 512 条或出现 ERROR 时立即刷新，退出时 logging.shutdown 会刷新剩余记录。
+    # 只缓冲 agent.tools 子树，其余模块仍直接写文件，异常退出时不会丢失
+    buffered_file_handler = logging.handlers.MemoryHandler(
+        capacity=512,
+        flushLevel=logging.ERROR,
+        target=file_handler
+    )
+    buffered_file_handler.setLevel(log_level)
+
+    # 其他模块写文件前先刷新工具日志缓冲，保持 app.log 中记录的先后顺序
+    flush_tools_handler = _FlushBufferHandler(buffered_file_handler)
+    flush_tools_handler.setLevel(log_level)
+
     root_logger.addHandler(console_handler)
+    root_logger.addHandler(flush_tools_handler)
     root_logger.addHandler(file_handler)
 
+    tools_logger = logging.getLogger('agent.tools')
+    tools_logger.handlers.clear()
+    tools_logger.addHandler(console_handler)
+    tools_logger.addHandler(buffered_file_handler)
+    tools_logger.propagate = False  # 已单独输出，避免经根日志重复写入
+
     # 降低第三方库和内部调试模块的日志级别
     noisy_loggers = [
         'agent.tools.base',
@@ -289,10 +322,14 @@ class PersonalAIAssistant:
             search_tool=self.search_tool,
             personality_manager=self.personality_manager,
             chat_session=self.chat_session,
-            fast_path_classifier=None  # 不再使用旧的意图分类器
+            fast_path_classifier=None,  # 不再使用旧的意图分类器
+            plan_cache_path=f"{self.settings.data_dir}/plan_cache.db"
         )
         logger.info(f"Agent 系统初始化完成，已注册 {len(self.agent.tools)} 个工具")
 
+        # 预热 LLM 连接，首个请求免去握手开销
+        await self.agent.prewarm()
+
         logger.info("初始化完成！")
 
     def _print_banner(self):
@@ -568,6 +605,8 @@ class PersonalAIAssistant:
             await self.auto_consolidation.stop()
         if self.scheduler:
             await self.scheduler.stop_all()
+        if self.agent:
+            await self.agent.close()
         if self.memory:
             self.memory.close()
         logger.info("已关闭")
@@ -18,6 +18,7 @@ from .memory_system import MemorySystem
 from .markdown_exporter import MarkdownExporter
 from .auto_consolidation import AutoConsolidationScheduler, ConsolidationResult
 from .fallback_client import FallbackMemoryClient
+from .write_batcher import MemoryWriteBatcher
 
 __all__ = [
     'MemoryEntry',
@@ -38,4 +39,5 @@ __all__ = [
     'AutoConsolidationScheduler',
     'ConsolidationResult',
     'FallbackMemoryClient',
+    'MemoryWriteBatcher',
 ]
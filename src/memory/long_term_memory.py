@@ -6,6 +6,7 @@
 import json
 import logging
 import sqlite3
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Optional
@@ -28,16 +29,21 @@ class LongTermMemory:
         self.embedding_dim = embedding_dim
         self._conn: Optional[sqlite3.Connection] = None
         self._vec_available = False
+        self._batch_depth = 0  # >0 时 store 不单独提交事务
 
         self._init_db()
 
     def _init_db(self):
-        """初始化数据库"""
+        """
+        初始化数据库
+
+        Agent 会在线程中执行记忆检索，连接允许跨线程使用（SQLite 为串行化模式）
+        """
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
 
         try:
             import sqlite_vec
-            self._conn = sqlite3.connect(str(self.db_path))
+            self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
             self._conn.enable_load_extension(True)
             sqlite_vec.load(self._conn)
             self._conn.enable_load_extension(False)
@@ -46,7 +52,7 @@ class LongTermMemory:
             logger.info(f"SQLite-Vec 初始化成功: {self.db_path}")
         except ImportError:
             logger.warning("SQLite-Vec 未安装，使用纯SQLite回退模式")
-            self._conn = sqlite3.connect(str(self.db_path))
+            self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
             self._create_fallback_tables()
 
     def _create_vec_tables(self):
@@ -158,12 +164,28 @@ class LongTermMemory:
                 json.dumps(entry.metadata)
             ))
 
-            self._conn.commit()
+            if not self._batch_depth:
+                self._conn.commit()
             return True
         except Exception as e:
             logger.error(f"存储记忆失败: {e}")
             return False
 
+    @contextmanager
+    def batch(self):
+        """
+        批量写入
+
+        期间的 store 不单独提交，退出时统一提交一次事务。
+        """
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if not self._batch_depth and self._conn:
+                self._conn.commit()
+
     def search_by_vector(
         self,
         query_embedding: list[float],
@@ -6,7 +6,7 @@
 """
 import logging
 from pathlib import Path
-from typing import Callable, Optional
+from typing import Callable, Optional, Union
 
 from .types import MemoryEntry, MemoryConfidence, MemoryType
 from .working_memory import WorkingMemory, WorkingMemoryConfig
@@ -81,6 +81,8 @@ class MemorySystem:
             "last_consolidation": None,
             "fallback_mode": self._using_fallback,
         }
+        # 写入和整合时递增；与工作记忆版本一起构成 generation
+        self._generation = 0
 
         logger.info(f"记忆系统初始化完成（{'Fallback 模式' if self._using_fallback else '正常模式'}）")
 
@@ -159,6 +161,7 @@ class MemorySystem:
 
         if success:
             self.stats["memories_added"] += 1
+            self._generation += 1
 
             # L0: 如果是高置信度事实，加入工作记忆
             if confidence == MemoryConfidence.FACT:
@@ -176,6 +179,32 @@ class MemorySystem:
 
         return ""
 
+    def capture_many(self, items: list[dict]) -> list[Union[str, Exception]]:
+        """
+        批量捕获记忆
+
+        逐条执行 capture，长期记忆的写入在同一个事务中提交。
+        单条失败不影响其余条目，异常原样放回结果中由调用方处理。
+
+        Args:
+            items: 每项为 capture 的关键字参数
+
+        Returns:
+            与 items 一一对应的记忆ID，失败的条目为对应的异常
+        """
+        def capture_one(item: dict) -> Union[str, Exception]:
+            try:
+                return self.capture(**item)
+            except Exception as e:
+                logger.warning(f"捕获记忆失败: {e}")
+                return e
+
+        if self.long_term_memory is None:
+            return [capture_one(item) for item in items]
+
+        with self.long_term_memory.batch():
+            return [capture_one(item) for item in items]
+
     def _store_with_fallback(self, entry: MemoryEntry, embedding: Optional[list[float]] = None) -> bool:
         """
         存储记忆（带 Fallback 机制）
@@ -326,8 +355,18 @@ class MemorySystem:
         """
         stats = self.consolidation.run(days_back=7, dry_run=dry_run)
         self.stats["last_consolidation"] = stats
+        self._generation += 1
         return stats
 
+    @property
+    def generation(self) -> int:
+        """
+        记忆内容的代次
+
+        写入、整合或工作记忆变化后递增，recall 结果缓存以此判断是否失效。
+        """
+        return self._generation + self.working_memory.version
+
     def export(self, output_path: Optional[str] = None) -> str:
         """
         导出记忆为 JSONL
@@ -136,6 +136,7 @@ class WorkingMemory:
         self.slots: dict[str, WorkingMemorySlot] = {}
         self.messages: list[Message] = []
         self._summary: str = ""  # 历史对话摘要
+        self.version = 0  # 槽位或摘要每次变化时递增，供外部缓存判断是否失效
         self._init_slots()
 
     def _init_slots(self):
@@ -246,6 +247,7 @@ class WorkingMemory:
                 self._summary = f"{self._summary}; {new_summary}"
             else:
                 self._summary = new_summary
+            self.version += 1
 
         self.messages = system_msgs + recent_msgs
         logger.debug(f"压缩上下文: 保留 {len(self.messages)} 条消息, 摘要长度 {len(self._summary)}")
@@ -288,11 +290,13 @@ class WorkingMemory:
     def set_identity(self, content: str):
         """设置身份信息（用户偏好、背景等）"""
         self.slots['identity'].content = content
+        self.version += 1
         logger.debug(f"更新身份信息: {len(content)} 字符")
 
     def set_context(self, content: str):
         """设置当前上下文（最近对话等）"""
         self.slots['context'].content = content
+        self.version += 1
         logger.debug(f"更新上下文: {len(content)} 字符")
 
     def add_fact(self, fact: str):
@@ -302,6 +306,7 @@ class WorkingMemory:
             self.slots['facts'].content = current + "\n- " + fact
         else:
             self.slots['facts'].content = "- " + fact
+        self.version += 1
         logger.debug(f"添加事实: {fact[:50]}...")
 
     def get_full_context(self) -> str:
@@ -377,6 +382,8 @@ class WorkingMemory:
                 slot.content = "..." + slot.content[-keep_chars:]
                 logger.debug(f"简单压缩 {name} 槽位")
 
+        self.version += 1
+
         # 同时压缩消息
         self._manage_context()
 
@@ -428,6 +435,7 @@ class WorkingMemory:
         self.slots['context'].content = ''
         self.messages = []
         self._summary = ''
+        self.version += 1
         logger.debug("清空工作记忆上下文")
 
     def clear_all(self):
@@ -436,6 +444,7 @@ class WorkingMemory:
             slot.content = ''
         self.messages = []
         self._summary = ''
+        self.version += 1
         logger.debug("清空所有工作记忆")
 
     def write_slot(self, name: str, content: str, priority: float = 1.0):
@@ -451,6 +460,7 @@ class WorkingMemory:
         if name in self.slots:
             self.slots[name].content = content
             self.slots[name].priority = int(priority * 10)
+            self.version += 1
             return
 
         # 如果达到槽位上限，淘汰优先级最低的
@@ -463,6 +473,7 @@ class WorkingMemory:
             )
             if lowest_slot and lowest_slot.priority < priority * 10:
                 del self.slots[lowest_slot.name]
+                self.version += 1
                 logger.debug(f"淘汰槽位: {lowest_slot.name}")
             else:
                 logger.warning(f"槽位已满，无法添加: {name}")
@@ -475,6 +486,7 @@ class WorkingMemory:
             max_tokens=500,
             priority=int(priority * 10)
         )
+        self.version += 1
         logger.debug(f"创建槽位: {name}")
 
     def read_slot(self, name: str) -> Optional[WorkingMemorySlot]:
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+记忆写入批处理器
+
+把并发的 capture 请求合并后在一个工作线程中批量写入：
+- 写入串行化：多个工具并发写记忆时不会同时操作同一个 SQLite 连接
+- 一批只提交一次事务（MemorySystem.capture_many）
+- 不额外等待：空闲时请求立即写入，写入期间到达的请求自然合并到下一批
+"""
+import asyncio
+import logging
+from typing import Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .memory_system import MemorySystem
+
+logger = logging.getLogger('memory.write_batcher')
+
+
+class MemoryWriteBatcher:
+    """
+    记忆写入批处理器
+
+    Example:
+        batcher = MemoryWriteBatcher(memory_system)
+        memory_id = await batcher.capture(content="用户喜欢咖啡", tags=["preferences"])
+    """
+
+    def __init__(self, memory_system: 'MemorySystem', max_batch: int = 32):
+        """
+        Args:
+            memory_system: 记忆系统
+            max_batch: 单批最多写入条数
+        """
+        self.memory = memory_system
+        self.max_batch = max_batch
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _ensure_worker(self) -> asyncio.Queue:
+        """在当前事件循环中启动写入协程（首次使用或循环变化时）"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run(self._queue))
+        return self._queue
+
+    async def capture(self, **kwargs) -> str:
+        """
+        提交一条记忆，等待写入完成
+
+        Args:
+            **kwargs: MemorySystem.capture 的参数
+
+        Returns:
+            记忆ID
+
+        Raises:
+            Exception: 该条记忆写入失败时抛出 capture 的原始异常
+        """
+        queue = self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        queue.put_nowait((kwargs, future))
+        return await future
+
+    async def _run(self, queue: asyncio.Queue):
+        """取出当前排队的全部请求（最多 max_batch 条），一次线程切换完成写入"""
+        while True:
+            batch = [await queue.get()]
+            while len(batch) < self.max_batch and not queue.empty():
+                batch.append(queue.get_nowait())
+
+            try:
+                memory_ids = await asyncio.to_thread(
+                    self.memory.capture_many, [kwargs for kwargs, _ in batch]
+                )
+            except asyncio.CancelledError:
+                for _, future in batch:
+                    future.cancel()
+                raise
+            except Exception as e:
+                logger.warning("批量写入记忆失败: %s", e)
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            if len(batch) > 1:
+                logger.debug("批量写入 %d 条记忆", len(batch))
+            for (_, future), memory_id in zip(batch, memory_ids):
+                if future.done():
+                    continue
+                if isinstance(memory_id, Exception):
+                    future.set_exception(memory_id)
+                else:
+                    future.set_result(memory_id)
+
+    async def aclose(self):
+        """停止写入协程，尚未完成的请求以取消结束"""
+        if self._worker is None:
+            return
+
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+        while not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            future.cancel()
@@ -138,6 +138,25 @@ class TaskManager:
             return True
         return False
 
+    def delete_many(self, task_ids: list[str]) -> int:
+        """
+        批量删除任务（只写一次文件）
+
+        Args:
+            task_ids: 任务ID列表
+
+        Returns:
+            实际删除的数量
+        """
+        count = 0
+        for task_id in set(task_ids):
+            if self.tasks.pop(task_id, None) is not None:
+                count += 1
+
+        if count:
+            self._save_tasks()
+        return count
+
     def complete(self, task_id: str, result: str = "") -> bool:
         """
         完成任务
@@ -198,6 +217,22 @@ class TaskManager:
 
         return result
 
+    def search_pending(self, keyword: str) -> list[Task]:
+        """
+        按标题关键词查找待办任务（不区分大小写）
+
+        Args:
+            keyword: 标题关键词
+
+        Returns:
+            标题包含关键词的待办任务
+        """
+        keyword = keyword.lower()
+        return [
+            t for t in self.tasks.values()
+            if t.status == TaskStatus.PENDING and keyword in t.title_lower
+        ]
+
     def start(self, task_id: str) -> bool:
         """开始执行任务"""
         task = self.tasks.get(task_id)
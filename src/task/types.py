@@ -99,6 +99,18 @@ class Task:
     last_reminder: Optional[datetime] = None
     metadata: dict = field(default_factory=dict)
 
+    # 小写标题缓存 (title, title.lower())，标题被修改后自动重新计算
+    _title_lower: tuple[str, str] = field(default=("", ""), init=False, repr=False, compare=False)
+
+    @property
+    def title_lower(self) -> str:
+        """小写标题（用于关键词匹配，每个标题只转换一次）"""
+        title, lower = self._title_lower
+        if title is not self.title:
+            lower = self.title.lower()
+            self._title_lower = (self.title, lower)
+        return lower
+
     def calculate_priority_score(self) -> float:
         """计算优先级分数"""
         base_score = self.priority.calculate()
@@ -17,6 +17,8 @@ from typing import Dict, List, Optional, Any
 from enum import Enum
 import yaml
 
+from ..utils.helpers import json_loads
+
 logger = logging.getLogger('tools.mcp_config')
 
 
@@ -242,7 +244,7 @@ class MCPConfigManager:
             if path.suffix in ['.yaml', '.yml']:
                 config_data = yaml.safe_load(content)
             else:
-                config_data = json.loads(content)
+                config_data = json_loads(content)
 
             configs = []
 
@@ -464,7 +466,7 @@ class MCPConfigManager:
 
         try:
             content = path.read_text(encoding='utf-8')
-            data = json.loads(content)
+            data = json_loads(content)
 
             mcp_servers = data.get("mcpServers", {})
             configs = []
@@ -519,7 +521,7 @@ class MCPConfigManager:
             加载的服务配置列表
         """
         try:
-            data = json.loads(json_content)
+            data = json_loads(json_content)
 
             # 检测 Claude Desktop 格式
             if "mcpServers" in data:
@@ -5,13 +5,15 @@
 通用工具函数和辅助类
 """
 
-from .helpers import generate_id, format_timestamp, truncate_text
+from .helpers import generate_id, format_timestamp, truncate_text, json_loads, json_dumps
 from .validators import validate_email, validate_url
 
 __all__ = [
     'generate_id',
     'format_timestamp',
     'truncate_text',
+    'json_loads',
+    'json_dumps',
     'validate_email',
     'validate_url',
 ]
@@ -3,8 +3,17 @@
 通用辅助函数
 """
 import hashlib
+import json
 import uuid
 from datetime import datetime
+from typing import Any
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+    orjson = None
 
 
 def generate_id(prefix: str = "") -> str:
@@ -102,6 +111,41 @@ def estimate_tokens(text: str) -> int:
     return int(chinese_tokens + other_tokens)
 
 
+def json_loads(content: str | bytes) -> Any:
+    """
+    解析 JSON
+
+    安装了 orjson 时使用其 C 解析器，否则回退到标准库 json。
+    两者的解析错误都是 json.JSONDecodeError（ValueError）的子类。
+
+    Args:
+        content: JSON 字符串或字节串
+
+    Returns:
+        解析后的对象
+    """
+    if HAS_ORJSON:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def json_dumps(obj: Any) -> bytes:
+    """
+    序列化为 UTF-8 编码的 JSON 字节串
+
+    安装了 orjson 时直接返回其输出的 bytes，否则使用标准库 json 再编码。
+
+    Args:
+        obj: 待序列化对象
+
+    Returns:
+        JSON 字节串
+    """
+    if HAS_ORJSON:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False).encode('utf-8')
+
+
 def sanitize_filename(filename: str) -> str:
     """
     清理文件名，移除非法字符
@@ -2,10 +2,22 @@
 """
 Agent core logic tests
 """
+
+import asyncio
+
 import pytest
 from unittest.mock import MagicMock, AsyncMock
 
-from src.agent.supervisor import SupervisorAgent, ExecutionMode, ExecutionPlan, Step
+from src.agent.supervisor import (
+    AgentContext,
+    SupervisorAgent,
+    ExecutionMode,
+    ExecutionPlan,
+    LatencyHistogram,
+    MetricsCollector,
+    Step,
+    _JsonObjectScanner,
+)
 from src.agent.tools.registry import ToolRegistry
 from src.agent.tools.base import Tool, ToolResult, ToolParameter
 
@@ -23,10 +35,48 @@ class MockTool(Tool):
         return ToolResult(
             success=True,
             data={"result": f"processed: {input}"},
-            observation="Mock tool executed successfully"
+            observation="Mock tool executed successfully",
         )
 
 
+class ChatTool(Tool):
+    """Mock chat tool for testing"""
+
+    name = "chat"
+    description = "Chat with the user"
+    parameters = []
+
+    async def execute(self, **kwargs) -> ToolResult:
+        return ToolResult(success=True, data={}, observation="")
+
+
+class SlowTool(Tool):
+    """Mock I/O-bound tool that records start/end events"""
+
+    name = "slow_tool"
+    description = "Sleeps briefly"
+    read_only = True
+    parameters = [
+        ToolParameter(name="label", type="string", description="Step label", required=True)
+    ]
+
+    def __init__(self):
+        super().__init__()
+        self.events = []
+
+    async def execute(self, label: str) -> ToolResult:
+        self.events.append(f"start {label}")
+        await asyncio.sleep(0.1)
+        self.events.append(f"end {label}")
+        return ToolResult(success=True, data={}, observation=label)
+
+
+async def async_iter(items):
+    """Async generator over items"""
+    for item in items:
+        yield item
+
+
 @pytest.fixture
 def mock_llm_client():
     """Create mock LLM client"""
@@ -47,10 +97,7 @@ def tool_registry():
 @pytest.fixture
 def supervisor_agent(mock_llm_client, tool_registry):
     """Create SupervisorAgent instance"""
-    return SupervisorAgent(
-        llm_client=mock_llm_client,
-        tool_registry=tool_registry
-    )
+    return SupervisorAgent(llm_client=mock_llm_client, tool_registry=tool_registry)
 
 
 class TestExecutionMode:
@@ -129,17 +176,229 @@ class TestIntentAnalysis:
             result = await supervisor_agent._analyze_intent(input_text)
             assert result == ExecutionMode.SINGLE_STEP, f"Expected SINGLE_STEP for '{input_text}'"
 
+    def test_confirmation_and_cancel_match_whole_reply(self, supervisor_agent):
+        """Confirmation/cancel words only match the whole reply"""
+        assert supervisor_agent._is_confirmation(" YES ")
+        assert supervisor_agent._is_cancel("算了")
+        assert not supervisor_agent._is_cancel("算了吧，再帮我做一次")
+        assert not supervisor_agent._is_confirmation("确认一下明天的任务")
+
+
+class TestStaticPlan:
+    """Test keyword shortcuts that skip LLM planning"""
+
+    @pytest.fixture
+    def agent(self, supervisor_agent):
+        for name in ("delete_tasks", "list_tasks"):
+            tool = ChatTool()
+            tool.name = name
+            supervisor_agent.tools.register(tool)
+        return supervisor_agent
+
+    @pytest.mark.asyncio
+    async def test_clear_tasks_skips_llm(self, agent):
+        """Short clear-tasks requests plan delete_tasks without calling the LLM"""
+        agent.llm.generate_with_tools = AsyncMock()
+
+        plan = await agent._plan("帮我清理这些任务", ExecutionMode.SINGLE_STEP, memory_snippet="")
+
+        agent.llm.generate_with_tools.assert_not_called()
+        assert [(s.tool_name, s.parameters) for s in plan.steps] == [
+            ("delete_tasks", {"delete_all": True, "confirmed": False})
+        ]
+
+    def test_list_tasks_shortcut(self, agent):
+        """Short view requests plan list_tasks"""
+        plan = agent._static_plan("我有什么任务")
+
+        assert plan.steps[0].tool_name == "list_tasks"
+
+    @pytest.mark.parametrize(
+        "user_input",
+        [
+            "删除任务买牛奶",
+            "清理任务然后查看任务",
+            "帮我看看任务列表里明天要做的那些事情",
+        ],
+    )
+    def test_ambiguous_inputs_fall_back(self, agent, user_input):
+        """Specific, mixed or long requests still go through the LLM"""
+        assert agent._static_plan(user_input) is None
+
+    @pytest.mark.parametrize(
+        "user_input",
+        [
+            "添加待办事项买牛奶",
+            "帮我添加待办事项",
+            "完成待办事项",
+            "提醒我查看任务",
+            "清理这些记忆",
+        ],
+    )
+    def test_other_intents_fall_back(self, agent, user_input):
+        """Create, complete or non-task requests never become list/clear plans"""
+        assert agent._static_plan(user_input) is None
+
+
+class TestMultiStepPlanning:
+    """Test streamed multi-step planning"""
+
+    def test_json_scanner_handles_split_chunks(self):
+        """Scanner returns the first balanced object across chunk boundaries"""
+        scanner = _JsonObjectScanner()
+        chunks = ['好的：{"goal": "a{', '\\"}", "steps": [{"tool"', ': "x"}]}', " 多余内容 {}"]
+
+        results = [scanner.feed(c) for c in chunks]
+
+        assert results[:2] == [None, None]
+        assert results[2] == '{"goal": "a{\\"}", "steps": [{"tool": "x"}]}'
+
+    @pytest.mark.asyncio
+    async def test_plan_stops_reading_after_json_closes(self, supervisor_agent):
+        """Planner stops consuming the stream once the plan JSON is complete"""
+        consumed = []
+
+        async def stream(*args, **kwargs):
+            for chunk in [
+                '{"goal": "g", "steps": [{"tool": "mock_tool", ',
+                '"params": {}}]}',
+                "tail",
+            ]:
+                consumed.append(chunk)
+                yield chunk
+
+        supervisor_agent.llm.stream_generate = stream
+        plan = await supervisor_agent._plan_multi_step("整理并总结", memory_snippet="")
+
+        assert [s.tool_name for s in plan.steps] == ["mock_tool"]
+        assert "tail" not in consumed
+
+    def test_tool_list_cached_until_registry_changes(self, supervisor_agent):
+        """Rendered tool list is reused until a tool is registered"""
+        first = supervisor_agent._format_tools()
+
+        assert first == "- mock_tool: A mock tool for testing"
+        assert supervisor_agent._format_tools() is first
+
+        supervisor_agent.tools.register(ChatTool())
+
+        assert "- chat:" in supervisor_agent._format_tools()
+
+    @pytest.mark.asyncio
+    async def test_plan_parses_dependencies(self, supervisor_agent):
+        """Step indices in depends_on are mapped to step IDs"""
+        reply = '{"goal": "g", "steps": [{"tool": "mock_tool"}, {"tool": "mock_tool", "depends_on": [0]}]}'
+        supervisor_agent.llm.stream_generate = lambda *args: async_iter([reply])
+
+        plan = await supervisor_agent._plan_multi_step("整理并总结", memory_snippet="")
+
+        assert [s.depends_on for s in plan.steps] == [[], ["step_0"]]
+
+    @pytest.mark.asyncio
+    async def test_plans_with_confirmation_tools_are_not_cached(self, supervisor_agent):
+        """Plans containing tools with a confirmation parameter never reach the plan cache"""
+
+        class DeleteTool(MockTool):
+            name = "delete_tasks"
+            parameters = [
+                ToolParameter(name="confirmed", type="boolean", description="", required=False)
+            ]
+
+        supervisor_agent.tools.register(DeleteTool())
+        supervisor_agent.plan_cache = MagicMock()
+        supervisor_agent.plan_cache.is_cacheable.return_value = True
+        supervisor_agent.plan_cache.store = AsyncMock()
+
+        plan = ExecutionPlan(
+            mode=ExecutionMode.SINGLE_STEP,
+            goal="g",
+            steps=[
+                Step(id="step_0", tool_name="delete_tasks", parameters={"delete_all": True}),
+            ],
+        )
+        await supervisor_agent._cache_plan("清理任务", plan)
+
+        supervisor_agent.plan_cache.store.assert_not_called()
+
+
+class TestMultiStepExecution:
+    """Test pipelined multi-step execution"""
+
+    @staticmethod
+    def _context(*steps):
+        plan = ExecutionPlan(mode=ExecutionMode.MULTI_STEP, goal="g", steps=list(steps))
+        return AgentContext(session_id="s", user_input="u", plan=plan)
+
+    @pytest.mark.asyncio
+    async def test_independent_steps_overlap(self, supervisor_agent):
+        """Independent steps run concurrently while output stays in plan order"""
+        tool = SlowTool()
+        supervisor_agent.tools.register(tool)
+        context = self._context(
+            *[
+                Step(id=f"step_{i}", tool_name="slow_tool", parameters={"label": str(i)})
+                for i in range(3)
+            ]
+        )
+
+        start = asyncio.get_running_loop().time()
+        output = [chunk async for chunk in supervisor_agent._execute_multi_step(context)]
+        elapsed = asyncio.get_running_loop().time() - start
+
+        assert elapsed < 0.25
+        assert [c for c in output if c.startswith("  [")] == [
+            "  [1/3] slow_tool... ",
+            "  [2/3] slow_tool... ",
+            "  [3/3] slow_tool... ",
+        ]
+        assert all(s.status == "completed" for s in context.plan.steps)
+
+    @pytest.mark.asyncio
+    async def test_dependent_step_waits(self, supervisor_agent):
+        """A step only starts after the steps it depends on have finished"""
+        tool = SlowTool()
+        supervisor_agent.tools.register(tool)
+        context = self._context(
+            Step(id="step_0", tool_name="slow_tool", parameters={"label": "a"}),
+            Step(
+                id="step_1", tool_name="slow_tool", parameters={"label": "b"}, depends_on=["step_0"]
+            ),
+        )
+
+        async for _ in supervisor_agent._execute_multi_step(context):
+            pass
+
+        assert tool.events == ["start a", "end a", "start b", "end b"]
+
+    @pytest.mark.asyncio
+    async def test_steps_after_side_effect_run_in_order(self, supervisor_agent):
+        """Reads after a step with side effects wait for it, even without depends_on"""
+
+        class SlowWriteTool(SlowTool):
+            name = "slow_write"
+            read_only = False
+
+        reader, writer = SlowTool(), SlowWriteTool()
+        writer.events = reader.events
+        supervisor_agent.tools.register(reader)
+        supervisor_agent.tools.register(writer)
+        context = self._context(
+            Step(id="step_0", tool_name="slow_write", parameters={"label": "w"}),
+            Step(id="step_1", tool_name="slow_tool", parameters={"label": "r"}),
+        )
+
+        async for _ in supervisor_agent._execute_multi_step(context):
+            pass
+
+        assert reader.events == ["start w", "end w", "start r", "end r"]
+
 
 class TestExecutionPlan:
     """Test execution plan generation"""
 
     def test_step_creation(self):
         """Test Step dataclass"""
-        step = Step(
-            id="step_1",
-            tool_name="test_tool",
-            parameters={"arg": "value"}
-        )
+        step = Step(id="step_1", tool_name="test_tool", parameters={"arg": "value"})
         assert step.id == "step_1"
         assert step.tool_name == "test_tool"
         assert step.parameters == {"arg": "value"}
@@ -149,9 +408,7 @@ class TestExecutionPlan:
         plan = ExecutionPlan(
             mode=ExecutionMode.SINGLE_STEP,
             goal="test goal",
-            steps=[
-                Step(id="s1", tool_name="tool1", parameters={})
-            ]
+            steps=[Step(id="s1", tool_name="tool1", parameters={})],
         )
         assert plan.mode == ExecutionMode.SINGLE_STEP
         assert plan.goal == "test goal"
@@ -159,11 +416,7 @@ class TestExecutionPlan:
 
     def test_fast_path_plan_has_no_steps(self):
         """FAST_PATH plan should have empty steps"""
-        plan = ExecutionPlan(
-            mode=ExecutionMode.FAST_PATH,
-            goal="hello",
-            steps=[]
-        )
+        plan = ExecutionPlan(mode=ExecutionMode.FAST_PATH, goal="hello", steps=[])
         assert len(plan.steps) == 0
 
 
@@ -207,6 +460,23 @@ class TestToolRegistry:
         assert "function" in schema
         assert "name" in schema["function"]
 
+    def test_get_tool_definitions_cached(self, tool_registry):
+        """Test tool definitions are reused until the registry changes"""
+        first = tool_registry.get_tool_definitions()
+        assert tool_registry.get_tool_definitions() is first
+
+        tool_registry.register(MockTool())
+        assert tool_registry.get_tool_definitions() is not first
+
+    def test_get_by_category(self, tool_registry):
+        """Test tools are bucketed by category at registration"""
+        buckets = tool_registry.get_by_category()
+        assert [t.name for t in buckets["other"]] == ["mock_tool"]
+
+        # Re-registering replaces the old entry in its bucket
+        tool_registry.register(MockTool())
+        assert len(tool_registry.get_by_category()["other"]) == 1
+
 
 class TestToolExecution:
     """Test tool execution"""
@@ -223,16 +493,108 @@ class TestToolExecution:
     @pytest.mark.asyncio
     async def test_tool_result_properties(self):
         """Test ToolResult properties"""
-        result = ToolResult(
-            success=True,
-            data={"key": "value"},
-            observation="Test observation"
-        )
+        result = ToolResult(success=True, data={"key": "value"}, observation="Test observation")
 
         assert result.success is True
         assert result.data == {"key": "value"}
         assert result.observation == "Test observation"
 
+    def test_tool_result_message_content(self):
+        """Test ToolResult message content for success and failure"""
+        ok = ToolResult(success=True, data=None, observation="done")
+        failed = ToolResult(success=False, data=None, observation="执行失败", error="boom")
+
+        assert ok.to_message_content() == "done"
+        assert failed.to_message_content() == "boom"
+
+    @pytest.mark.asyncio
+    async def test_expected_exception_logged_without_traceback(self, caplog):
+        """Expected exceptions fail the call with a one-line warning"""
+
+        class FlakyTool(MockTool):
+            expected_exceptions = (ConnectionError,)
+
+            async def execute(self, input: str) -> ToolResult:
+                raise ConnectionError("offline")
+
+        with caplog.at_level("WARNING", logger="agent.tools.base"):
+            result = await FlakyTool().execute_safe(input="x")
+
+        assert not result.success
+        assert result.metadata["exception_type"] == "ConnectionError"
+        assert [r.exc_info for r in caplog.records] == [None]
+
+    @pytest.mark.asyncio
+    async def test_execute_safe_timestamp_is_iso(self):
+        """Result metadata keeps the ISO-8601 timestamp string"""
+        from datetime import datetime
+
+        result = await MockTool().execute_safe(input="x")
+
+        assert isinstance(result.metadata["timestamp"], str)
+        datetime.fromisoformat(result.metadata["timestamp"])
+
+    @pytest.mark.parametrize(
+        "params, expected",
+        [
+            ({"count": 3, "mode": "a"}, (True, None)),
+            ({"mode": "a"}, (False, "缺少必需参数: count")),
+            ({"count": True}, (False, "参数 count 必须是整数，不能是布尔值")),
+            ({"count": "3"}, (False, "参数 count 类型错误，期望 integer，实际 str")),
+            ({"count": 0}, (False, "参数 count 不能小于 1")),
+            ({"count": 1, "mode": "c"}, (False, "参数 mode 值 'c' 无效，可选值: ['a', 'b']")),
+            ({"count": 1, "tags": ["x"] * 3}, (False, "参数 tags 超过最大数组长度 2")),
+        ],
+    )
+    def test_validate_params(self, params, expected):
+        """Test compiled parameter validation keeps the per-check error messages"""
+
+        class CountTool(MockTool):
+            parameters = [
+                ToolParameter(name="count", type="integer", description="", min_value=1),
+                ToolParameter(
+                    name="mode", type="string", description="", required=False, enum=["a", "b"]
+                ),
+                ToolParameter(
+                    name="tags", type="array", description="", required=False, max_length=2
+                ),
+            ]
+
+        assert CountTool().validate_params(params) == expected
+
+    @pytest.mark.parametrize(
+        "parameters, params, expected",
+        [
+            ([], {"anything": 1}, (True, None)),
+            (
+                [ToolParameter(name="confirm", type="boolean", description="", required=False)],
+                {},
+                (True, None),
+            ),
+            (
+                [ToolParameter(name="confirm", type="boolean", description="", required=False)],
+                {"confirm": "yes"},
+                (False, "参数 confirm 类型错误，期望 boolean，实际 str"),
+            ),
+            (
+                [ToolParameter(name="message", type="string", description="")],
+                {},
+                (False, "缺少必需参数: message"),
+            ),
+            (
+                [ToolParameter(name="message", type="string", description="")],
+                {"message": "hi"},
+                (True, None),
+            ),
+        ],
+    )
+    def test_validate_params_small_shapes(self, parameters, params, expected):
+        """Test specialized validators for tools with zero or one parameter"""
+        tool = MockTool()
+        tool.parameters = parameters
+
+        assert tool.validate_params(params) == expected
+
 
 class TestMetricsCollector:
     """Test metrics collection"""
@@ -244,20 +606,92 @@ class TestMetricsCollector:
 
     def test_record_llm_call(self, supervisor_agent):
         """Test recording LLM call"""
-        supervisor_agent.metrics.record_llm_call(1.5)
+        supervisor_agent.metrics.record_llm_call(1_500_000_000)
         assert supervisor_agent.metrics.metrics["llm_calls"] == 1
-        assert 1.5 in supervisor_agent.metrics.metrics["llm_latency"]
+        histogram = supervisor_agent.metrics.metrics["llm_latency"]
+        assert histogram.count == 1
+        assert histogram.total == 1_500_000_000
 
     def test_record_tool_call(self, supervisor_agent):
         """Test recording tool call"""
-        supervisor_agent.metrics.record_tool_call("test_tool", 0.5, True)
+        supervisor_agent.metrics.record_tool_call("test_tool", 500_000_000, True)
         assert "test_tool" in supervisor_agent.metrics.metrics["tool_calls"]
         assert supervisor_agent.metrics.metrics["tool_calls"]["test_tool"]["success"] == 1
 
     def test_get_summary(self, supervisor_agent):
         """Test getting metrics summary"""
-        supervisor_agent.metrics.record_llm_call(1.0)
+        supervisor_agent.metrics.record_llm_call(1_000_000_000)
         summary = supervisor_agent.metrics.get_summary()
 
         assert "llm_calls" in summary
         assert summary["llm_calls"] == 1
+        assert summary["llm_avg_latency"] == 1.0
+
+    def test_errors_are_bounded(self, monkeypatch):
+        """Only recent errors are kept while the total keeps counting"""
+        monkeypatch.setattr("src.agent.supervisor.MAX_RECORDED_ERRORS", 2)
+        metrics = MetricsCollector()
+        for i in range(5):
+            metrics.record_error(f"e{i}")
+
+        assert [e["error"] for e in metrics.metrics["errors"]] == ["e3", "e4"]
+        assert metrics.get_summary()["error_count"] == 5
+
+    @pytest.mark.asyncio
+    async def test_timed_methods_record_timings(self, supervisor_agent):
+        """Test @timed methods record into the agent's metrics"""
+        await supervisor_agent._analyze_intent("你好")
+        summary = supervisor_agent.metrics.get_summary()
+
+        assert "analyze_intent" in summary["timings"]
+
+    def test_latency_percentiles(self):
+        """Test histogram percentiles stay within bucket resolution"""
+        histogram = LatencyHistogram()
+        for ms in range(1, 101):
+            histogram.record(ms * 1_000_000)
+
+        assert histogram.count == 100
+        assert histogram.percentile(50) == pytest.approx(0.05, rel=1.0)
+        assert histogram.percentile(99) <= 0.1
+        assert histogram.min == 1_000_000
+        assert histogram.mean == pytest.approx(0.0505)
+
+
+class TestMemoryContext:
+    """Test memory recall sharing across planning and execution"""
+
+    @pytest.mark.asyncio
+    async def test_memory_recalled_once_per_turn(self, mock_llm_client, tool_registry):
+        """Planner and chat reply reuse the same recalled memory"""
+        memory = MagicMock()
+        memory.recall.return_value = "用户喜欢咖啡"
+        agent = SupervisorAgent(
+            llm_client=mock_llm_client, tool_registry=tool_registry, memory_system=memory
+        )
+        tool_registry.register(ChatTool())
+        agent.llm.generate_with_tools = AsyncMock(return_value=MagicMock(tool_calls=[]))
+        agent.llm.stream_generate = MagicMock(return_value=async_iter(["哈哈"]))
+
+        outputs = [o async for o in agent.handle("讲个笑话", "s")]
+
+        assert outputs == ["🤔 ", "哈哈", "\n"]
+        assert memory.recall.call_count == 1
+        system_prompt = agent.llm.generate_with_tools.await_args.kwargs["messages"][0]["content"]
+        assert "用户喜欢咖啡" in system_prompt
+        assert memory.recall.call_args.kwargs["top_k"] == 3
+
+    @pytest.mark.asyncio
+    async def test_multi_step_recalls_full_limit(self, mock_llm_client, tool_registry):
+        """Multi-step planning re-recalls with context_memory_limit"""
+        memory = MagicMock()
+        memory.recall.return_value = "用户喜欢咖啡"
+        agent = SupervisorAgent(
+            llm_client=mock_llm_client, tool_registry=tool_registry, memory_system=memory
+        )
+
+        task = asyncio.create_task(agent._recall_memory("整理并总结", agent._chat_memory_top_k))
+        snippet = await agent._memory_for_mode(task, "整理并总结", ExecutionMode.MULTI_STEP)
+
+        assert snippet == "用户喜欢咖啡"
+        assert memory.recall.call_args.kwargs["top_k"] == 5
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""
+Agent ContextBuilder tests
+"""
+from src.agent.context_builder import ContextBuilder, BuildContext, create_context_builder
+from src.agent.tools.base import Tool, ToolResult
+from src.agent.tools.registry import ToolRegistry
+
+
+class DummyTool(Tool):
+    """Dummy tool for prompt building"""
+
+    name = "dummy_tool"
+    description = "Dummy tool\nsecond line"
+    parameters = []
+
+    async def execute(self, **kwargs) -> ToolResult:
+        return ToolResult(success=True, data=None, observation="ok")
+
+
+class TestContextBuilder:
+    """Test system prompt building"""
+
+    def test_build_contains_sections(self):
+        """Prompt contains identity, tools, memory and rules"""
+        builder = ContextBuilder()
+        prompt = builder.build(BuildContext(
+            user_input="hi",
+            tools=[DummyTool()],
+            memory_context="用户喜欢咖啡",
+        ))
+
+        assert "## 身份" in prompt
+        assert "- `dummy_tool`: Dummy tool" in prompt
+        assert "second line" not in prompt
+        assert "## 相关记忆\n\n用户喜欢咖啡" in prompt
+        assert "## 重要规则" in prompt
+
+    def test_build_is_cached(self):
+        """Identical contexts reuse the cached prompt"""
+        builder = ContextBuilder()
+        tools = [DummyTool()]
+
+        first = builder.build(BuildContext(user_input="a", tools=tools))
+        second = builder.build(BuildContext(user_input="b", tools=tools))
+
+        assert first is second
+
+    def test_build_cache_respects_memory_and_personality(self):
+        """Different memory or personality produce different prompts"""
+        builder = ContextBuilder()
+
+        base = builder.build(BuildContext(user_input="a"))
+        with_memory = builder.build(BuildContext(user_input="a", memory_context="记忆"))
+        with_personality = builder.build(BuildContext(
+            user_input="a",
+            personality={'name': '小助手', 'description': '测试', 'traits': ['认真']},
+        ))
+
+        assert base != with_memory
+        assert "你是小助手，测试" in with_personality
+        assert "性格特点：认真" in with_personality
+
+    def test_build_personality_without_traits(self):
+        """Personality with traits set to None builds an empty traits line"""
+        builder = ContextBuilder()
+
+        prompt = builder.build(BuildContext(
+            user_input="a",
+            personality={'name': '小助手', 'description': '测试', 'traits': None},
+        ))
+
+        assert "性格特点：" in prompt
+
+    def test_build_tool_result(self):
+        """Tool results are rendered with success/failure markers"""
+        builder = ContextBuilder()
+
+        ok = builder.build_tool_result("dummy_tool", ToolResult(success=True, data=None, observation="ok"))
+        failed = builder.build_tool_result("dummy_tool", "boom")
+
+        assert ok.startswith("✅ dummy_tool 执行成功：")
+        assert failed == "❌ dummy_tool 执行失败：boom"
+
+    def test_build_pending_confirmation(self):
+        """Pending confirmation returns the compact confirmation prompt"""
+        builder = ContextBuilder()
+        prompt = builder.build(BuildContext(
+            user_input="是",
+            tools=[DummyTool()],
+            pending_confirmation=True,
+        ))
+
+        assert "## 确认模式" in prompt
+        assert "dummy_tool" not in prompt
+
+    def test_compile_tools_section(self):
+        """Compiled tools section is reused regardless of context tools"""
+        registry = ToolRegistry()
+        registry.register(DummyTool())
+        builder = create_context_builder(tool_registry=registry)
+
+        prompt = builder.build(BuildContext(user_input="hi"))
+
+        assert "- `dummy_tool`: Dummy tool" in prompt
+        assert builder.build(BuildContext(user_input="hi", tools=[])) is prompt
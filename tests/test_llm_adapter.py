@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""
+LLM adapter tests
+"""
+import asyncio
+import threading
+
+import pytest
+
+from src.agent.llm_adapter import OllamaAdapter, OpenAICompatibleAdapter, _parse_args, create_llm_adapter
+
+
+class MockSyncClient:
+    """Mock synchronous LLM client"""
+
+    def __init__(self, chunks=None, error=None, reply=""):
+        self.chunks = chunks or []
+        self.error = error
+        self.reply = reply
+
+    def generate(self, messages, temperature=0.7, max_tokens=2000, response_format=None):
+        return self.reply
+
+    def stream_generate(self, messages, temperature=0.7, max_tokens=2000):
+        for chunk in self.chunks:
+            yield chunk
+        if self.error:
+            raise self.error
+
+
+class TestStreamGenerate:
+    """Test sync-to-async streaming bridge"""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("adapter_cls", [OpenAICompatibleAdapter, OllamaAdapter])
+    async def test_stream_yields_chunks_in_order(self, adapter_cls):
+        """Chunks from the sync client are yielded in order"""
+        adapter = adapter_cls(MockSyncClient(chunks=["a", "b", "c"]))
+
+        chunks = [chunk async for chunk in adapter.stream_generate([])]
+
+        assert chunks == ["a", "b", "c"]
+
+    @pytest.mark.asyncio
+    async def test_stream_propagates_exception(self):
+        """Errors raised by the sync client surface after the received chunks"""
+        adapter = OpenAICompatibleAdapter(MockSyncClient(chunks=["a"], error=ValueError("boom")))
+
+        chunks = []
+        with pytest.raises(ValueError, match="boom"):
+            async for chunk in adapter.stream_generate([]):
+                chunks.append(chunk)
+
+        assert chunks == ["a"]
+
+    @pytest.mark.asyncio
+    async def test_stream_closed_early_stops_producer(self):
+        """Closing the async stream early closes the sync generator"""
+        closed = threading.Event()
+
+        def chunks():
+            try:
+                while True:
+                    yield "x"
+            finally:
+                closed.set()
+
+        client = MockSyncClient()
+        client.stream_generate = lambda *args: chunks()
+        adapter = OpenAICompatibleAdapter(client)
+
+        stream = adapter.stream_generate([])
+        async for _ in stream:
+            break
+        await stream.aclose()
+
+        assert await asyncio.to_thread(closed.wait, 5)
+
+
+class TestFormatToolsForPrompt:
+    """Test tool prompt rendering cache"""
+
+    def test_same_tools_list_is_rendered_once(self):
+        """Reusing the same schema list returns the cached description"""
+        adapter = OllamaAdapter(MockSyncClient())
+        tools = [{"function": {"name": "list_tasks", "description": "列出任务", "parameters": {}}}]
+
+        first = adapter._format_tools_for_prompt(tools)
+        second = adapter._format_tools_for_prompt(tools)
+
+        assert first == "- list_tasks: 列出任务"
+        assert first is second
+
+
+class OllamaClient(MockSyncClient):
+    """Mock client named like the Ollama client"""
+
+
+class TestCreateLLMAdapter:
+    """Test adapter dispatch by client class"""
+
+    def test_known_client_dispatch(self):
+        """Known client class names map to their adapter"""
+        adapter = create_llm_adapter(OllamaClient())
+
+        assert isinstance(adapter, OllamaAdapter)
+
+    def test_unknown_client_defaults_to_openai(self):
+        """Unknown clients fall back to the OpenAI compatible adapter"""
+        adapter = create_llm_adapter(MockSyncClient())
+
+        assert isinstance(adapter, OpenAICompatibleAdapter)
+        assert adapter.provider == "MockSyncClient"
+
+
+class TestParseArgs:
+    """Test tool call argument normalization"""
+
+    @pytest.mark.parametrize("raw, expected", [
+        ('{"a": 1}', {"a": 1}),
+        ({"a": 1}, {"a": 1}),
+        (None, {}),
+        ("", {}),
+    ])
+    def test_parse_args(self, raw, expected):
+        """JSON strings are decoded, dicts pass through, empty becomes {}"""
+        assert _parse_args(raw) == expected
+
+
+class TestFallbackWithPrompt:
+    """Test prompt-engineering tool call parsing"""
+
+    @pytest.mark.asyncio
+    async def test_tool_call_is_extracted_and_stripped(self):
+        """The tool call block is parsed and removed from the reply text"""
+        reply = '好的<tool_call>{"name": "list_tasks", "arguments": {"limit": 3}}</tool_call> 稍等'
+        adapter = OpenAICompatibleAdapter(MockSyncClient(reply=reply))
+
+        response = await adapter._fallback_with_prompt([], [], 0.7, 100)
+
+        assert response.content == "好的 稍等"
+        assert response.tool_calls[0].name == "list_tasks"
+        assert response.tool_calls[0].arguments == {"limit": 3}
+
+
+class TestSharedSession:
+    """Test shared HTTP session reuse"""
+
+    def test_session_not_reused_across_event_loops(self):
+        """Each event loop gets its own session for the same base_url"""
+        pytest.importorskip("aiohttp")
+        from src.agent.llm_adapter import _get_shared_session, close_http_session
+
+        async def get_session():
+            session = _get_shared_session("http://localhost:1")
+            assert _get_shared_session("http://localhost:1") is session
+            return session
+
+        first = asyncio.run(get_session())
+        second = None
+
+        async def get_and_close():
+            nonlocal second
+            second = await get_session()
+            await close_http_session("http://localhost:1")
+
+        asyncio.run(get_and_close())
+
+        assert second is not first
+        assert second.closed
@@ -2,6 +2,7 @@
 """
 记忆系统测试
 """
+import asyncio
 import sys
 import pytest
 import tempfile
@@ -66,6 +67,19 @@ class TestWorkingMemory:
         wm.set_context("当前对话主题：编程")
         assert wm.get_context() == "当前对话主题：编程"
 
+    def test_version_bumps_on_changes(self, wm):
+        """槽位或摘要变化时版本号递增，读取不改变版本号"""
+        versions = [wm.version]
+        wm.set_context("当前对话")
+        versions.append(wm.version)
+        wm.add_fact("用户喜欢咖啡")
+        versions.append(wm.version)
+        wm.get_full_context()
+        wm.clear_context()
+        versions.append(wm.version)
+
+        assert versions == sorted(set(versions))
+
 
 class TestLongTermMemory:
     """测试长期记忆"""
@@ -151,3 +165,85 @@ class TestMemoryIntegration:
             results = ltm.search_similar([0.1] * 768, top_k=1)
             assert len(results) == 1
             assert results[0].content == "重要信息"
+
+
+class TestMemoryWriteBatcher:
+    """测试记忆写入批处理"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_captures_are_batched(self):
+        """并发写入合并为批次，结果按提交顺序返回"""
+        from src.memory.write_batcher import MemoryWriteBatcher
+
+        class FakeMemory:
+            def __init__(self):
+                self.batches = []
+
+            def capture_many(self, items):
+                self.batches.append([item["content"] for item in items])
+                return [f"id-{item['content']}" for item in items]
+
+        memory = FakeMemory()
+        batcher = MemoryWriteBatcher(memory)
+
+        ids = await asyncio.gather(*(batcher.capture(content=str(i)) for i in range(5)))
+        await batcher.aclose()
+
+        assert ids == [f"id-{i}" for i in range(5)]
+        assert [c for batch in memory.batches for c in batch] == [str(i) for i in range(5)]
+        assert len(memory.batches) < 5
+
+    @pytest.mark.asyncio
+    async def test_failed_item_raises_for_its_caller(self):
+        """单条写入失败时对应的请求收到异常，其余请求正常返回"""
+        from src.memory.write_batcher import MemoryWriteBatcher
+
+        class FakeMemory:
+            def capture_many(self, items):
+                return [
+                    ValueError("boom") if item["content"] == "bad" else f"id-{item['content']}"
+                    for item in items
+                ]
+
+        batcher = MemoryWriteBatcher(FakeMemory())
+
+        results = await asyncio.gather(
+            batcher.capture(content="ok"),
+            batcher.capture(content="bad"),
+            return_exceptions=True,
+        )
+        await batcher.aclose()
+
+        assert results[0] == "id-ok"
+        assert isinstance(results[1], ValueError)
+
+
+class TestRecallCache:
+    """测试记忆检索工具的结果缓存"""
+
+    @pytest.mark.asyncio
+    async def test_repeated_search_hits_cache_until_memory_added(self):
+        """相同参数的检索只执行一次，写入新记忆后失效"""
+        from src.agent.tools.builtin.memory_tools import SearchMemoryTool
+
+        class FakeMemory:
+            def __init__(self):
+                self.generation = 0
+                self.calls = 0
+
+            def recall(self, query, top_k=5):
+                self.calls += 1
+                return f"{query}:{self.calls}"
+
+        memory = FakeMemory()
+        tool = SearchMemoryTool(memory)
+
+        first = await tool.execute(query="咖啡")
+        second = await tool.execute(query="咖啡")
+        assert memory.calls == 1
+        assert first.data["memories"] == second.data["memories"] == "咖啡:1"
+
+        memory.generation += 1
+        third = await tool.execute(query="咖啡")
+        assert memory.calls == 2
+        assert third.data["memories"] == "咖啡:2"
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""
+MessageBus tests
+"""
+import asyncio
+
+import pytest
+
+from src.bus.events import InboundMessage, OutboundMessage
+from src.bus.message_bus import MessageBus
+
+
+def make_message(content: str = "hi") -> InboundMessage:
+    return InboundMessage(channel="cli", sender_id="u1", chat_id="c1", content=content)
+
+
+class TestPublishInbound:
+    """Test inbound dispatch"""
+
+    @pytest.mark.asyncio
+    async def test_all_handlers_receive_message_and_errors_are_isolated(self):
+        """Every handler is called even if another one raises"""
+        received = []
+
+        async def ok(message):
+            received.append(message.content)
+
+        async def broken(message):
+            raise RuntimeError("boom")
+
+        bus = MessageBus()
+        bus.subscribe_inbound(ok)
+        bus.subscribe_inbound(broken)
+        bus.subscribe_inbound(ok)
+
+        await bus.publish_inbound(make_message())
+
+        assert received == ["hi", "hi"]
+
+    @pytest.mark.asyncio
+    async def test_inbound_concurrency_is_bounded(self):
+        """No more than inbound_concurrency handler calls run at once"""
+        running = 0
+        peak = 0
+
+        async def handler(message):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+        bus = MessageBus(inbound_concurrency=2)
+        bus.subscribe_inbound(handler)
+
+        await asyncio.gather(*(bus.publish_inbound(make_message(str(i))) for i in range(5)))
+
+        assert peak == 2
+
+
+class TestPublishOutboundMany:
+    """Test batched outbound dispatch"""
+
+    @pytest.mark.asyncio
+    async def test_groups_by_channel_and_prefers_batch_handler(self):
+        """Messages keep per-channel order; batch handlers get the whole group"""
+        sent = []
+        batches = []
+
+        async def send(message):
+            sent.append((message.channel, message.content))
+
+        async def send_many(messages):
+            batches.append([m.content for m in messages])
+
+        bus = MessageBus()
+        bus.register_outbound_handler("cli", send)
+        bus.register_outbound_handler("telegram", send, batch_handler=send_many)
+
+        await bus.publish_outbound_many([
+            OutboundMessage(channel="cli", chat_id="c1", content="a"),
+            OutboundMessage(channel="telegram", chat_id="c2", content="b"),
+            OutboundMessage(channel="cli", chat_id="c1", content="c"),
+            OutboundMessage(channel="telegram", chat_id="c2", content="d"),
+        ])
+
+        assert sent == [("cli", "a"), ("cli", "c")]
+        assert batches == [["b", "d"]]
+
+
+class TestOutboundCoalescing:
+    """Test per-channel outbound coalescing"""
+
+    @pytest.mark.asyncio
+    async def test_messages_within_window_are_sent_together(self):
+        """Messages published inside the window reach the batch handler once"""
+        batches = []
+
+        async def send(message):
+            raise AssertionError("batch handler should be used")
+
+        async def send_many(messages):
+            batches.append([m.content for m in messages])
+
+        bus = MessageBus()
+        bus.register_outbound_handler("telegram", send, batch_handler=send_many, coalesce_window=0.01)
+
+        for content in ("a", "b", "c"):
+            await bus.publish_outbound(OutboundMessage(channel="telegram", chat_id="c1", content=content))
+        await bus.flush_outbound()
+        await bus.aclose()
+
+        assert batches == [["a", "b", "c"]]
+
+    @pytest.mark.asyncio
+    async def test_channel_without_window_sends_immediately(self):
+        """Channels without a window keep the direct await behaviour"""
+        sent = []
+
+        async def send(message):
+            sent.append(message.content)
+
+        bus = MessageBus()
+        bus.register_outbound_handler("cli", send)
+
+        await bus.publish_outbound(OutboundMessage(channel="cli", chat_id="c1", content="a"))
+
+        assert sent == ["a"]
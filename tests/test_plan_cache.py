@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""
+Plan cache tests
+"""
+import pytest
+
+from src.agent.plan_cache import PlanCache, intent_mask
+
+
+def fake_embedding(text: str) -> list[float]:
+    """Character-bucket embedding: similar strings get similar vectors"""
+    vector = [0.0] * 64
+    for ch in text:
+        vector[ord(ch) % 64] += 1.0
+    return vector
+
+
+STEPS = [{"tool": "list_tasks", "params": {}}]
+
+
+class TestPlanCache:
+    """Test semantic plan cache"""
+
+    @pytest.mark.asyncio
+    async def test_exact_hit_returns_copy(self):
+        """Exact queries hit and callers get an independent copy"""
+        cache = PlanCache(fake_embedding)
+        await cache.store("查看任务", "single_step", STEPS)
+
+        steps = await cache.lookup("查看任务", "single_step")
+        steps[0]["params"]["confirmed"] = True
+
+        assert await cache.lookup("查看任务", "single_step") == STEPS
+
+    @pytest.mark.asyncio
+    async def test_semantic_hit_and_miss(self):
+        """Near-identical inputs hit, unrelated inputs and other modes miss"""
+        cache = PlanCache(fake_embedding, thresholds={"single_step": 0.9})
+        await cache.store("帮我查看一下所有任务", "single_step", STEPS)
+
+        assert await cache.lookup("帮我查看一下所有的任务", "single_step") == STEPS
+        assert await cache.lookup("hello world", "single_step") is None
+        assert await cache.lookup("帮我查看一下所有任务", "multi_step") is None
+
+    @pytest.mark.asyncio
+    async def test_persistence(self, tmp_path):
+        """Stored plans are reloaded from SQLite"""
+        db_path = str(tmp_path / "plan_cache.db")
+        cache = PlanCache(fake_embedding, db_path=db_path)
+        await cache.store("查看任务", "single_step", STEPS)
+        cache.close()
+
+        reloaded = PlanCache(fake_embedding, db_path=db_path)
+        assert await reloaded.lookup("查看任务", "single_step") == STEPS
+
+    def test_is_cacheable(self):
+        """Plans with free-text parameters are not cached"""
+        assert PlanCache.is_cacheable(STEPS)
+        assert not PlanCache.is_cacheable([{"tool": "create_task", "params": {"title": "开会"}}])
+        assert not PlanCache.is_cacheable([])
+
+    def test_is_cacheable_rejects_nested_strings_and_confirmation(self):
+        """Nested string values and confirmation flags are never cached"""
+        delete_ids = [{"tool": "delete_tasks", "params": {"task_ids": ["task_0001", "task_0002"], "confirmed": True}}]
+        assert not PlanCache.is_cacheable(delete_ids)
+        assert not PlanCache.is_cacheable([{"tool": "delete_tasks", "params": {"task_ids": ["task_0001"]}}])
+        assert not PlanCache.is_cacheable([{"tool": "x", "params": {"filters": {"tag": "work"}}}])
+        assert not PlanCache.is_cacheable([{"tool": "delete_tasks", "params": {"delete_all": True, "confirmed": True}}])
+        assert PlanCache.is_cacheable([{"tool": "list_tasks", "params": {"limit": 5, "ids": [1, 2]}}])
+
+    def test_intent_mask_uses_shared_keywords(self):
+        """Intent categories come from the supervisor keyword table"""
+        assert intent_mask("去掉这个任务") == intent_mask("删除这个任务") != 0
+        assert intent_mask("提醒我开会") != intent_mask("查看任务")
+        assert intent_mask("讲个笑话") == 0
+
+    @pytest.mark.asyncio
+    async def test_intent_gate_rejects_opposite_intent(self):
+        """Similar inputs with different intent keywords do not share plans"""
+        cache = PlanCache(fake_embedding, thresholds={"single_step": 0.5})
+        await cache.store("帮我查看任务", "single_step", STEPS)
+
+        assert await cache.lookup("帮我清理任务", "single_step") is None
+        assert await cache.lookup("帮我查看下任务", "single_step") == STEPS
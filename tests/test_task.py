@@ -92,3 +92,60 @@ class TestTaskManager:
         high_tasks = manager.list_tasks(priority="high")
         assert len(high_tasks) == 1
         assert high_tasks[0].title == "高优先级"
+
+    def test_search_pending_by_keyword(self, manager):
+        """测试按标题关键词查找待办任务"""
+        report = manager.create(title="Write Report")
+        done = manager.create(title="report draft")
+        manager.create(title="买牛奶")
+        manager.complete_task(done.id)
+
+        assert manager.search_pending("REPORT") == [report]
+
+        report.title = "Send invoice"
+        assert manager.search_pending("report") == []
+        assert manager.search_pending("invoice") == [report]
+
+
+class TestTaskTools:
+    """测试任务工具"""
+
+    @pytest.fixture
+    def manager(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            storage_path = Path(tmpdir) / "tasks.jsonl"
+            yield TaskManager(str(storage_path))
+
+    @pytest.mark.asyncio
+    async def test_list_tasks_formats_due_date(self, manager):
+        """测试列出任务时格式化截止时间"""
+        from src.agent.tools.builtin.task_tools import ListTasksTool
+
+        manager.create(title="交报告", due_date=datetime(2026, 3, 5, 9, 30))
+        manager.create(title="买牛奶")
+
+        result = await ListTasksTool(manager).execute()
+
+        assert result.data["count"] == 2
+        assert result.data["tasks"][0]["due_date"] == "2026-03-05T09:30:00"
+        lines = result.observation.split("\n")
+        assert lines[0] == "📋 找到 2 个待办任务:"
+        assert lines[1].endswith("交报告 ⏰ 03-05 09:30")
+        assert lines[2].endswith("买牛奶")
+
+    @pytest.mark.asyncio
+    async def test_delete_tasks_writes_once(self, manager, monkeypatch):
+        """测试批量删除只保存一次"""
+        from src.agent.tools.builtin.task_tools import DeleteTasksTool
+
+        tasks = [manager.create(title=f"任务{i}") for i in range(3)]
+        saves = []
+        monkeypatch.setattr(manager, "_save_tasks", lambda: saves.append(1))
+
+        result = await DeleteTasksTool(manager).execute(
+            task_ids=[tasks[0].id, tasks[1].id, tasks[1].id, "missing"], confirmed=True
+        )
+
+        assert result.data["deleted_count"] == 2
+        assert list(manager.tasks) == [tasks[2].id]
+        assert len(saves) == 1
@@ -12,7 +12,7 @@ from src.agent.tools.decorators import (
     _extract_description,
     _python_type_to_json,
 )
-from src.agent.tools.base import ToolResult, ToolParameter
+from src.agent.tools.base import Tool, ToolResult, ToolParameter
 
 
 class TestTypeConversion:
@@ -34,10 +34,34 @@ class TestTypeConversion:
         assert _python_type_to_json(Optional[str]) == "string"
         assert _python_type_to_json(Optional[int]) == "integer"
 
+    def test_generic_and_union_types(self):
+        """测试泛型容器与 X | None 类型转换"""
+        from typing import Dict, List, Optional
+
+        assert _python_type_to_json(list[str]) == "array"
+        assert _python_type_to_json(Optional[List[int]]) == "array"
+        assert _python_type_to_json(Dict[str, int]) == "object"
+        assert _python_type_to_json(int | None) == "integer"
+        assert _python_type_to_json(None | dict[str, int]) == "object"
+
 
 class TestParameterExtraction:
     """测试参数提取"""
 
+    def test_extraction_is_cached_per_function(self):
+        """测试同一函数只解析一次，每次返回互不共享的参数对象"""
+        def func(query: str, limit: int = 5):
+            pass
+
+        first = _extract_parameters(func)
+        second = _extract_parameters(func)
+        first[0].description = "已修改"
+
+        assert first[1] == second[1]
+        assert first[0] is not second[0]
+        assert second[0].description == "参数 query"
+        assert _extract_parameters(func)[0].description == "参数 query"
+
     def test_extract_simple_params(self):
         """测试提取简单参数"""
         def func(name: str, age: int):
@@ -160,6 +184,22 @@ class TestToolDecorator:
         assert result.success is True
         assert result.data["result"] == 3
 
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("sync_in_thread", [True, False])
+    async def test_sync_function_thread(self, sync_in_thread):
+        """测试同步函数默认在工作线程中执行，可关闭"""
+        import threading
+
+        @tool(sync_in_thread=sync_in_thread)
+        def where() -> bool:
+            """是否在主线程"""
+            return threading.current_thread() is threading.main_thread()
+
+        result = await where.execute()
+        assert result.data["result"] is not sync_in_thread
+        assert where.is_synchronous is not sync_in_thread
+        assert type(where).is_synchronous is not sync_in_thread
+
     @pytest.mark.asyncio
     async def test_async_function(self):
         """测试异步函数"""
@@ -173,6 +213,21 @@ class TestToolDecorator:
         assert result.success is True
         assert result.data["result"] == 3
 
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("timeout, expected_success", [(0.01, False), (0, True)])
+    async def test_async_function_timeout(self, timeout, expected_success):
+        """测试异步函数超时（timeout<=0 表示不限时）"""
+        @tool(timeout=timeout)
+        async def slow() -> str:
+            """慢函数"""
+            await asyncio.sleep(0.05)
+            return "done"
+
+        result = await slow.execute()
+        assert result.success is expected_success
+        if not expected_success:
+            assert result.error == "TimeoutError"
+
     @pytest.mark.asyncio
     async def test_function_error(self):
         """测试函数异常"""
@@ -257,3 +312,30 @@ class TestSchemaGeneration:
         assert "limit" in params["properties"]
         assert "query" in params["required"]
         assert "limit" not in params["required"]
+
+    def test_schema_cached_per_decorated_tool(self):
+        """测试装饰器工具按实例缓存 Schema，互不串用"""
+        @tool(description="工具 A")
+        def tool_a(x: str) -> str:
+            return x
+
+        @tool(description="工具 B")
+        def tool_b(y: int) -> int:
+            return y
+
+        assert tool_a.get_schema() is tool_a.get_schema()
+        assert tool_b.get_schema()["function"]["name"] == "tool_b"
+        assert "y" in tool_b.get_schema()["function"]["parameters"]["properties"]
+
+    def test_schema_cached_per_class(self):
+        """测试类属性定义的工具在实例间共享 Schema"""
+        class Echo(Tool):
+            name = "echo"
+            description = "回显"
+            parameters = [ToolParameter(name="text", type="string", description="文本")]
+
+            async def execute(self, text: str) -> ToolResult:
+                return ToolResult(success=True, data=None, observation=text)
+
+        assert Echo().get_schema() is Echo().get_schema()
+        assert "text" in Echo().get_schema()["function"]["parameters"]["properties"]